@@ -0,0 +1,92 @@
+"""Benchmark process-pool cleaning in the module_5 DataCleaner.
+
+Writes a synthetic NDJSON crawl (``--rows`` records, one million by
+default) built from the checked-in module_5/applicant_data.json with
+unique URLs and shuffled stats, then cleans it to NDJSON with 1, 2, ... N
+worker processes. Reports rows/sec, speedup over the serial run, and
+asserts every run writes byte-identical output. ``--engine both`` also
+runs the pandas column engine at each worker count.
+
+Usage:
+    python benchmarks/bench_clean_pool.py [--rows 1000000] [--chunk-size 2000] [--max-workers 8]
+        [--engine python|columnar|both]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "module_5", "src", "subprocess"))
+
+# pylint: disable=wrong-import-position,import-error
+from clean import CHUNK_SIZE, ENGINES, CleanOptions, iter_clean
+from record_stream import NDJSONWriter, iter_records
+
+
+def write_dataset(path, rows, seed=1):
+    """Write ``rows`` GradCafe-shaped raw records to an NDJSON file."""
+    rng = random.Random(seed)
+    source = list(iter_records(os.path.join(ROOT, "module_5", "applicant_data.json")))
+    raws = [r.get("raw") or "" for r in source]
+    with NDJSONWriter(path) as out:
+        for i, record in enumerate(itertools.islice(itertools.cycle(source), rows)):
+            out.write({
+                **record,
+                "url": f"https://www.thegradcafe.com/result/{i + 1}",
+                "raw": rng.choice(raws),
+            })
+
+
+def _digest(path):
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main():
+    """Run the benchmark and print a scaling table."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--engine", default="python", choices=ENGINES + ("both",))
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "raw.ndjson")
+        write_dataset(source, args.rows)
+        print(f"{args.rows} rows, chunk_size={args.chunk_size}, cpus={os.cpu_count()}")
+
+        counts = sorted({2 ** i for i in range(args.max_workers.bit_length())} | {args.max_workers})
+        engines = ENGINES if args.engine == "both" else (args.engine,)
+        baseline = reference = None
+        for workers, engine in itertools.product(counts, engines):
+            out = os.path.join(tmp, f"clean-{workers}-{engine}.ndjson")
+            start = time.perf_counter()
+            with NDJSONWriter(out) as writer:
+                writer.write_many(iter_clean(iter_records(source), CleanOptions(
+                    workers=workers, chunk_size=args.chunk_size, engine=engine)))
+            elapsed = time.perf_counter() - start
+            digest = _digest(out)
+            reference = reference or digest
+            assert digest == reference, f"output differs with {workers} workers, {engine} engine"
+            baseline = baseline or elapsed
+            print(f"  workers={workers:<3} {engine:<8} {elapsed:7.2f}s"
+                  f"  {args.rows / elapsed:10.0f} rows/s  speedup x{baseline / elapsed:.2f}")
+            os.remove(out)
+        print("  outputs identical: yes")
+
+
+if __name__ == "__main__":
+    main()
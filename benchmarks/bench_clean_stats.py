@@ -0,0 +1,109 @@
+"""Benchmark the module_5 DataCleaner stats extractor and value cleaning.
+
+Compares the single-pass compiled ``parse_stats`` / ``_clean_value`` in
+clean.py with the previous per-field regex implementations (reproduced
+below) on the raw records of the checked-in applicant_data.json, repeated
+to ``--records`` entries. Asserts both produce the same output and
+reports records/sec and speedup for each stage.
+
+Usage:
+    python benchmarks/bench_clean_stats.py [--records 200000] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "module_5", "src", "subprocess"))
+
+# pylint: disable=wrong-import-position,import-error
+from clean import DataCleaner
+from record_stream import iter_records
+
+
+def legacy_parse_stats(stats_text):
+    """Previous parse_stats: six re.search calls and two substring scans."""
+    data = {}
+    gpa_match = re.search(r'GPA\s*([\d\.]+)', stats_text, re.I)
+    if gpa_match:
+        data['gpa'] = gpa_match.group(1)
+    gre_match = re.search(r'GRE\s*(\d+)', stats_text, re.I)
+    if gre_match:
+        data['greScore'] = gre_match.group(1)
+    gre_v_match = re.search(r'GRE V\s*(\d+)', stats_text, re.I)
+    if gre_v_match:
+        data['greV'] = gre_v_match.group(1)
+    gre_aw_match = re.search(r'GRE AW\s*([\d\.]+)', stats_text, re.I)
+    if gre_aw_match:
+        data['greAW'] = gre_aw_match.group(1)
+    if 'International' in stats_text:
+        data['US/International'] = 'International'
+    elif 'American' in stats_text:
+        data['US/International'] = 'American'
+    sem_year = re.search(r'(Fall|Spring|Summer|Winter)\s*(\d{4})', stats_text, re.I)
+    if sem_year:
+        data['term'] = sem_year.group(1) + " " + sem_year.group(2)
+    return data
+
+
+def legacy_clean_value(value):
+    """Previous _clean_value: three regex/replace passes per value."""
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        return value
+    value = re.sub(r'<[^>]+>', '', value)
+    value = value.replace('&nbsp;', ' ').replace('\n', ' ').replace('\r', '').replace('\t', ' ')
+    value = re.sub(r'\s+', ' ', value)
+    value = value.strip()
+    if value.lower() in ["n/a", "na", "none", "unknown", ""]:
+        return ""
+    return value
+
+
+def _best_of(repeat, func, items):
+    """Return (best seconds, output) of ``repeat`` runs of func over items."""
+    best, output = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = [func(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    source = list(iter_records(os.path.join(ROOT, "module_5", "applicant_data.json")))
+    records = list(itertools.islice(itertools.cycle(source), args.records))
+    raws = [r.get("raw") or "" for r in records]
+    values = [v for r in records for k, v in r.items() if k not in ("raw", "program")]
+    cleaner = DataCleaner()
+
+    print(f"{len(records)} records, {len(values)} field values")
+    for label, items, legacy, compiled in (
+        ("parse_stats", raws, legacy_parse_stats, cleaner.parse_stats),
+        ("_clean_value", values, legacy_clean_value,
+         cleaner._clean_value),  # pylint: disable=protected-access
+    ):
+        old_s, old_out = _best_of(args.repeat, legacy, items)
+        new_s, new_out = _best_of(args.repeat, compiled, items)
+        assert old_out == new_out, f"{label} output differs from the legacy implementation"
+        print(f"  {label:>12}: legacy {len(items) / old_s:10.0f}/s  "
+              f"compiled {len(items) / new_s:10.0f}/s  speedup x{old_s / new_s:.2f}")
+    print("  outputs identical: yes")
+
+
+if __name__ == "__main__":
+    main()
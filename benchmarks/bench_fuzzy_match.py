@@ -0,0 +1,105 @@
+"""Benchmark the llm_hosting FuzzyIndex against difflib.get_close_matches.
+
+Builds lookup queries from the checked-in applicant_data.json fields and
+typo-style variants of canonical names, then matches them against the
+canonical university and program lists with difflib (a scan of the whole
+list) and with FuzzyIndex. Asserts both return the same answer for every
+query and reports lookups/sec and speedup per list and cutoff. With
+``--grow`` the university list is also padded with synthetic names to
+show how lookup cost scales with list size.
+
+Usage:
+    python benchmarks/bench_fuzzy_match.py [--queries 2000] [--grow 4]
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LLM_DIR = os.path.join(ROOT, "module_5", "src", "subprocess", "llm_hosting")
+sys.path.insert(0, LLM_DIR)
+
+# pylint: disable=wrong-import-position,import-error
+from fuzzy_index import FuzzyIndex
+
+# Post-normalization cutoffs (programs 0.84, universities 0.86) and the
+# pre-LLM resolver's 0.95
+CUTOFFS = (0.84, 0.86, 0.95)
+
+
+def _read(name):
+    with open(os.path.join(LLM_DIR, name), encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _variant(rng, text):
+    """Return text with one typo-like edit."""
+    i = rng.randrange(len(text))
+    return rng.choice((
+        text[:i] + text[i + 1:],
+        text[:i] + text[i] + text[i:],
+        text.title(),
+        text + "s",
+    ))
+
+
+def _queries(rng, candidates, field, count):
+    with open(os.path.join(ROOT, "module_5", "applicant_data.json"), encoding="utf-8") as f:
+        seen = [row[field] for row in json.load(f)]
+    pool = seen + candidates + [_variant(rng, c) for c in candidates]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def _timed(func, queries, cutoff):
+    start = time.perf_counter()
+    out = [func(q, cutoff) for q in queries]
+    return time.perf_counter() - start, out
+
+
+def _compare(label, candidates, queries):
+    index = FuzzyIndex(candidates)
+
+    def scan(query, cutoff):
+        matches = difflib.get_close_matches(query, candidates, n=1, cutoff=cutoff)
+        return matches[0] if matches else None
+
+    for cutoff in CUTOFFS:
+        old_s, old_out = _timed(scan, queries, cutoff)
+        new_s, new_out = _timed(index.best, queries, cutoff)
+        assert old_out == new_out, f"{label} @ {cutoff}: FuzzyIndex disagrees with difflib"
+        print(f"  {label:>22} ({len(candidates):5d}) @ {cutoff:.2f}: "
+              f"difflib {len(queries) / old_s:9.0f}/s  index {len(queries) / new_s:9.0f}/s  "
+              f"speedup x{old_s / new_s:.1f}")
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--grow", type=int, default=4,
+                        help="Also test a university list this many times larger (0 to skip).")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    unis, progs = _read("canon_universities.txt"), _read("canon_programs.txt")
+    uni_queries = _queries(rng, unis, "university", args.queries)
+    print(f"{args.queries} queries per list")
+    _compare("canon_universities", unis, uni_queries)
+    _compare("canon_programs", progs, _queries(rng, progs, "program", args.queries))
+    if args.grow > 1:
+        grown = unis + [f"{_variant(rng, rng.choice(unis))} Campus {i}"
+                        for i in range(len(unis) * (args.grow - 1))]
+        _compare(f"universities x{args.grow}", grown, uni_queries)
+    print("  answers identical: yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark the process-pool parse stage of GradCafeScraper.
+
+Writes synthetic survey pages to a temporary page archive, then rebuilds
+the records with ``reparse_archive`` using 1, 2, ... N parser processes.
+Reports pages/sec and speedup over one worker, and asserts every run
+produces the same records as in-process parsing.
+
+Usage:
+    python benchmarks/bench_parse_pool.py [--pages 1000] [--parser bs4] [--max-workers 8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "module_5", "src", "subprocess"))
+
+# pylint: disable=wrong-import-position,import-error
+from synthetic_pages import render_page
+from page_archive import PageArchive
+from scrape import GradCafeScraper
+
+
+def main():
+    """Run the benchmark and print a scaling table."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--pages", type=int, default=1000)
+    arg_parser.add_argument("--parser", default="bs4", choices=["bs4", "stream"])
+    arg_parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pages.archive")
+        archive = PageArchive(path)
+        for page in range(1, args.pages + 1):
+            archive.append(page, render_page(page), run="bench")
+
+        reference = GradCafeScraper(load_existing=False, parser=args.parser)
+        for _, html in archive.iter_pages():
+            reference._handle_page(html, echo=False)  # pylint: disable=protected-access
+
+        print(f"{args.pages} pages, parser={args.parser}, cpus={os.cpu_count()}")
+        counts = sorted({2 ** i for i in range(args.max_workers.bit_length())} | {args.max_workers})
+        baseline = None
+        for workers in counts:
+            scraper = GradCafeScraper(load_existing=False, parser=args.parser)
+            scraper.workers = workers
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.reparse_archive(PageArchive(path))
+            elapsed = time.perf_counter() - start
+            assert scraper.data == reference.data, f"records differ with {workers} workers"
+            baseline = baseline or elapsed
+            print(f"  workers={workers:<3} {elapsed:7.2f}s  {args.pages / elapsed:8.1f} pages/s"
+                  f"  speedup x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark the survey-table parser backends.
+
+Parses synthetic GradCafe pages into records through both scrapers'
+record builders (module_6 worker and module_5 GradCafeScraper) once per
+backend, asserts every backend produces identical records, and reports
+rows/sec for each.
+
+Usage:
+    python benchmarks/bench_row_parser.py [--pages 200] [--rows 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "module_6", "worker"))
+sys.path.insert(0, os.path.join(ROOT, "module_5", "src", "subprocess"))
+
+# pylint: disable=wrong-import-position,import-error
+from synthetic_pages import render_page
+from etl import incremental_scraper
+from etl.row_parser import BACKENDS
+from scrape import GradCafeScraper
+
+
+def _worker_records(pages, backend):
+    """Parse pages with the module_6 record builder."""
+    records = []
+    for html in pages:
+        page_records, _ = incremental_scraper._parse_page(  # pylint: disable=protected-access
+            html, set(), parse_table=BACKENDS[backend],
+        )
+        records.extend(page_records)
+    return records
+
+
+def _scraper_records(pages, backend):
+    """Parse pages with the module_5 GradCafeScraper record builder."""
+    scraper = GradCafeScraper(load_existing=False, parser=backend)
+    for html in pages:
+        scraper._handle_page(html, echo=False)  # pylint: disable=protected-access
+    return scraper.data
+
+
+def main():
+    """Run the benchmark and print a results table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = [render_page(p, rows_per_page=args.rows) for p in range(1, args.pages + 1)]
+    total_rows = args.pages * args.rows
+
+    for label, build in (("module_6 worker", _worker_records),
+                         ("module_5 scraper", _scraper_records)):
+        reference = None
+        print(f"\n{label}: {args.pages} pages, {total_rows} entries")
+        for backend in BACKENDS:
+            start = time.perf_counter()
+            records = build(pages, backend)
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference = records
+            assert records == reference, f"{backend} records differ from {next(iter(BACKENDS))}"
+            assert len(records) == total_rows
+            print(f"  {backend:>8}: {elapsed:7.3f}s  {total_rows / elapsed:10.0f} rows/s")
+        print("  records identical across backends: yes")
+
+
+if __name__ == "__main__":
+    main()
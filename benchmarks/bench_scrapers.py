@@ -0,0 +1,201 @@
+"""End-to-end scraper throughput against the local GradCafe stand-in.
+
+Starts a StandInServer and runs each scraper against it, each in its own
+child process so CPU time and peak RSS are measured per scraper:
+
+* ``module_6``: worker ``scrape_new_records`` (thread-pool fetch, retries)
+* ``module_5``: ``GradCafeScraper.scrape_data`` (fetch threads + parse processes)
+* ``module_2``: the original sequential ``GradCafeScraper.scrape_data``
+  (its fixed one-second politeness delay is skipped)
+
+Reports pages/sec, rows/sec, CPU seconds (including parse subprocesses)
+and peak RSS, and compares them with a stored baseline run with the same
+settings. ``--save-baseline`` records the current results as the baseline.
+
+Usage:
+    python benchmarks/bench_scrapers.py [--pages 200] [--rows 20] [--latency 0.02]
+        [--error-rate 0.0] [--rate 0] [--concurrency 4] [--scrapers module_6 module_5]
+        [--save-baseline]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "bench_scrapers.json")
+SCRAPERS = ("module_6", "module_5", "module_2")
+METRICS = ("pages_per_sec", "rows_per_sec", "cpu_seconds", "peak_rss_mb")
+
+# pylint: disable=wrong-import-position,import-error
+from standin_server import StandInServer
+
+
+def _module_6(args):
+    """Run the worker's incremental scraper; returns the record count."""
+    os.environ["GRADCAFE_BASE_URL"] = args.url
+    sys.path.insert(0, os.path.join(ROOT, "module_6", "worker"))
+    from etl.incremental_scraper import scrape_new_records  # pylint: disable=import-outside-toplevel
+    return lambda: len(scrape_new_records(
+        set(), max_pages=args.pages, concurrency=args.concurrency, rate=args.rate,
+    ))
+
+
+def _module_5(args):
+    """Run the module_5 pipelined GradCafeScraper; returns the record count."""
+    sys.path.insert(0, os.path.join(ROOT, "module_5", "src", "subprocess"))
+    from scrape import GradCafeScraper  # pylint: disable=import-outside-toplevel
+    scraper = GradCafeScraper(load_existing=False)
+    scraper.url = args.url
+    scraper.max_entries = args.pages * args.rows
+    scraper.fetch_threads = args.concurrency
+
+    def run():
+        scraper.scrape_data(rate=args.rate)
+        return len(scraper.data)
+    return run
+
+
+def _module_2(args):
+    """Run the original module_2 GradCafeScraper; returns the record count."""
+    sys.path.insert(0, os.path.join(ROOT, "module_2"))
+    from scrape import GradCafeScraper  # pylint: disable=import-outside-toplevel
+    scraper = GradCafeScraper()
+    scraper.url = args.url
+    scraper.max_entries = args.pages * args.rows
+
+    def run():
+        # Only this child process is affected; the stand-in runs in the parent
+        with patch("time.sleep"):
+            scraper.scrape_data()
+        return len(scraper.data)
+    return run
+
+
+def _child(args):
+    """Run one scraper and print its measurements as a JSON line."""
+    run = {"module_6": _module_6, "module_5": _module_5, "module_2": _module_2}[args.child](args)
+    with open(os.devnull, "w", encoding="utf-8") as devnull:
+        before = os.times()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            rows = run()
+        elapsed = time.perf_counter() - start
+        after = os.times()
+
+    cpu = sum(after[:4]) - sum(before[:4])  # user + system, self + reaped children
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    rss_mb = rss / (1024 * 1024 if sys.platform == "darwin" else 1024)  # bytes on macOS
+    print(json.dumps({"rows": rows, "seconds": elapsed, "cpu_seconds": cpu,
+                      "peak_rss_mb": rss_mb}))
+
+
+def _measure(name, server, args):
+    """Run one scraper in a child process against the server."""
+    server.reset()
+    cmd = [
+        sys.executable, os.path.abspath(__file__), "--child", name, "--url", server.url,
+        "--pages", str(args.pages), "--rows", str(args.rows),
+        "--rate", str(args.rate), "--concurrency", str(args.concurrency),
+    ]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name} failed:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["pages"] = server.requests["survey"]
+    result["errors"] = server.requests["error"]
+    result["pages_per_sec"] = result["pages"] / result["seconds"]
+    result["rows_per_sec"] = result["rows"] / result["seconds"]
+    return result
+
+
+def _compare(name, result, baseline, tolerance):
+    """Return a "vs baseline" column and whether throughput regressed."""
+    base = baseline.get(name)
+    if not base:
+        return "", False
+    changes = []
+    regressed = False
+    for metric in METRICS:
+        change = (result[metric] - base[metric]) / base[metric] if base[metric] else 0.0
+        changes.append(f"{metric.split('_', maxsplit=1)[0]} {change:+.0%}")
+        regressed |= metric.endswith("per_sec") and change < -tolerance
+    return "  vs baseline: " + ", ".join(changes) + ("  REGRESSION" if regressed else ""), regressed
+
+
+def main():
+    """Run the suite, print a results table and compare with the baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02,
+                        help="Stand-in seconds per response.")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of stand-in responses that are 503s.")
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="Scraper request rate limit (0 = unlimited).")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--scrapers", nargs="+", choices=SCRAPERS, default=list(SCRAPERS))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Throughput drop vs baseline reported as a regression.")
+    parser.add_argument("--child", choices=SCRAPERS, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        _child(args)
+        return
+
+    config = {key: getattr(args, key)
+              for key in ("pages", "rows", "latency", "error_rate", "rate", "concurrency")}
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            stored = json.load(f)
+    baseline = stored.get("results", {}) if stored.get("config") == config else {}
+    if stored and not baseline:
+        print(f"Baseline in {args.baseline} was recorded with other settings; not comparing.")
+
+    print(f"{args.pages} pages x {args.rows} rows, latency {args.latency}s, "
+          f"error rate {args.error_rate}, rate {args.rate or 'unlimited'}, "
+          f"concurrency {args.concurrency}, cpus={os.cpu_count()}")
+    results = {}
+    regressed = False
+    with StandInServer(args.pages, args.rows, args.latency, args.error_rate) as server:
+        for name in args.scrapers:
+            result = results[name] = _measure(name, server, args)
+            note, worse = _compare(name, result, baseline, args.tolerance)
+            regressed |= worse
+            print(f"  {name}: {result['pages']:5d} pages {result['rows']:7d} rows "
+                  f"{result['seconds']:7.2f}s  {result['pages_per_sec']:7.1f} pages/s "
+                  f"{result['rows_per_sec']:8.0f} rows/s  cpu {result['cpu_seconds']:6.2f}s  "
+                  f"rss {result['peak_rss_mb']:6.1f} MB  ({result['errors']} 503s){note}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "config": config,
+                "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                            "cpus": os.cpu_count()},
+                "results": {**stored.get("results", {}), **results} if baseline else results,
+            }, f, indent=2)
+            f.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    if regressed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Local HTTP stand-in for the GradCafe survey, serving synthetic pages.
+
+Serves ``/survey/index.php?page=N`` (any path under ``/survey``) with
+pages from synthetic_pages, and ``/result/<id>`` detail pages for the IDs
+those pages link to. Pages past the end of the survey have no results
+table, like the real site. Responses are gzip-compressed when the client
+accepts it and connections are kept alive.
+
+Latency and failures are configurable: every request waits ``latency``
+seconds (plus up to ``jitter``), and a seeded ``error_rate`` fraction of
+requests gets a 503, optionally with a Retry-After header.
+
+Usage:
+    python benchmarks/standin_server.py [--port 8000] [--pages 500] [--rows 20]
+        [--latency 0.05] [--error-rate 0.02] [--retry-after 1]
+
+    # then, e.g. for the module_6 worker:
+    GRADCAFE_BASE_URL=http://127.0.0.1:8000/survey/index.php
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import functools
+import gzip
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from synthetic_pages import render_page, render_result
+
+NO_RESULTS = (
+    b"<!DOCTYPE html><html><head><title>GradCafe Results</title></head>"
+    b"<body><p>No results found.</p></body></html>"
+)
+RESULT_PATH = re.compile(r"^/result/(\d+)/?$")
+
+
+class StandInServer:  # pylint: disable=too-many-instance-attributes
+    """Threaded GradCafe stand-in; use as a context manager or start()/stop().
+
+    Args:
+        pages: Number of survey pages with results.
+        rows_per_page: Entries per survey page.
+        latency: Seconds every response is delayed by.
+        error_rate: Fraction of requests answered with 503 (0..1).
+        retry_after: Retry-After seconds sent with the 503s (None to omit).
+        jitter: Extra random delay of up to this many seconds.
+        top_id: Result ID of the newest entry on page 1.
+        seed: Seed for page content and injected errors.
+        host: Interface to bind.
+        port: Port to bind (0 picks a free one).
+
+    Attributes:
+        requests (collections.Counter): Requests served, by kind
+            (``"survey"``, ``"result"``, ``"error"``, ``"not_found"``).
+    """
+
+    def __init__(self, pages=100, rows_per_page=20, latency=0.0, error_rate=0.0,  # pylint: disable=too-many-arguments
+                 *, retry_after=None, jitter=0.0, top_id=1_000_000, seed=0,
+                 host="127.0.0.1", port=0):
+        self.pages = pages
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.jitter = jitter
+        self.top_id = top_id
+        self.seed = seed
+        self.requests = collections.Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Root URL of the server, e.g. ``http://127.0.0.1:8000``."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        """Survey index URL, the stand-in for GradCafe's survey/index.php."""
+        return f"{self.base_url}/survey/index.php"
+
+    @property
+    def result_ids(self):
+        """Range of result IDs linked from the survey pages."""
+        return range(self.top_id - self.pages * self.rows_per_page + 1, self.top_id + 1)
+
+    def start(self):
+        """Serve on a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve_forever(self):
+        """Serve on the calling thread until interrupted."""
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def reset(self):
+        """Zero the request counters and replay the same injected errors.
+
+        Call between benchmark runs so every client sees the same sequence
+        of failures.
+        """
+        with self._lock:
+            self.requests.clear()
+            self._rng.seed(self.seed)
+
+    def respond(self, path):
+        """Return ``(status, body, extra headers)`` for a request path."""
+        with self._lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._rng.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+
+        parts = urlsplit(path)
+        match = RESULT_PATH.match(parts.path)
+        if fail:
+            kind, status, body = "error", 503, b"Service Unavailable"
+        elif parts.path.startswith("/survey"):
+            kind, status, body = "survey", 200, self._survey_page(parts.query)
+        elif match and int(match.group(1)) in self.result_ids:
+            kind, status, body = "result", 200, _result_page(int(match.group(1)), self.seed)
+        else:
+            kind, status, body = "not_found", 404, b"Not Found"
+        with self._lock:
+            self.requests[kind] += 1
+
+        headers = {}
+        if fail and self.retry_after is not None:
+            headers["Retry-After"] = str(self.retry_after)
+        return status, body, headers
+
+    def _survey_page(self, query):
+        try:
+            page = int(parse_qs(query).get("page", ["1"])[0])
+        except ValueError:
+            page = 1
+        if not 1 <= page <= self.pages:
+            return NO_RESULTS
+        return _survey_page(page, self.rows_per_page, self.top_id, self.seed)
+
+
+@functools.lru_cache(maxsize=4096)
+def _survey_page(page, rows_per_page, top_id, seed):
+    """Render (once) and gzip a survey page."""
+    body = render_page(page, rows_per_page=rows_per_page, top_id=top_id, seed=seed)
+    return body, gzip.compress(body, compresslevel=6)
+
+
+@functools.lru_cache(maxsize=16384)
+def _result_page(result_id, seed):
+    """Render (once) and gzip a result detail page."""
+    body = render_result(result_id, seed=seed)
+    return body, gzip.compress(body, compresslevel=6)
+
+
+def _handler_for(server):
+    """Build a request handler class bound to a StandInServer."""
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Answer a survey, result or unknown-path request."""
+            status, body, headers = server.respond(self.path)
+            if isinstance(body, tuple):
+                plain, compressed = body
+                gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+                body = compressed if gzipped else plain
+                if gzipped:
+                    headers["Content-Encoding"] = "gzip"
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_args):
+            pass
+
+    return _Handler
+
+
+def main():
+    """Run the stand-in until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds per response.")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of 503s.")
+    parser.add_argument("--retry-after", type=int, default=None,
+                        help="Retry-After seconds sent with injected 503s.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = StandInServer(
+        args.pages, args.rows, args.latency, args.error_rate, retry_after=args.retry_after,
+        jitter=args.jitter, seed=args.seed, host=args.host, port=args.port,
+    )
+    print(f"Serving {args.pages} pages x {args.rows} rows at {server.url} (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
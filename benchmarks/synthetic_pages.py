@@ -0,0 +1,161 @@
+"""Synthetic GradCafe survey pages for benchmarks and local stand-ins.
+
+Pages mimic the markup of https://www.thegradcafe.com/survey/index.php:
+a results table where each entry is a main row (school, program/degree,
+date added, decision, links), a stats row of badges (term, citizenship,
+GPA/GRE) and, for some entries, a single-cell comment row. Result
+detail pages (``/result/<id>``) are a definition list of the entry's
+fields. Output is deterministic for a given page number (or ID) and seed.
+"""
+
+from __future__ import annotations
+
+import html
+import random
+
+UNIVERSITIES = [
+    "Stanford University", "Massachusetts Institute of Technology",
+    "Carnegie Mellon University", "Johns Hopkins University",
+    "University of British Columbia", "McGill University", "Georgetown University",
+    "University of Toronto", "Texas A&M University", "University of California, Berkeley",
+]
+PROGRAMS = [
+    "Computer Science", "Electrical and Computer Engineering", "Mathematics",
+    "Information Studies", "Public Health", "Economics", "Data Science",
+]
+DEGREES = ["PhD", "Masters", "MFA", "PsyD"]
+DECISIONS = ["Accepted", "Rejected", "Wait listed", "Interview", "Other"]
+TERMS = ["Fall 2026", "Spring 2026", "Fall 2025"]
+MONTHS = ["January", "February", "March", "April"]
+COMMENTS = [
+    "Got the email this morning &amp; still in shock!",
+    "Funded offer, RA position. <b>So happy</b>",
+    "Rejected after interview :( ",
+    "POI reached out first &mdash; fingers crossed for the rest.",
+]
+
+PAGE_HEAD = (
+    "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+    "<title>GradCafe Results</title>"
+    "<script>window.dataLayer = window.dataLayer || []; if (a < b && c > d) {}</script>"
+    "<style>.tw-table > tr { color: red; }</style></head><body>"
+    "<nav class=\"tw-flex\"><a href=\"/\">Home</a><a href=\"/survey\">Survey</a></nav>"
+    "<!-- <table>not the results table</table> -->"
+    "<div class=\"tw-overflow-hidden\"><table class=\"tw-min-w-full\"><thead>"
+    "<tr><th scope=\"col\">School</th><th scope=\"col\">Program</th>"
+    "<th scope=\"col\">Added On</th><th scope=\"col\">Decision</th>"
+    "<th scope=\"col\"><span class=\"tw-sr-only\">Actions</span></th></tr></thead>"
+    "<tbody class=\"tw-divide-y\">"
+)
+PAGE_TAIL = (
+    "</tbody></table></div>"
+    "<footer><table><tr><td>footer table</td></tr></table></footer>"
+    "</body></html>"
+)
+
+
+def _entry(rng, result_id, with_comment):
+    """Render the two or three rows of a single survey entry."""
+    uni = html.escape(rng.choice(UNIVERSITIES))
+    program = rng.choice(PROGRAMS)
+    degree = rng.choice(DEGREES)
+    decision = rng.choice(DECISIONS)
+    added = f"{rng.choice(MONTHS)} {rng.randint(1, 28)}, 2026"
+    badges = [rng.choice(TERMS), rng.choice(["International", "American", "Other"])]
+    if rng.random() < 0.7:
+        badges.append(f"GPA {rng.uniform(2.8, 4.0):.2f}")
+    if rng.random() < 0.3:
+        badges.append(f"GRE {rng.randint(300, 340)}")
+        badges.append(f"GRE V {rng.randint(140, 170)}")
+        badges.append(f"GRE AW {rng.choice(['3.5', '4.0', '4.5', '5.0'])}")
+
+    rows = [
+        "<tr>"
+        "<td class=\"tw-py-5 tw-pr-3 tw-text-sm tw-pl-3\"><div class=\"tw-flex tw-items-center\">"
+        f"<div class=\"tw-ml-2\"><div class=\"tw-font-medium\">{uni}</div></div></div></td>"
+        "<td class=\"tw-px-3 tw-py-5 tw-text-sm\"><div class=\"tw-text-gray-900\">"
+        f"<span>{program}</span>"
+        "<svg viewBox=\"0 0 2 2\" class=\"tw-mx-2 tw-inline\">"
+        "<circle cx=\"1\" cy=\"1\" r=\"1\"/></svg>"
+        f"<span class=\"tw-text-gray-500\">{degree}</span></div></td>"
+        f"<td class=\"tw-px-3 tw-py-5 tw-whitespace-nowrap\">\n  {added}\n</td>"
+        "<td class=\"tw-px-3 tw-py-5\"><div class=\"tw-inline-flex tw-rounded-md\">"
+        f"{decision} on {rng.randint(1, 28)} Feb</div></td>"
+        "<td class=\"tw-relative tw-py-5 tw-text-right\"><div class=\"tw-flex tw-gap-4\">"
+        f"<a href=\"/result/{result_id}\" class=\"tw-text-indigo-600\" "
+        "title=\"See &gt; more\">See More</a>"
+        "<a href=\"#\" class=\"tw-text-gray-400\">Report</a></div></td>"
+        "</tr>",
+        "<tr class=\"tw-border-none\"><td colspan=\"3\" class=\"tw-pb-4 tw-pl-3\">"
+        "<div class=\"tw-gap-2 tw-flex tw-flex-wrap\">"
+        + "".join(f"<div class=\"tw-inline-flex tw-items-center\">{b}</div>" for b in badges)
+        + "</div></td></tr>",
+    ]
+    if with_comment:
+        rows.append(
+            "<tr class=\"tw-border-none\"><td colspan=\"100%\" class=\"tw-pb-4\">"
+            f"<p class=\"tw-text-gray-500 tw-text-sm\">{rng.choice(COMMENTS)}</p></td></tr>"
+        )
+    return "".join(rows)
+
+
+def render_page(page_num, rows_per_page=20, top_id=1_000_000, seed=0):
+    """Render one survey page as UTF-8 bytes.
+
+    Args:
+        page_num (int): 1-based page number; result IDs decrease with page.
+        rows_per_page (int): Entries per page.
+        top_id (int): Result ID of the newest entry on page 1.
+        seed (int): Extra seed so different datasets can be generated.
+
+    Returns:
+        bytes: Page HTML.
+    """
+    rng = random.Random(page_num * 7919 + seed)
+    first = top_id - (page_num - 1) * rows_per_page
+    body = "".join(
+        _entry(rng, first - i, with_comment=rng.random() < 0.4)
+        for i in range(rows_per_page)
+    )
+    return (PAGE_HEAD + body + PAGE_TAIL).encode("utf-8")
+
+
+def render_result(result_id, seed=0):
+    """Render one ``/result/<id>`` detail page as UTF-8 bytes.
+
+    The page is a definition list of the entry's fields, like the real
+    result pages. Output is deterministic for a given ID and seed.
+
+    Args:
+        result_id (int): Result ID from the survey link.
+        seed (int): Extra seed so different datasets can be generated.
+
+    Returns:
+        bytes: Page HTML.
+    """
+    rng = random.Random(result_id * 104729 + seed)
+    fields = [
+        ("Institution", html.escape(rng.choice(UNIVERSITIES))),
+        ("Program", rng.choice(PROGRAMS)),
+        ("Degree Type", rng.choice(DEGREES)),
+        ("Degree's Country of Origin", rng.choice(["International", "American", "Other"])),
+        ("Decision", f"{rng.choice(DECISIONS)} on {rng.randint(1, 28)} Feb"),
+        ("Notification", f"on {rng.randint(1, 28)}/02/2026 via E-mail"),
+        ("Undergrad GPA", f"{rng.uniform(2.8, 4.0):.2f}"),
+        ("GRE General:", str(rng.randint(300, 340))),
+        ("GRE Verbal:", str(rng.randint(140, 170))),
+        ("Analytical Writing:", rng.choice(["3.5", "4.0", "4.5", "5.0"])),
+        ("Notes", rng.choice(COMMENTS)),
+    ]
+    body = "".join(
+        "<div class=\"tw-border-t tw-px-4 tw-py-6\">"
+        f"<dt class=\"tw-text-sm tw-font-medium\">{name}</dt>"
+        f"<dd class=\"tw-mt-1 tw-text-sm tw-text-gray-700\">{value}</dd></div>"
+        for name, value in fields
+    )
+    return (
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">"
+        f"<title>Result {result_id} | GradCafe</title></head><body>"
+        f"<main><h1>Result {result_id}</h1><dl class=\"tw-grid tw-grid-cols-1\">{body}</dl>"
+        "</main></body></html>"
+    ).encode("utf-8")
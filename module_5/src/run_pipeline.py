@@ -49,9 +49,10 @@ def run_full_pipeline():
     scrape_path = os.path.join(base_dir, "subprocess", "scrape.py")
     run_step("Scraper (scrape.py)", scrape_path)
 
-    # 2. Run clean.py
+    # 2. Run clean.py (only records changed since the last pull are re-cleaned;
+    # scores, dates and status/degree are typed and validated here)
     clean_path = os.path.join(base_dir, "subprocess", "clean.py")
-    run_step("Cleaner (clean.py)", clean_path)
+    run_step("Cleaner (clean.py)", clean_path, args=["--incremental", "--typed"])
 
     # 3. Run llm_hosting/app.py
     llm_app_path = os.path.join(base_dir, "subprocess", "llm_hosting", "app.py")
@@ -8,9 +8,56 @@ Author: Siva Govindarajan
 Date: January 2026
 """
 
-import json
+import argparse
+import collections
+import contextlib
+import importlib
+import itertools
 import re
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from clean_index import CleanIndex, clean_incremental, file_version
+from record_schema import ParquetSink, RecordTyper
+from record_stream import NDJSONWriter, iter_records
+from value_memo import MEMO_SIZE, ValueMemo, combine, format_stats
+
+# Every stats field in one alternation, so parse_stats() scans the raw text
+# once. The lookahead lets the regex engine skip straight to possible token
+# starts; "GRE V"/"GRE AW" are tried before plain "GRE". Patterns are lower
+# case: STATS_RE runs on lower-cased ASCII text (fast, case-sensitive
+# matching), STATS_RE_I on anything else.
+_STATS_PATTERN = (
+    r"(?=[gfswia])(?:"
+    r"g(?:pa\s*(?P<gpa>[\d.]+)"
+    r"|re(?: v\s*(?P<greV>\d+)| aw\s*(?P<greAW>[\d.]+)|\s*(?P<greScore>\d+)))"
+    r"|(?P<season>fall|spring|summer|winter)\s*(?P<year>\d{4})"
+    r"|(?P<nationality>international|american))"
+)
+STATS_RE = re.compile(_STATS_PATTERN)
+STATS_RE_I = re.compile(_STATS_PATTERN, re.I)
+SCORE_FIELDS = ("gpa", "greScore", "greV", "greAW")
+HTML_TAG_RE = re.compile(r'<[^>]+>')
+DEGREE_RE = re.compile(r"\s*(PhD|Master'?s?|M\.S\.|M\.A\.|M\.B\.A\.|M\.D\.|M\.E\.)\s*", re.I)
+MISSING_VALUES = frozenset({"n/a", "na", "none", "unknown", ""})
+# Records per task handed to a cleaning process; large enough that the
+# pickling round trip is small next to the cleaning work
+CHUNK_SIZE = 2000
+# "python" cleans record by record; "columnar" (clean_columnar.py, needs
+# pandas) cleans each field column of a batch once per distinct value
+ENGINES = ("python", "columnar")
+# Changes whenever this file does, so an incremental index built by an
+# older cleaner is discarded rather than trusted
+CLEAN_VERSION = file_version(__file__)
+SCHEMA_VERSION = file_version(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           "record_schema.py"))
+
+# How DataCleaner cleans: pool size (1 in-process, 0 or None every core),
+# records per pool task, engine (one of ENGINES), cached values per
+# process (0 disables the memo) and whether records come out typed
+CleanOptions = namedtuple("CleanOptions", "workers chunk_size engine memo_size typed",
+                          defaults=(1, CHUNK_SIZE, "python", MEMO_SIZE, False))
 
 
 class DataCleaner:
@@ -18,26 +65,76 @@ class DataCleaner:
 
     This class handles loading raw applicant data, removing HTML remnants,
     normalizing missing values, extracting structured data from raw text,
-    and saving cleaned results to JSON.
+    and saving cleaned results as NDJSON.
+
+    Records are streamed: load_data() and clean_data() only set up lazy
+    iterators, and save_data() pulls one record at a time through them, so
+    memory use stays flat however large the input is. iter_clean() exposes
+    the same cleaning for any iterable of records.
+
+    How records are cleaned is set by a CleanOptions. With workers > 1,
+    records are cleaned in chunk_size chunks on a process pool. Only a few
+    chunks per worker are in flight at once and results are yielded in
+    input order, so the output is identical to serial cleaning and memory
+    use stays bounded.
+
+    engine="columnar" hands whole batches to clean_columnar.ColumnarCleaner,
+    which produces the same records faster on large, repetitive inputs.
+
+    The per-record engine memoizes _clean_value and _clean_program in a
+    value_memo.ValueMemo of memo_size entries, so repeated strings are
+    cleaned once and share one interned result. save_data() prints the
+    hit rate and cache size (summed over worker processes).
+
+    save_incremental() replaces clean_data() + save_data() on re-runs: a
+    content-hash sidecar index (clean_index.py) lets it copy the cleaned
+    lines of unchanged records from the previous output and clean only
+    new or changed ones.
+
+    typed=True converts cleaned records to the record_schema types (float
+    scores, ISO dates, canonical status/degree) and counts invalid values;
+    save_data(parquet=...) also writes them to a Parquet file.
 
     Attributes:
-        data (list): List of applicant records loaded from JSON file.
+        data (iterable): Applicant records, lazily read from the input file.
+        options (CleanOptions): Workers, chunk size, engine, memo size and
+            typed output.
+        memo (ValueMemo): Cleaned-value cache, or None when disabled.
+        typer (RecordTyper): Schema converter, or None for string output.
     """
-    def __init__(self):
-        """Initialize the DataCleaner with an empty data list."""
+    def __init__(self, options=None):
+        """Initialize the DataCleaner with an empty data list.
+
+        Args:
+            options (CleanOptions, optional): How to clean; defaults to
+                CleanOptions() (in-process, python engine, memo on).
+
+        Raises:
+            ValueError: If the engine name is unknown.
+        """
+        options = options or CleanOptions()
+        if options.engine not in ENGINES:
+            raise ValueError(f"Unknown cleaning engine: {options.engine!r}")
         self.data = []
+        self.options = options
+        self.memo = ValueMemo(options.memo_size) if options.memo_size else None
+        # Latest memo counters of each pool worker, by process id
+        self._worker_memo = {}
+        self.typer = RecordTyper() if options.typed else None
 
     def load_data(self, filename="applicant_data.json"):
         """
-        Loads raw data from the JSON file generated by scrape.py.
+        Opens the file generated by scrape.py as a stream of records.
+
+        Both NDJSON and JSON array files are accepted; records are read
+        incrementally as they are consumed.
         """
         if not os.path.exists(filename):
             print(f"Error: {filename} not found. Run scrape.py first.")
             return
 
-        with open(filename, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
-        print(f"Loaded {len(self.data)} entries from {filename}")
+        self.data = iter_records(filename)
+        print(f"Streaming entries from {filename}")
 
     def clean_data(self):
         """Iterates through the dataset to sanitize fields.
@@ -45,29 +142,112 @@ class DataCleaner:
         Cleans each entry by calling specialized cleaning methods for
         different field types. Meets requirement:
         'SHOULD ensure data does not include any remnant HTML'.
+
+        Cleaning is lazy: entries are sanitized as save_data() consumes them.
+        """
+        self.data = self.iter_clean(self.data)
+        print("Data sanitization queued; entries are cleaned as they are saved.")
+
+    def iter_clean(self, records):
+        """Yield a sanitized copy of each record, one at a time.
+
+        Args:
+            records (iterable): Raw applicant record dicts, e.g. from
+                iter_records() or a list.
+
+        Yields:
+            dict: Cleaned record, in input order.
+        """
+        if self.typer is None:
+            yield from self._iter_clean_fields(records)
+        else:
+            yield from map(self.typer.type_record, self._iter_clean_fields(records))
+
+    def _iter_clean_fields(self, records):
+        """Yield cleaned (string-valued) records with the configured engine."""
+        workers = self.options.workers or os.cpu_count() or 1
+        if workers > 1:
+            yield from self._iter_clean_pool(records, workers)
+            return
+        if self.options.engine == "columnar":
+            yield from _columnar_cleaner().iter_clean(records)
+            return
+        for entry in records:
+            yield self._clean_entry(entry)
+
+    def _iter_clean_pool(self, records, workers):
+        """Clean records in chunks on a process pool, yielding in input order.
+
+        Chunks are submitted as the input is read, with at most two per
+        worker pending; the oldest chunk is always yielded first.
         """
-        cleaned_list = []
-
-        for entry in self.data:
-            cleaned_entry = {}
-            for key, value in entry.items():
-                if key == "program":
-                    # Special handling for program field to remove degree keywords
-                    cleaned_entry[key] = self._clean_program(value)
-                elif key != "raw":
-                    # Clean standard fields
-                    cleaned_entry[key] = self._clean_value(value)
-                else:
-                    # Parse statistics from raw text field
-                    extra_data = self.parse_stats(value)
-                    for extra_key, extra_value in extra_data.items():
-                        cleaned_entry[extra_key] = self._clean_value(extra_value)
-            cleaned_list.append(cleaned_entry)
-
-        self.data = cleaned_list
-        print("Data sanitization complete.")
+        records = iter(records)
+        chunk_size = self.options.chunk_size
+        chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+        pending = collections.deque()
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_clean_chunk_task, chunk, self.options.engine,
+                                           self.options.memo_size))
+                if len(pending) >= 2 * workers:
+                    yield from self._chunk_result(pending.popleft())
+            while pending:
+                yield from self._chunk_result(pending.popleft())
+        finally:
+            # Stop promptly if the consumer gives up early
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _chunk_result(self, future):
+        """Return a pool task's records, keeping its worker's memo counters."""
+        pid, memo_stats, cleaned = future.result()
+        if memo_stats is not None:
+            self._worker_memo[pid] = memo_stats
+        return cleaned
+
+    def memo_stats(self):
+        """Return the memo counters of this cleaner and its pool workers.
+
+        Returns:
+            dict: value_memo counters (hits, misses, evictions, bypassed,
+                entries, nbytes), or None if no value went through a memo.
+        """
+        snapshots = list(self._worker_memo.values())
+        if self.memo is not None and (self.memo.hits or self.memo.misses or self.memo.bypassed):
+            snapshots.append(self.memo.snapshot())
+        return combine(snapshots) if snapshots else None
+
+    def _clean_entry(self, entry):
+        """Return a sanitized copy of one applicant record."""
+        cleaned_entry = {}
+        for key, value in entry.items():
+            if key == "program":
+                # Special handling for program field to remove degree keywords
+                cleaned_entry[key] = self._clean_program(value)
+            elif key != "raw":
+                # Clean standard fields
+                cleaned_entry[key] = self._clean_value(value)
+            else:
+                # Parse statistics from raw text field
+                extra_data = self.parse_stats(value)
+                for extra_key, extra_value in extra_data.items():
+                    cleaned_entry[extra_key] = self._clean_value(extra_value)
+        return cleaned_entry
 
     def _clean_value(self, value):
+        """Clean a field value, through the memo cache when it is a string."""
+        if self.memo is not None and value.__class__ is str:
+            return self.memo.lookup("value", value, self._sanitize_value)
+        return self._sanitize_value(value)
+
+    def _clean_program(self, value):
+        """Clean a program name, through the memo cache when it is a string."""
+        if self.memo is not None and value.__class__ is str:
+            return self.memo.lookup("program", value, self._sanitize_program)
+        return self._sanitize_program(value)
+
+    @staticmethod
+    def _sanitize_value(value):
         """Clean individual string values.
 
         Private method to sanitize field values by removing HTML tags,
@@ -93,25 +273,28 @@ class DataCleaner:
             return value
 
         # Step 1: Remove remnant HTML tags (e.g., <span>, <br>, <a>)
-        value = re.sub(r'<[^>]+>', '', value)
+        if '<' in value:
+            value = HTML_TAG_RE.sub('', value)
 
-        # Step 2: Replace HTML entities, newlines, tabs with spaces
-        value = value.replace('&nbsp;', ' ').replace('\n', ' ').replace('\r', '').replace('\t', ' ')
+        # Step 2: Replace HTML entities with spaces and drop carriage returns
+        # (newlines and tabs are whitespace, handled by step 3)
+        if '&' in value:
+            value = value.replace('&nbsp;', ' ')
+        if '\r' in value:
+            value = value.replace('\r', '')
 
-        # Step 3: Collapse multiple consecutive spaces into one
-        value = re.sub(r'\s+', ' ', value)
-
-        # Step 4: Strip leading and trailing whitespace
-        value = value.strip()
+        # Steps 3-4: Collapse runs of whitespace into one space and strip the ends
+        value = ' '.join(value.split())
 
         # Step 5: Standardize unavailable/missing data to empty string
         # Meets requirement: 'SHOULD ensure unavailable data is maintained in a consistent format'
-        if value.lower() in ["n/a", "na", "none", "unknown", ""]:
+        if value.lower() in MISSING_VALUES:
             return ""
 
         return value
 
-    def _clean_program(self, value):
+    @staticmethod
+    def _sanitize_program(value):
         """Clean the program field by removing redundant degree information.
 
         Since degree information is already captured in a separate 'degree'
@@ -124,35 +307,82 @@ class DataCleaner:
         Returns:
             str: Cleaned program name with degree keywords removed.
         """
-        value = self._clean_value(value)
+        value = DataCleaner._sanitize_value(value)
 
         # Remove common degree keywords (PhD, Masters, M.S., M.A., etc.)
-        value = re.sub(
-            r"\s*(PhD|Master'?s?|M\.S\.|M\.A\.|M\.B\.A\.|M\.D\.|M\.E\.)\s*",
-            ' ', value, flags=re.I
-        )
+        value = DEGREE_RE.sub(' ', value)
 
         # Clean up any resulting multiple spaces
-        value = re.sub(r'\s+', ' ', value).strip()
+        return ' '.join(value.split())
 
-        return value
-
-    def save_data(self, filename="cleaned_applicant_data.json"):
-        """Save the sanitized data to a JSON file.
+    def save_data(self, filename="cleaned_applicant_data.json", parquet=None):
+        """Stream the sanitized data to an NDJSON file, one record per line.
 
         Args:
             filename (str): Output file path. Defaults to 'cleaned_applicant_data.json'.
+            parquet (str, optional): Also write the records to this Parquet
+                file (requires typed=True and pyarrow).
         """
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, indent=4)
-        print(f"Sanitized data saved to {filename}")
+        with NDJSONWriter(filename) as writer, self._parquet_sink(parquet) as sink:
+            for record in self.data:
+                writer.write(record)
+                if sink is not None:
+                    sink.write(record)
+        print(f"Sanitized {writer.count} entries saved to {filename}")
+        self._report(parquet)
+
+    def _parquet_sink(self, parquet):
+        """Return a ParquetSink for the path, or a no-op context if None."""
+        if parquet is None:
+            return contextlib.nullcontext()
+        if self.typer is None:
+            raise ValueError("Parquet output needs typed records (typed=True)")
+        return ParquetSink(parquet)
+
+    def _report(self, parquet=None):
+        """Print end-of-run memo and schema statistics."""
+        if parquet is not None:
+            print(f"Typed columns saved to {parquet}")
+        if self.typer is not None:
+            print(self.typer.summary())
+        stats = self.memo_stats()
+        if stats is not None:
+            print(format_stats(stats))
+
+    def save_incremental(self, filename="cleaned_applicant_data.json", index_path=None,
+                         parquet=None):
+        """Clean the loaded data into filename, re-cleaning only changed records.
+
+        Use instead of clean_data() + save_data(). Unchanged records are
+        copied from the previous output via the sidecar index; the output
+        is identical to a full run.
+
+        Args:
+            filename (str): NDJSON output file (and previous output).
+            index_path (str, optional): Sidecar index; defaults to
+                '<filename>.index'.
+            parquet (str, optional): Also write every record (copied ones
+                included) to this Parquet file (requires typed=True).
+        """
+        # Typed and string output differ, so each has its own index version
+        version = f"{CLEAN_VERSION}-{SCHEMA_VERSION}" if self.typer is not None else CLEAN_VERSION
+        index = CleanIndex(index_path or filename + ".index", version)
+        with self._parquet_sink(parquet) as sink:
+            total, cleaned, copied = clean_incremental(self.data, self.iter_clean, filename,
+                                                       index, sink=sink)
+        print(f"Sanitized {total} entries saved to {filename} "
+              f"({cleaned} cleaned, {copied} unchanged copied through)")
+        self._report(parquet)
 
     def parse_stats(self, stats_text):
         """Parse applicant statistics from raw text.
 
         Extracts structured data (GPA, GRE scores, student type, term) from
-        raw text using regex patterns. This is used during cleaning to populate
-        additional fields.
+        raw text in a single scan with the precompiled STATS_RE. Scores and
+        terms match case-insensitively and the first occurrence wins;
+        student type only counts when written exactly "International" or
+        "American", and "International" anywhere takes precedence. This is
+        used during cleaning to populate additional fields.
 
         Args:
             stats_text (str): Raw statistics text from scraped data.
@@ -161,52 +391,116 @@ class DataCleaner:
             dict: Dictionary with extracted fields like 'gpa', 'greScore',
                   'greV', 'greAW', 'US/International', 'term'.
         """
-        data = {}
-
-        # Extract GPA (format: "GPA 3.91" or similar)
-        gpa_match = re.search(r'GPA\s*([\d\.]+)', stats_text, re.I)
-        if gpa_match:
-            data['gpa'] = gpa_match.group(1)
-
-        # Extract GRE total score (format: "GRE 157" or similar)
-        gre_match = re.search(r'GRE\s*(\d+)', stats_text, re.I)
-        if gre_match:
-            data['greScore'] = gre_match.group(1)
-
-        # Extract GRE Verbal score (format: "GRE V 163" or similar)
-        gre_v_match = re.search(r'GRE V\s*(\d+)', stats_text, re.I)
-        if gre_v_match:
-            data['greV'] = gre_v_match.group(1)
-
-        # Extract GRE Analytical Writing score (format: "GRE AW 4.5" or similar)
-        gre_aw_match = re.search(r'GRE AW\s*([\d\.]+)', stats_text, re.I)
-        if gre_aw_match:
-            data['greAW'] = gre_aw_match.group(1)
-
-        # Extract student type (International or American)
-        if 'International' in stats_text:
+        if stats_text.isascii():
+            # Lower-casing ASCII keeps every offset, so values are sliced
+            # from the original text to keep their case
+            matches = STATS_RE.finditer(stats_text.lower())
+        else:
+            matches = STATS_RE_I.finditer(stats_text)
+
+        found = {}
+        nationalities = set()
+        for match in matches:
+            kind = match.lastgroup
+            if kind == "nationality":
+                nationalities.add(stats_text[match.start():match.end()])
+            elif kind == "year":
+                # Combined term field, e.g. "Fall 2026"
+                season = stats_text[match.start("season"):match.end("season")]
+                found.setdefault("term", season + " " + match.group(kind))
+            else:
+                found.setdefault(kind, match.group(kind))
+
+        data = {key: found[key] for key in SCORE_FIELDS if key in found}
+        if 'International' in nationalities:
             data['US/International'] = 'International'
-        elif 'American' in stats_text:
+        elif 'American' in nationalities:
             data['US/International'] = 'American'
+        if "term" in found:
+            data['term'] = found["term"]
+        return data
 
-        # Extract semester and year (format: "Fall 2026" or similar)
-        sem_year = re.search(r'(Fall|Spring|Summer|Winter)\s*(\d{4})', stats_text, re.I)
-        if sem_year:
-            # Combined term field
-            data['term'] = sem_year.group(1) + " " + sem_year.group(2)
 
-        return data
+# Per-process cleaner for pool tasks, so a worker's memo outlives one chunk
+_WORKER_CLEANER = None
+
+
+def _clean_chunk_task(records, engine, memo_size):
+    """Process-pool task: clean a chunk with this process's cleaner.
+
+    Returns:
+        tuple: (process id, memo counters or None, cleaned records).
+    """
+    global _WORKER_CLEANER  # pylint: disable=global-statement
+    if engine == "columnar":
+        return os.getpid(), None, _columnar_cleaner().clean_batch(records)
+    if _WORKER_CLEANER is None or _WORKER_CLEANER.options.memo_size != memo_size:
+        _WORKER_CLEANER = DataCleaner(CleanOptions(memo_size=memo_size))
+    cleaned = [_WORKER_CLEANER._clean_entry(entry) for entry in records]  # pylint: disable=protected-access
+    memo = _WORKER_CLEANER.memo
+    return os.getpid(), (memo.snapshot() if memo is not None else None), cleaned
+
+
+def _columnar_cleaner():
+    """Return a ColumnarCleaner; imported on use since it needs pandas."""
+    return importlib.import_module("clean_columnar").ColumnarCleaner()
+
+
+def iter_clean(records, options=None):
+    """Yield cleaned copies of raw applicant records (any iterable).
+
+    Convenience wrapper around DataCleaner.iter_clean(), e.g.
+    ``NDJSONWriter(path).write_many(iter_clean(iter_records(src)))``.
+    Pass e.g. ``CleanOptions(workers=0)`` to clean on a process pool of
+    every core, ``CleanOptions(engine="columnar")`` for the pandas column
+    engine, memo_size=0 to turn off the value memo or typed=True for
+    record_schema-typed records.
+    """
+    return DataCleaner(options).iter_clean(records)
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Clean scraped GradCafe records.")
+    arg_parser.add_argument("--in", dest="input", default="applicant_data.json",
+                        help="Scraper output, NDJSON or a JSON array (read incrementally).")
+    arg_parser.add_argument("--out", default="cleaned_applicant_data.json",
+                        help="Cleaned output file (NDJSON).")
+    arg_parser.add_argument("--workers", type=int, default=1,
+                        help="Cleaning processes (default 1; 0 uses every CPU core).")
+    arg_parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="Records per process-pool task.")
+    arg_parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="'python' (per record, default) or 'columnar' "
+                             "(pandas, per distinct value; for large batches).")
+    arg_parser.add_argument("--memo-size", type=int, default=MEMO_SIZE,
+                        help="Cleaned values cached per process (0 disables the memo).")
+    arg_parser.add_argument("--incremental", action="store_true",
+                        help="Only clean records whose content changed since the last "
+                             "--incremental run (uses a sidecar index next to --out).")
+    arg_parser.add_argument("--index", default=None,
+                        help="Sidecar index path for --incremental (default: <out>.index).")
+    arg_parser.add_argument("--typed", action="store_true",
+                        help="Write typed values: float GPA/GRE, ISO date_added, validated "
+                             "status/degree (invalid values become null and are reported).")
+    arg_parser.add_argument("--parquet", default=None,
+                        help="Also write the typed records to this Parquet file "
+                             "(implies --typed; needs pyarrow).")
+    args = arg_parser.parse_args()
+
     # Initialize cleaner and run the data cleaning pipeline
-    cleaner = DataCleaner()
+    cleaner = DataCleaner(CleanOptions(workers=args.workers, chunk_size=max(1, args.chunk_size),
+                                       engine=args.engine, memo_size=max(0, args.memo_size),
+                                       typed=args.typed or args.parquet is not None))
 
     # Step 1: Load raw data from the scraper output
-    cleaner.load_data("applicant_data.json")
+    cleaner.load_data(args.input)
 
-    # Step 2: Clean and standardize all fields
-    cleaner.clean_data()
+    if args.incremental:
+        # Steps 2-3: Clean new or changed records, copy the rest through
+        cleaner.save_incremental(args.out, args.index, parquet=args.parquet)
+    else:
+        # Step 2: Clean and standardize all fields
+        cleaner.clean_data()
 
-    # Step 3: Save cleaned data to output file
-    cleaner.save_data("cleaned_applicant_data.json")
+        # Step 3: Save cleaned data to output file
+        cleaner.save_data(args.out, parquet=args.parquet)
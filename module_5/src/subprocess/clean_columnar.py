@@ -0,0 +1,180 @@
+"""Column-oriented cleaning engine for large batch runs of clean.py.
+
+Fields such as status, degree, term and university repeat heavily across
+a crawl, so cleaning every cell separately redoes the same work over and
+over. ColumnarCleaner reads records in batches, splits each batch into
+columns, factorizes every column to its distinct strings and runs the
+DataCleaner steps (HTML stripping, entity and whitespace clean-up,
+missing-value normalization, degree-keyword removal, stats parsing) as
+pandas string kernels over those distinct values only. Cleaned values
+are then scattered back to the rows and records are rebuilt with the
+same keys, order and values as DataCleaner produces.
+
+The kernels run on object-dtype columns so they use Python's ``re`` and
+``str.split``; Arrow-backed string kernels use RE2, whose ``\\s`` and case
+folding differ for non-ASCII text and would change the output.
+
+pandas is optional: it is imported here only, and only this engine
+needs it (``pip install pandas``).
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from clean import DEGREE_RE, HTML_TAG_RE, MISSING_VALUES, DataCleaner
+
+# Records per batch; each batch is converted to columns and cleaned at once
+BATCH_SIZE = 50_000
+
+
+def _clean_strings(values, program=False):
+    """Apply the _clean_value (and _clean_program) steps to a string column.
+
+    Args:
+        values (pandas.Series): Object-dtype Series of str.
+        program (bool): Also remove degree keywords, as _clean_program does.
+
+    Returns:
+        pandas.Series: Cleaned strings, same index.
+    """
+    values = values.str.replace(HTML_TAG_RE, '', regex=True)
+    values = values.str.replace('&nbsp;', ' ', regex=False).str.replace('\r', '', regex=False)
+    values = values.str.split().str.join(' ')
+    values = values.mask(values.str.lower().isin(MISSING_VALUES), '')
+    if program:
+        values = values.str.replace(DEGREE_RE, ' ', regex=True).str.split().str.join(' ')
+    return values
+
+
+def clean_column(values, program=False):
+    """Clean one column of field values.
+
+    Each distinct string is cleaned once; None becomes "" and other
+    non-string values are passed through, like DataCleaner._clean_value.
+
+    Args:
+        values (sequence): Raw cell values of one field.
+        program (bool): Clean as the program field.
+
+    Returns:
+        list: Cleaned values, in row order.
+    """
+    column = pd.Series(values, dtype=object).to_numpy()
+    try:
+        codes, uniques = pd.factorize(column)
+    except TypeError:
+        # Unhashable cells (e.g. lists): clean value by value instead
+        cleaner = DataCleaner()
+        clean = cleaner._clean_program if program else cleaner._clean_value  # pylint: disable=protected-access
+        return [clean(value) for value in values]
+
+    is_str = np.fromiter((isinstance(u, str) for u in uniques), dtype=bool, count=len(uniques))
+    # One slot per distinct value plus a last one, which code -1 (None/NaN) picks
+    lookup = np.empty(len(uniques) + 1, dtype=object)
+    lookup[:-1][is_str] = _clean_strings(pd.Series(uniques[is_str], dtype=object),
+                                         program).to_numpy(dtype=object)
+    lookup[-1] = ""
+    cleaned = lookup[codes]
+
+    # Non-string values pass through unchanged (factorize may have merged
+    # equal ones like 1 and True), and so does NaN, which factorize treats as missing
+    keep = ~np.append(is_str, True)[codes]
+    cleaned[keep] = column[keep]
+    for row in np.flatnonzero(codes == -1):
+        if column[row] is not None:
+            cleaned[row] = column[row]
+    return cleaned.tolist()
+
+
+def parse_stats_column(raws):
+    """Parse the stats text of every row, once per distinct text.
+
+    Args:
+        raws (list): Raw stats strings.
+
+    Returns:
+        list: One dict of cleaned stats fields per row (rows with the same
+            text share one dict; treat them as read-only).
+
+    Raises:
+        AttributeError: If a row is not a string (e.g. None), like the
+            python engine.
+    """
+    codes, uniques = pd.factorize(np.array(raws, dtype=object))
+    cleaner = DataCleaner()
+
+    def parse(text):
+        stats = cleaner.parse_stats(text)
+        return {key: cleaner._clean_value(value)  # pylint: disable=protected-access
+                for key, value in stats.items()}
+
+    parsed = [parse(text) for text in uniques]
+    # factorize gives None and NaN code -1, which is not an index into
+    # uniques; those rows are parsed one by one so they fail exactly as
+    # DataCleaner.parse_stats does
+    return [parsed[code] if code >= 0 else parse(raw) for code, raw in zip(codes, raws)]
+
+
+class ColumnarCleaner:
+    """Batch, column-at-a-time replacement for DataCleaner.iter_clean().
+
+    Attributes:
+        batch_size (int): Records converted to columns at once.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        """Initialize the engine.
+
+        Args:
+            batch_size (int): Records per batch; bounds memory use.
+        """
+        self.batch_size = batch_size
+
+    def iter_clean(self, records):
+        """Yield a sanitized copy of each record, in input order.
+
+        Args:
+            records (iterable): Raw applicant record dicts.
+
+        Yields:
+            dict: Cleaned record, identical to DataCleaner's output.
+        """
+        records = iter(records)
+        for batch in iter(lambda: list(itertools.islice(records, self.batch_size)), []):
+            yield from self.clean_batch(batch)
+
+    @staticmethod
+    def clean_batch(batch):
+        """Return cleaned copies of a list of records.
+
+        Records are grouped by their key sequence (usually one group per
+        batch); each group is transposed into columns with zip() and every
+        column is cleaned at once.
+        """
+        groups = {}
+        for row, entry in enumerate(batch):
+            groups.setdefault(tuple(entry), []).append(row)
+
+        results = [{} for _ in batch]
+        for keys, rows in groups.items():
+            columns = zip(*(batch[row].values() for row in rows))
+            cleaned = [
+                parse_stats_column(values) if key == "raw"
+                else clean_column(values, program=key == "program")
+                for key, values in zip(keys, columns)
+            ]
+            if "raw" not in keys:
+                for row, values in zip(rows, zip(*cleaned)):
+                    results[row] = dict(zip(keys, values))
+                continue
+            # Stats parsed from "raw" take its place; like DataCleaner, a
+            # later field with the same name overwrites the parsed value
+            split = keys.index("raw")
+            for row, values in zip(rows, zip(*cleaned)):
+                entry = dict(zip(keys[:split], values[:split]))
+                entry.update(values[split])
+                entry.update(zip(keys[split + 1:], values[split + 1:]))
+                results[row] = entry
+        return results
@@ -0,0 +1,230 @@
+"""Incremental cleaning keyed by raw record content hash.
+
+A cleaning run can leave a sidecar index next to its NDJSON output
+(``<out>.index`` by default). The index maps the content hash of every
+raw record to the byte range of its cleaned line in the output:
+
+* line 1 - a JSON header: cleaner version, output size and record count.
+* then one ``<hash> <offset> <length>`` line per output record.
+
+On the next run each raw record is hashed; records whose hash is in the
+index have their cleaned line copied from the previous output unchanged,
+and only new or changed records are cleaned. The index is discarded (and
+everything re-cleaned) when the cleaner version changes or the output
+file no longer matches the index. New output and index are written to
+temporary files and moved into place, so an interrupted run leaves the
+previous pair intact.
+"""
+
+import collections
+import hashlib
+import json
+import os
+
+_ENTRY_SEP = " "
+# Output slots that may wait behind records still being cleaned (a
+# process pool reads ahead); past this the clean() stream is drained and
+# a new one started, so memory stays bounded when a few changed records
+# are spread over a large input
+MAX_PENDING = 200_000
+
+
+def content_hash(record):
+    """Return a hex digest of a raw record's content (keys in order)."""
+    data = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def file_version(path):
+    """Return a short digest of a file's bytes, e.g. the cleaner's source."""
+    with open(path, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+class CleanIndex:
+    """Content hash -> cleaned line location in a previous output file.
+
+    Attributes:
+        path (str): Index file path.
+        version (str): Cleaner version the entries were produced with.
+        entries (dict): Content hash -> (offset, length) in the output.
+    """
+
+    def __init__(self, path, version):
+        """Initialize an empty index.
+
+        Args:
+            path (str): Index file path.
+            version (str): Current cleaner version.
+        """
+        self.path = path
+        self.version = version
+        self.entries = {}
+
+    def load(self, output_path):
+        """Read the index if it is current and matches output_path.
+
+        Args:
+            output_path (str): The NDJSON file the index describes.
+
+        Returns:
+            bool: True if entries were loaded; False if the index is
+                missing, stale or does not match the output (entries stay
+                empty, so every record is cleaned).
+        """
+        self.entries = {}
+        if not (os.path.exists(self.path) and os.path.exists(output_path)):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            try:
+                header = json.loads(f.readline())
+            except json.JSONDecodeError:
+                return False
+            if (header.get("version") != self.version
+                    or header.get("output_size") != os.path.getsize(output_path)):
+                return False
+            entries = {}
+            for line in f:
+                digest, offset, length = line.split(_ENTRY_SEP)
+                entries[digest] = (int(offset), int(length))
+        self.entries = entries
+        return True
+
+    def save(self, entries, output_size, records):
+        """Atomically replace the index file.
+
+        Args:
+            entries (iterable): (hash, offset, length) per output record.
+            output_size (int): Byte size of the output the entries describe.
+            records (int): Number of records in the output.
+        """
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"version": self.version, "output_size": output_size,
+                                "records": records}) + "\n")
+            for digest, offset, length in entries:
+                f.write(f"{digest}{_ENTRY_SEP}{offset}{_ENTRY_SEP}{length}\n")
+        os.replace(tmp_path, self.path)
+
+
+class _OutputWriter:
+    """Appends cleaned and copied lines to the new output, in order.
+
+    Attributes:
+        entries (list): (hash, offset, length) of every line written.
+        offset (int): Bytes written so far.
+        cleaned (int): Lines produced by the cleaner.
+        copied (int): Lines copied from the previous output.
+    """
+
+    def __init__(self, out, previous, sink):
+        """Initialize the writer.
+
+        Args:
+            out (file): New output, opened for binary writing.
+            previous (file): Previous output, or None if nothing is copied.
+            sink (optional): Object with write(record) that also receives
+                every record; copied lines are decoded for it.
+        """
+        self._out = out
+        self._previous = previous
+        self._sink = sink
+        self.entries = []
+        self.offset = 0
+        self.cleaned = 0
+        self.copied = 0
+
+    def write_cleaned(self, digest, record):
+        """Write a freshly cleaned record."""
+        self.cleaned += 1
+        self._write(digest, json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n", record)
+
+    def write_copy(self, digest, location):
+        """Copy a record's cleaned line from the previous output."""
+        self._previous.seek(location[0])
+        line = self._previous.read(location[1])
+        self.copied += 1
+        self._write(digest, line, json.loads(line) if self._sink is not None else None)
+
+    def _write(self, digest, line, record):
+        if self._sink is not None:
+            self._sink.write(record)
+        self._out.write(line)
+        self.entries.append((digest, self.offset, len(line)))
+        self.offset += len(line)
+
+
+def _write_segment(records, clean, known, writer):
+    """Write records through one clean() stream until the queue fills up.
+
+    The planning step, changed(), hashes each input record: new or changed
+    ones are queued and handed to clean(); unchanged ones are written at
+    once unless an earlier record is still being cleaned, in which case
+    they wait in the queue behind it. The write step takes each cleaned
+    record from clean() and then every copy queued behind it.
+
+    Returns:
+        bool: True once records is exhausted; False if the segment ended
+            early because MAX_PENDING slots were queued.
+    """
+    # Output slots still to be written: (hash, None) for a record being
+    # cleaned, (hash, location) for a copy queued behind one
+    plan = collections.deque()
+    exhausted = True
+
+    def changed():
+        nonlocal exhausted
+        for record in records:
+            digest = content_hash(record)
+            location = known.get(digest)
+            if location is None:
+                plan.append((digest, None))
+                yield record
+            elif plan:
+                plan.append((digest, location))
+            else:
+                writer.write_copy(digest, location)
+            if len(plan) >= MAX_PENDING:
+                exhausted = False
+                return
+
+    for record in clean(changed()):
+        writer.write_cleaned(plan.popleft()[0], record)
+        while plan and plan[0][1] is not None:
+            writer.write_copy(*plan.popleft())
+    return exhausted
+
+
+def clean_incremental(records, clean, output_path, index, sink=None):
+    """Write cleaned NDJSON for records, re-cleaning only changed ones.
+
+    Args:
+        records (iterable): Raw record dicts, in output order.
+        clean (callable): Maps an iterable of raw records to their cleaned
+            records in the same order (e.g. DataCleaner.iter_clean); it
+            only ever sees new or changed records, and may be called more
+            than once on a large input.
+        output_path (str): NDJSON output; also the previous output that
+            unchanged lines are copied from.
+        index (CleanIndex): Sidecar index, rewritten for the new output.
+        sink (optional): Object with write(record) that also receives
+            every output record; copied lines are decoded for it.
+
+    Returns:
+        tuple: (records written, records cleaned, records copied).
+    """
+    index.load(output_path)
+    tmp_path = output_path + ".tmp"
+    previous = open(output_path, "rb") if index.entries else None  # pylint: disable=consider-using-with
+    try:
+        with open(tmp_path, "wb") as out:
+            writer = _OutputWriter(out, previous, sink)
+            records = iter(records)
+            while not _write_segment(records, clean, index.entries, writer):
+                pass
+    finally:
+        if previous is not None:
+            previous.close()
+    os.replace(tmp_path, output_path)
+    index.save(writer.entries, writer.offset, len(writer.entries))
+    return len(writer.entries), writer.cleaned, writer.copied
@@ -0,0 +1,189 @@
+"""Concurrent, rate-limited page fetcher for GradCafe scraping.
+
+Pages are fetched ahead of the consumer on a small thread pool while a
+token bucket caps the global request rate. Results are always yielded in
+page order, so callers can keep their stop-at-first-known-URL logic, and
+closing the iterator cancels any work that is still queued and stops
+in-flight retries.
+"""
+
+from __future__ import annotations
+
+import collections
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from retry import FetchCancelled
+
+
+class TokenBucket:  # pylint: disable=too-few-public-methods
+    """Thread-safe token bucket rate limiter.
+
+    Args:
+        rate: Tokens added per second. ``None`` or ``<= 0`` disables limiting.
+        capacity: Maximum burst size in tokens.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate) if rate else 0.0
+        self.capacity = max(1.0, float(capacity))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """Block until a token is available, then consume it.
+
+        Args:
+            stop: Optional threading.Event; once set, waiting ends early
+                without a token.
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            if stop is None:
+                time.sleep(wait)
+            elif stop.wait(wait):
+                return
+
+
+class FetchStats:
+    """Throughput counters for a single scrape run."""
+
+    def __init__(self):
+        self.pages = 0
+        self.records = 0
+        self.bytes = 0
+        self._started = time.monotonic()
+        self._finished = None
+        self._lock = threading.Lock()
+
+    def add_page(self, nbytes):
+        """Record one fetched page of ``nbytes`` bytes."""
+        with self._lock:
+            self.pages += 1
+            self.bytes += nbytes
+
+    def add_records(self, count):
+        """Record ``count`` parsed records."""
+        with self._lock:
+            self.records += count
+
+    def finish(self):
+        """Freeze the elapsed time."""
+        self._finished = time.monotonic()
+
+    @property
+    def elapsed(self):
+        """Seconds since the run started (or until finish() was called)."""
+        end = self._finished if self._finished is not None else time.monotonic()
+        return max(end - self._started, 1e-9)
+
+    @property
+    def pages_per_sec(self):
+        """Fetched pages per second."""
+        return self.pages / self.elapsed
+
+    @property
+    def records_per_sec(self):
+        """Parsed records per second."""
+        return self.records / self.elapsed
+
+    def summary(self):
+        """Return a one-line human readable summary."""
+        return (
+            f"{self.pages} pages, {self.records} records in {self.elapsed:.2f}s "
+            f"({self.pages_per_sec:.2f} pages/s, {self.records_per_sec:.2f} records/s)"
+        )
+
+
+class PageFetcher:  # pylint: disable=too-few-public-methods
+    """Fetch pages concurrently and yield them in page order.
+
+    Args:
+        fetch: Callable taking a page number and returning raw bytes.
+        concurrency: Maximum number of in-flight requests (also the
+            read-ahead depth).
+        rate: Maximum requests per second across all threads.
+        burst: Token bucket capacity.
+        limiter: Optional object with an ``acquire(stop=None)`` method used instead
+            of a private TokenBucket (e.g. a limit shared between processes);
+            ``rate`` and ``burst`` are then ignored.
+        retry: Optional RetryPolicy; each page is then fetched through
+            ``retry.call()`` so transient failures are retried (taking a
+            fresh token per attempt) before an error reaches the caller.
+        stats: Optional FetchStats to update.
+        process: Optional ``process(page_num, body)`` hook run on the fetch
+            thread right after each fetch; its return value is yielded in
+            place of the body (e.g. a future from a parse stage).
+    """
+
+    def __init__(self, fetch, concurrency=4, rate=2.0, *,  # pylint: disable=too-many-arguments
+                 burst=1, limiter=None, retry=None, stats=None, process=None):
+        self.fetch = fetch
+        self.concurrency = max(1, int(concurrency))
+        self.bucket = limiter if limiter is not None else TokenBucket(rate, burst)
+        self.retry = retry
+        self.stats = stats if stats is not None else FetchStats()
+        self.process = process
+
+    def _fetch_one(self, page_num, stop):
+        """Wait for a rate-limit token, then fetch (and optionally process) a page.
+
+        Raises FetchCancelled instead once ``stop`` is set.
+        """
+        if self.retry is not None:
+            body = self.retry.call(self.fetch, page_num, self.bucket, stop)
+        else:
+            self.bucket.acquire(stop)
+            if stop.is_set():
+                raise FetchCancelled("fetch stage stopped")
+            body = self.fetch(page_num)
+        if body is not None:
+            self.stats.add_page(len(body))
+        if self.process is not None:
+            return self.process(page_num, body)
+        return body
+
+    def iter_pages(self, page_numbers):
+        """Yield ``(page_num, body)`` tuples in the order of ``page_numbers``.
+
+        ``page_numbers`` may be unbounded (e.g. ``itertools.count(1)``).
+
+        Up to ``concurrency`` pages are fetched ahead of the caller. A fetch
+        error is raised when its page is reached, after all earlier pages have
+        been yielded. Closing the generator (e.g. ``break`` in the caller)
+        cancels pages that have not started yet, stops the retries and
+        rate-limit waits of the fetches already running and waits for those
+        threads, so nothing touches the fetch callable, the limiter or the
+        ``process`` hook after it returns.
+        """
+        pages = iter(page_numbers)
+        pool = ThreadPoolExecutor(max_workers=self.concurrency)
+        stop = threading.Event()
+        window = collections.deque()
+        try:
+            for page in itertools.islice(pages, self.concurrency):
+                window.append((page, pool.submit(self._fetch_one, page, stop)))
+
+            while window:
+                page, future = window.popleft()
+                body = future.result()
+                for nxt in itertools.islice(pages, 1):
+                    window.append((nxt, pool.submit(self._fetch_one, nxt, stop)))
+                yield page, body
+        finally:
+            stop.set()
+            for _, future in window:
+                future.cancel()
+            pool.shutdown(wait=True, cancel_futures=True)
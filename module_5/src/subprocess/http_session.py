@@ -0,0 +1,160 @@
+"""Persistent keep-alive HTTP session for GradCafe fetches.
+
+Wraps a urllib3 PoolManager so consecutive page requests reuse pooled
+TCP/TLS connections instead of paying a fresh handshake each time. The
+session asks for gzip/deflate bodies, decompresses them transparently and
+keeps counters for connection reuse, bytes saved by compression and
+responses per HTTP status (so throttling such as 429/503 is visible).
+"""
+
+from __future__ import annotations
+
+import collections
+import gzip
+import threading
+import zlib
+
+import urllib3
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/119.0.0.0 Safari/537.36"
+    ),
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+
+class FetchError(OSError):
+    """Raised when a request fails at the transport level or returns >= 400.
+
+    Attributes:
+        status: HTTP status code, or None for transport errors.
+        headers: Response headers, or an empty dict for transport errors.
+    """
+
+    def __init__(self, message, status=None, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def decode_body(raw, content_encoding):
+    """Decompress a response body according to its Content-Encoding."""
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+class HTTPSession:  # pylint: disable=too-many-instance-attributes
+    """Thread-safe pooled HTTP session.
+
+    Args:
+        headers: Headers sent with every request (merged over DEFAULT_HEADERS).
+        maxsize: Maximum pooled connections per host; extra callers block.
+        timeout: Per-request timeout in seconds.
+
+    Attributes:
+        statuses (collections.Counter): Responses per HTTP status code, plus
+            ``"error"`` for requests that failed before a response arrived.
+    """
+
+    def __init__(self, headers=None, maxsize=4, timeout=30.0):
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self._pool = urllib3.PoolManager(
+            maxsize=maxsize,
+            block=True,
+            retries=False,
+            timeout=urllib3.Timeout(total=timeout),
+            headers=self.headers,
+        )
+        self._lock = threading.Lock()
+        self._host_pools = {}
+        self.requests = 0
+        self.bytes_on_wire = 0
+        self.bytes_decoded = 0
+        self.statuses = collections.Counter()
+
+    def get(self, url, fields=None):
+        """GET ``url`` and return the decompressed body.
+
+        Args:
+            url: Absolute URL.
+            fields: Optional query parameters.
+
+        Returns:
+            bytes: Response body.
+
+        Raises:
+            FetchError: On transport failure or an HTTP status >= 400.
+        """
+        try:
+            resp = self._pool.request(
+                "GET", url, fields=fields, preload_content=False, decode_content=False,
+            )
+        except urllib3.exceptions.HTTPError as exc:
+            self._count_status("error")
+            raise FetchError(f"GET {url} failed: {exc}") from exc
+
+        try:
+            raw = resp.read(decode_content=False)
+        except urllib3.exceptions.HTTPError as exc:
+            self._count_status("error")
+            raise FetchError(f"GET {url} failed while reading: {exc}") from exc
+        finally:
+            resp.release_conn()
+
+        self._count_status(resp.status)
+        if resp.status >= 400:
+            raise FetchError(f"GET {url} returned HTTP {resp.status}",
+                             status=resp.status, headers=dict(resp.headers))
+
+        body = decode_body(raw, resp.headers.get("Content-Encoding"))
+        with self._lock:
+            self.requests += 1
+            self.bytes_on_wire += len(raw)
+            self.bytes_decoded += len(body)
+            pool = self._pool.connection_from_url(url)
+            self._host_pools[id(pool)] = pool
+        return body
+
+    def _count_status(self, status):
+        with self._lock:
+            self.statuses[status] += 1
+
+    @property
+    def connections_opened(self):
+        """Number of TCP connections opened across all host pools."""
+        return sum(pool.num_connections for pool in self._host_pools.values())
+
+    @property
+    def connections_reused(self):
+        """Number of requests served over an already-open connection."""
+        return max(0, self.requests - self.connections_opened)
+
+    @property
+    def bytes_saved(self):
+        """Bytes not transferred thanks to content compression."""
+        return max(0, self.bytes_decoded - self.bytes_on_wire)
+
+    def summary(self):
+        """Return a one-line human readable summary of the counters."""
+        return (
+            f"{self.requests} requests over {self.connections_opened} connections "
+            f"({self.connections_reused} reused), {self.bytes_on_wire} bytes on wire, "
+            f"{self.bytes_saved} bytes saved by compression; statuses "
+            + (" ".join(f"{s}:{n}" for s, n in sorted(self.statuses.items(), key=str)) or "-")
+        )
+
+    def close(self):
+        """Close all pooled connections."""
+        self._pool.clear()
@@ -7,13 +7,20 @@ import json
 import os
 import re
 import sys
-import difflib
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+import itertools
+from typing import Any, Dict, Iterator, List, Tuple
 
 from flask import Flask, jsonify, request
 from huggingface_hub import hf_hub_download
 from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
 
+from batch_plan import standardize_rows
+from generation_stats import GenerationStats
+from result_cache import ResultCache, prompt_version
+from rules import CanonicalRules, ResolverStats
+
 app = Flask(__name__)
 
 # ---------------- Model config ----------------
@@ -30,6 +37,16 @@ N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
 N_CTX = int(os.getenv("N_CTX", "2048"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "30"))  # 0 → CPU-only
 
+# Persistent result cache shared by /standardize and --file ("" disables it)
+STD_CACHE_PATH = os.getenv("STD_CACHE_PATH", "standardize_cache.sqlite3")
+STD_CACHE_MAX_ENTRIES = int(os.getenv("STD_CACHE_MAX_ENTRIES", "200000"))
+# Answer rows whose fields map confidently to canonical names without the
+# model ("0" sends every row to the cache/model)
+RULES_FIRST = os.getenv("RULES_FIRST", "1") != "0"
+
+# Rows per --file chunk; each chunk's distinct pairs are standardized once
+BATCH_ROWS = int(os.getenv("BATCH_ROWS", "500"))
+
 CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
 CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
 
@@ -110,7 +127,21 @@ FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
     ),
 ]
 
+# Changes whenever the prompt, few-shots, fix-up tables or canonical lists
+# do, so cached results from an older prompt are never reused
+PROMPT_VERSION = prompt_version(
+    SYSTEM_PROMPT, FEW_SHOTS, ABBREV_UNI, COMMON_UNI_FIXES, COMMON_PROG_FIXES,
+    CANON_UNIS, CANON_PROGS,
+)
+
+RULES = CanonicalRules(CANON_PROGS, CANON_UNIS, ABBREV_UNI, COMMON_UNI_FIXES, COMMON_PROG_FIXES)
+RESOLVER_STATS = ResolverStats()
+GENERATION_STATS = GenerationStats()
+
 _LLM: Llama | None = None
+# llama.cpp contexts are not thread-safe
+_LLM_LOCK = threading.Lock()
+_CACHE: ResultCache | None = None
 
 
 def _load_llm() -> Llama:
@@ -137,6 +168,18 @@ def _load_llm() -> Llama:
     return _LLM
 
 
+def _get_cache() -> ResultCache | None:
+    """Open (or reuse) the persistent result cache; None when disabled."""
+    global _CACHE  # pylint: disable=global-statement
+    if _CACHE is None and STD_CACHE_PATH:
+        _CACHE = ResultCache(
+            STD_CACHE_PATH,
+            namespace=f"{MODEL_REPO}/{MODEL_FILE}@{PROMPT_VERSION}",
+            max_entries=STD_CACHE_MAX_ENTRIES,
+        )
+    return _CACHE
+
+
 def _split_fallback(text: str) -> Tuple[str, str]:
     """Simple, rules-first parser if the model returns non-JSON."""
     s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
@@ -162,50 +205,61 @@ def _split_fallback(text: str) -> Tuple[str, str]:
     return prog, uni
 
 
-def _best_match(name: str, candidates: List[str], cutoff: float = 0.86) -> str | None:
-    """Fuzzy match via difflib (lightweight, Replit-friendly)."""
-    if not name or not candidates:
-        return None
-    matches = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
-
-
 def _post_normalize_program(prog: str) -> str:
     """Apply common fixes, title case, then canonical/fuzzy mapping."""
-    p = (prog or "").strip()
-    p = COMMON_PROG_FIXES.get(p, p)
-    p = p.title()
-    if p in CANON_PROGS:
-        return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.84)
-    return match or p
+    p = RULES.clean_program(prog)
+    return RULES.match_program(p, cutoff=0.84) or p
 
 
 def _post_normalize_university(uni: str) -> str:
     """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
-    u = (uni or "").strip()
-
-    # Abbreviations
-    for pat, full in ABBREV_UNI.items():
-        if re.fullmatch(pat, u):
-            u = full
-            break
-
-    # Common spelling fixes
-    u = COMMON_UNI_FIXES.get(u, u)
-
-    # Normalize 'Of' → 'of'
-    if u:
-        u = re.sub(r"\bOf\b", "of", u.title())
-
-    # Canonical or fuzzy map
-    if u in CANON_UNIS:
-        return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.86)
-    return match or u or "Unknown"
+    u = RULES.clean_university(uni)
+    return RULES.match_university(u, cutoff=0.86) or u or "Unknown"
 
 
 def _call_llm(program_text: str, university_text: str = "") -> Dict[str, str]:
+    """Return standardized fields from the rules, the result cache or the tiny LLM."""
+    started = time.perf_counter()
+    if RULES_FIRST:
+        resolved = RULES.resolve(program_text, university_text)
+        if resolved is not None:
+            RESOLVER_STATS.record("rules", started)
+            return resolved
+    cache = _get_cache()
+    if cache is not None:
+        cached = cache.get(program_text, university_text)
+        if cached is not None:
+            RESOLVER_STATS.record("cache", started)
+            return cached
+    result = _run_llm(program_text, university_text)
+    if cache is not None:
+        cache.put(program_text, university_text, result)
+    RESOLVER_STATS.record("model", started)
+    return result
+
+
+def _timed_completion(llm: Llama, messages: List[Dict[str, str]]) -> str:
+    """Stream one chat completion, recording its timings, and return the text."""
+    with _LLM_LOCK:
+        started = time.perf_counter()
+        first_token = None
+        parts = []
+        for chunk in llm.create_chat_completion(
+            messages=messages,
+            temperature=0.0,
+            max_tokens=128,
+            top_p=1.0,
+            stream=True,
+        ):
+            if first_token is None:
+                first_token = time.perf_counter()
+            parts.append(chunk["choices"][0]["delta"].get("content") or "")
+        finished = time.perf_counter()
+    GENERATION_STATS.record((first_token or finished) - started, finished - started)
+    return "".join(parts).strip()
+
+
+def _run_llm(program_text: str, university_text: str = "") -> Dict[str, str]:
     """Query the tiny LLM and return standardized fields."""
     llm = _load_llm()
 
@@ -230,14 +284,7 @@ def _call_llm(program_text: str, university_text: str = "") -> Dict[str, str]:
         }
     )
 
-    out = llm.create_chat_completion(
-        messages=messages,
-        temperature=0.0,
-        max_tokens=128,
-        top_p=1.0,
-    )
-
-    text = (out["choices"][0]["message"]["content"] or "").strip()
+    text = _timed_completion(llm, messages)
     try:
         match = JSON_OBJ_RE.search(text)
         obj = json.loads(match.group(0) if match else text)
@@ -269,22 +316,55 @@ def health() -> Any:
     return jsonify({"ok": True})
 
 
+@app.get("/cache/stats")
+def cache_stats() -> Any:
+    """Report result cache hit/miss counters for this process."""
+    cache = _get_cache()
+    return jsonify(cache.stats() if cache is not None else {"enabled": False})
+
+
+@app.get("/resolver/stats")
+def resolver_stats() -> Any:
+    """Report how many rows skipped the model (rules/cache) in this process."""
+    return jsonify(RESOLVER_STATS.summary())
+
+
+@app.get("/generation/stats")
+def generation_stats() -> Any:
+    """Report model calls, mean time to first token and rows/sec."""
+    return jsonify(GENERATION_STATS.summary())
+
+
 @app.post("/standardize")
 def standardize() -> Any:
     """Standardize rows from an HTTP request and return JSON."""
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        university_text = (row or {}).get("university") or ""
-        result = _call_llm(program_text, university_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
+    batch = standardize_rows(rows, _call_llm)
+    return jsonify({"rows": rows, "batch": batch})
 
-    return jsonify({"rows": out})
+
+def _iter_file_rows(in_path: str) -> Iterator[Dict[str, Any]]:
+    """Yield rows from a JSON file (list or {'rows': [...]}) or a JSONL file.
+
+    JSONL input is read one line at a time, so large files are never held
+    in memory; JSON documents are loaded whole.
+    """
+    with open(in_path, "r", encoding="utf-8") as f:
+        first = next((line for line in f if line.strip()), "")
+        try:
+            row = json.loads(first)
+        except json.JSONDecodeError:
+            row = None
+        if isinstance(row, dict) and not isinstance(row.get("rows"), list):
+            yield row
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+            return
+        f.seek(0)
+        yield from _normalize_input(json.load(f))
 
 
 def _cli_process_file(
@@ -293,9 +373,8 @@ def _cli_process_file(
     append: bool,
     to_stdout: bool,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
+    """Process a JSON or JSONL file and write JSONL incrementally."""
+    rows = _iter_file_rows(in_path)
 
     if to_stdout:
         _write_rows(rows, sys.stdout)
@@ -305,19 +384,30 @@ def _cli_process_file(
         with open(out_path, mode, encoding="utf-8") as sink:
             _write_rows(rows, sink)
 
+    cache = _get_cache()
+    if cache is not None:
+        # stderr, so --stdout output stays pure JSON Lines
+        print(f"Result cache: {json.dumps(cache.stats())}", file=sys.stderr)
+    print(f"Resolver: {json.dumps(RESOLVER_STATS.summary())}", file=sys.stderr)
+    print(f"Generation: {json.dumps(GENERATION_STATS.summary())}", file=sys.stderr)
+
 
 def _write_rows(rows, sink):
-    """Write standardized rows as JSONL to the given sink."""
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        university_text = (row or {}).get("university") or ""
-        result = _call_llm(program_text, university_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-
-        json.dump(row, sink, ensure_ascii=False)
-        sink.write("\n")
+    """Write standardized rows as JSONL to the given sink.
+
+    Rows are handled in BATCH_ROWS chunks: each chunk's distinct pairs are
+    standardized once and the chunk is written in input order.
+    """
+    rows = iter(rows)
+    for chunk in iter(lambda: list(itertools.islice(rows, BATCH_ROWS)), []):
+        batch = standardize_rows(chunk, _call_llm)
+        for row in chunk:
+            json.dump(row, sink, ensure_ascii=False)
+            sink.write("\n")
         sink.flush()
+        print(f"Batch: {batch['rows']} rows, {batch['unique_pairs']} unique pairs "
+              f"(dedup x{batch['dedup_ratio']}), {batch['llm_calls_saved']} LLM calls saved",
+              file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -328,7 +418,7 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to JSON input (list of rows or {'rows': [...]}) or JSON Lines",
         default=None,
     )
     parser.add_argument(
@@ -352,7 +442,14 @@ if __name__ == "__main__":
         action="store_true",
         help="Write JSON Lines to stdout instead of a file.",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the persistent result cache (STD_CACHE_PATH).",
+    )
     args = parser.parse_args()
+    if args.no_cache:
+        STD_CACHE_PATH = ""
 
     if args.serve or args.file is None:
         port = int(os.getenv("PORT", "8000"))
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Batch planner: standardize each distinct (program, university) once.
+
+A request body or a chunk of the input file often holds the same pair
+hundreds of times. BatchPlan collects the distinct pairs of a batch
+(using the same normalization as the result cache), so each one is
+standardized once, then fans the results back out to every row in the
+original order.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Tuple
+
+from result_cache import normalize_pair
+
+Standardizer = Callable[[str, str], Dict[str, str]]
+
+
+def row_pair(row: Dict[str, Any] | None) -> Tuple[str, str]:
+    """Return the (program, university) text of a row ("" when missing)."""
+    row = row or {}
+    return row.get("program") or "", row.get("university") or ""
+
+
+class BatchPlan:
+    """Distinct input pairs of a batch and the pair each row maps to.
+
+    Attributes:
+        pairs (list): Distinct (program, university) pairs, first spelling
+            seen, in first-seen order.
+        slots (list): For each row, the index of its pair in ``pairs``.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.pairs: List[Tuple[str, str]] = []
+        self.slots: List[int] = []
+        seen: Dict[Tuple[str, str], int] = {}
+        for row in rows:
+            pair = row_pair(row)
+            key = normalize_pair(*pair)
+            slot = seen.get(key)
+            if slot is None:
+                slot = seen[key] = len(self.pairs)
+                self.pairs.append(pair)
+            self.slots.append(slot)
+
+    def run(self, standardize: Standardizer) -> List[Dict[str, str]]:
+        """Standardize each distinct pair once; return one result per row."""
+        results = [standardize(program, university) for program, university in self.pairs]
+        return [results[slot] for slot in self.slots]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return rows, distinct pairs, dedup ratio and model calls saved."""
+        rows, unique = len(self.slots), len(self.pairs)
+        return {
+            "rows": rows,
+            "unique_pairs": unique,
+            "dedup_ratio": round(rows / unique, 2) if unique else 0.0,
+            "llm_calls_saved": rows - unique,
+        }
+
+
+def standardize_rows(
+    rows: List[Dict[str, Any]], standardize: Standardizer
+) -> Dict[str, Any]:
+    """Add llm-generated-* fields to every row, one call per distinct pair.
+
+    Args:
+        rows: Input rows; updated in place, order unchanged.
+        standardize: Returns the standardized fields for one pair.
+
+    Returns:
+        dict: The batch's BatchPlan.stats().
+    """
+    plan = BatchPlan(rows)
+    for row, result in zip(rows, plan.run(standardize)):
+        row["llm-generated-program"] = result["standardized_program"]
+        row["llm-generated-university"] = result["standardized_university"]
+    return plan.stats()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""Indexed fuzzy matcher for the canonical program/university lists.
+
+FuzzyIndex.best() returns exactly what
+``difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)`` returns,
+without scoring every candidate:
+
+* exact hits come from a hash set;
+* candidates are generated from an inverted index of character tokens,
+  where the k-th occurrence of a character is its own token ("e#1",
+  "e#2", ...; packed into an int). Two strings share exactly
+  sum(min(count)) tokens, a set intersection computed in C and the
+  numerator of difflib's quick_ratio(), which bounds ratio() from above;
+* a candidate can only reach the cutoff if it shares at least t tokens
+  with the query, so it must contain one of the query's (len - t + 1)
+  rarest tokens (prefix filtering). Only those posting lists are read,
+  and only the slice of each (candidates are kept sorted by length) whose
+  lengths can pass difflib's real_quick_ratio() bound;
+* survivors pass difflib's length and quick_ratio bounds before the real
+  SequenceMatcher.ratio() is computed, with the same argument order and
+  tie-break (highest score, then largest string) as get_close_matches.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+def _tokens(text: str) -> FrozenSet[int]:
+    """Return a token for every k-th occurrence of each character of text."""
+    return frozenset(
+        (ord(char) << 16) | k for char, n in Counter(text).items() for k in range(1, n + 1)
+    )
+
+
+class FuzzyIndex:
+    """Exact set plus character-token inverted index over a candidate list.
+
+    Attributes:
+        candidates (list): Candidate strings, sorted by length.
+    """
+
+    def __init__(self, candidates: Iterable[str]) -> None:
+        # Ties are broken by string, not list position, so order is free
+        self.candidates = sorted(candidates, key=len)
+        self._lengths = [len(c) for c in self.candidates]
+        self._exact: Set[str] = set(self.candidates)
+        self._tokens: List[FrozenSet[int]] = [_tokens(c) for c in self.candidates]
+        self._postings: Dict[int, List[int]] = {}
+        for idx, tokens in enumerate(self._tokens):
+            for token in tokens:
+                self._postings.setdefault(token, []).append(idx)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._exact
+
+    def __len__(self) -> int:
+        return len(self.candidates)
+
+    def _probe_count(self, la: int, cutoff: float) -> int:
+        """Return how many of the query's rarest tokens must be probed.
+
+        The smallest candidate length that can pass difflib's length bound
+        gives the smallest overlap t a match needs; any candidate with t
+        shared tokens shares one of the query's (la - t + 1) rarest ones.
+        """
+        lb = 1
+        while lb < la and 2.0 * lb / (la + lb) < cutoff:
+            lb += 1
+        needed = math.ceil(cutoff * (la + lb) / 2.0) - 1  # -1: float slack
+        return min(la, max(1, la - needed + 1))
+
+    def best(self, name: str, cutoff: float = 0.86) -> str | None:
+        """Return the best candidate scoring >= cutoff, as difflib would.
+
+        Args:
+            name: String to match.
+            cutoff: Minimum SequenceMatcher ratio, in (0, 1].
+
+        Returns:
+            str | None: The closest candidate, or None if none is close enough.
+        """
+        if not name or not self.candidates:
+            return None
+        if name in self._exact:
+            # ratio() == 1.0 can only come from an identical string
+            return name
+        if cutoff <= 0.0:
+            return self._scan(name, range(len(self.candidates)), cutoff)
+
+        la = len(name)
+        # Candidate positions whose length can reach the cutoff (+1 slack)
+        lo = bisect.bisect_left(self._lengths, math.floor(la * cutoff / (2.0 - cutoff)) - 1)
+        hi = bisect.bisect_right(self._lengths, math.ceil(la * (2.0 - cutoff) / cutoff) + 1)
+        query = _tokens(name)
+        rarest = sorted(query, key=lambda token: len(self._postings.get(token, ())))
+        probed: Set[int] = set()
+        for token in rarest[: self._probe_count(la, cutoff)]:
+            posting = self._postings.get(token)
+            if posting:
+                probed.update(posting[bisect.bisect_left(posting, lo):
+                                      bisect.bisect_left(posting, hi)])
+        return self._scan(name, probed, cutoff, query)
+
+    def _scan(self, name: str, indexes: Iterable[int], cutoff: float,
+              query: FrozenSet[int] | None = None) -> str | None:
+        """Score the given candidates with difflib's filters and ratio()."""
+        query = query if query is not None else _tokens(name)
+        la = len(name)
+        matcher = SequenceMatcher()
+        matcher.set_seq2(name)
+        best: Tuple[float, str] | None = None
+        for idx in indexes:
+            cand = self.candidates[idx]
+            length = la + len(cand)
+            if 2.0 * min(la, len(cand)) / length < cutoff:
+                continue
+            if 2.0 * len(query & self._tokens[idx]) / length < cutoff:
+                continue
+            matcher.set_seq1(cand)
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, cand) > best):
+                best = (score, cand)
+        return best[1] if best else None
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Timing of model calls: time to first token and rows/sec.
+
+llama-cpp keeps the evaluated tokens of the previous call and only
+evaluates the part of a new prompt that differs, so the shared system
+prompt and few-shot turns are not re-evaluated between rows; the time to
+first token shows how much prompt evaluation each call still pays for.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+
+class GenerationStats:
+    """Time to first token and throughput of model calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.ttft_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def record(self, ttft: float, total: float) -> None:
+        """Count one call that produced its first token after ttft seconds."""
+        with self._lock:
+            self.calls += 1
+            self.ttft_seconds += ttft
+            self.total_seconds += total
+
+    def summary(self) -> Dict[str, Any]:
+        """Return call count, mean time to first token and rows/sec."""
+        with self._lock:
+            calls, ttft, total = self.calls, self.ttft_seconds, self.total_seconds
+        return {
+            "calls": calls,
+            "avg_ttft_seconds": round(ttft / calls, 4) if calls else None,
+            "rows_per_second": round(calls / total, 3) if total else None,
+        }
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Persistent SQLite cache of standardization results.
+
+(program, university) pairs repeat heavily across GradCafe data, so each
+standardized result is stored on disk keyed by the normalized input pair
+plus a namespace naming the model and prompt version. A later request or
+a re-run of the pipeline answers repeated pairs from the cache instead of
+running the model. The cache is bounded: every hit refreshes the entry's
+last-used tick and inserts beyond ``max_entries`` evict the least
+recently used entries. Ticks and the entry count live in the table, so
+several server processes can share one cache file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Tuple
+
+# Fraction of max_entries evicted at once when the cache is full, so
+# eviction does not run on every insert
+EVICT_FRACTION = 0.05
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    program TEXT NOT NULL,
+    university TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+# Recency tick for a touched entry: one past the newest in the table (an
+# index lookup), so processes sharing the file keep one LRU order
+_NEXT_TICK = "(SELECT COALESCE(MAX(last_used), 0) + 1 FROM results)"
+
+
+def normalize_pair(program: str, university: str) -> Tuple[str, str]:
+    """Collapse whitespace and case so trivially different inputs share a key."""
+    return (
+        " ".join((program or "").split()).casefold(),
+        " ".join((university or "").split()).casefold(),
+    )
+
+
+def prompt_version(*parts: Any) -> str:
+    """Return a short digest of everything that shapes a model answer."""
+    blob = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.blake2b(blob.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class ResultCache:  # pylint: disable=too-many-instance-attributes
+    """On-disk LRU cache of standardized (program, university) results.
+
+    One SQLite connection is shared by all threads behind a lock, so the
+    Flask server and the CLI can use the same cache object and file.
+    Several processes may also share the file: the size and the LRU order
+    are always read from the table (``COUNT(*)`` and the stored
+    ``last_used`` tick), never kept in memory.
+
+    Attributes:
+        path (str): SQLite database file.
+        namespace (str): Model and prompt version the entries belong to.
+        max_entries (int): Size cap; older entries are evicted past it.
+        hits (int): Lookups answered from the cache in this process.
+        misses (int): Lookups that had to run the model.
+        evictions (int): Entries this process removed to stay under
+            max_entries.
+    """
+
+    def __init__(self, path: str, namespace: str, max_entries: int = 200_000) -> None:
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def _key(self, program: str, university: str) -> str:
+        """Return the row key for an input pair in this namespace."""
+        return json.dumps([self.namespace, *normalize_pair(program, university)],
+                          ensure_ascii=False)
+
+    def get(self, program: str, university: str) -> Dict[str, str] | None:
+        """Return the cached result for an input pair, or None on a miss."""
+        key = self._key(program, university)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT program, university FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(f"UPDATE results SET last_used = {_NEXT_TICK} WHERE key = ?", (key,))
+        return {"standardized_program": row[0], "standardized_university": row[1]}
+
+    def put(self, program: str, university: str, result: Dict[str, str]) -> None:
+        """Store the result for an input pair, evicting old entries if full."""
+        key = self._key(program, university)
+        with self._lock:
+            # One write transaction, so processes sharing the file see a
+            # consistent size and never evict the same entries twice
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results (key, program, university, last_used) "
+                    f"VALUES (?, ?, ?, {_NEXT_TICK})",
+                    (key, result["standardized_program"], result["standardized_university"]),
+                )
+                size = self._count()
+                if size > self.max_entries:
+                    self._evict(size)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _count(self) -> int:
+        """Return the number of stored entries (caller holds the lock)."""
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _evict(self, size: int) -> None:
+        """Drop the least recently used entries (caller holds the lock)."""
+        target = max(0, self.max_entries - max(1, int(self.max_entries * EVICT_FRACTION)))
+        self._conn.execute(
+            "DELETE FROM results WHERE key IN "
+            "(SELECT key FROM results ORDER BY last_used LIMIT ?)",
+            (size - target,),
+        )
+        self.evictions += size - target
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._count()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size."""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "namespace": self.namespace,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
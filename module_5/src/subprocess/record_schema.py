@@ -0,0 +1,218 @@
+"""Typed schema for cleaned applicant records.
+
+The cleaner's text fields come out of the scraper as strings. With typing
+enabled, each cleaned record is validated against RECORD_FIELDS:
+
+* GPA and GRE values become floats (None when absent or out of range),
+* date_added becomes an ISO date ("2026-02-03"),
+* status and degree are checked against the Status and Degree enums.
+
+Invalid values are set to None and counted, so a bad value is reported at
+cleaning time instead of failing the database insert. Typed records stay
+JSON-native and go to NDJSON as usual; ParquetSink additionally writes
+them as an Arrow/Parquet file (needs pyarrow) whose columns carry the
+real types, so loaders and analytics can read columns directly.
+"""
+
+import collections
+import datetime
+import enum
+import importlib
+
+
+class Status(str, enum.Enum):
+    """Admission decision, as emitted by the scraper."""
+    ACCEPTED = "Accepted"
+    REJECTED = "Rejected"
+    WAIT_LISTED = "Wait listed"
+    INTERVIEW = "Interview"
+    UNKNOWN = "Unknown"
+
+
+class Degree(str, enum.Enum):
+    """Degree type, as emitted by the scraper."""
+    PHD = "PhD"
+    MASTERS = "Masters"
+    OTHER = "Other"
+
+
+# Field -> (Arrow type name, valid range or enum). Fields not listed pass
+# through unchanged in NDJSON and are left out of Parquet.
+RECORD_FIELDS = {
+    "university": ("string", None),
+    "program": ("string", None),
+    "degree": ("dictionary", Degree),
+    "status": ("dictionary", Status),
+    "decisionDate": ("string", None),
+    "date_added": ("date32", None),
+    "url": ("string", None),
+    "comments": ("string", None),
+    "gpa": ("float64", (0.0, 5.0)),
+    "greScore": ("float64", (130.0, 340.0)),
+    "greV": ("float64", (130.0, 170.0)),
+    "greAW": ("float64", (0.0, 6.0)),
+    "US/International": ("string", None),
+    "term": ("string", None),
+}
+DATE_FORMATS = ("%B %d, %Y", "%b %d, %Y", "%Y-%m-%d")
+# Records per Parquet row group
+PARQUET_BATCH = 10_000
+
+_ENUM_LOOKUP = {
+    field: {member.value.lower(): member.value for member in kind}
+    for field, (_, kind) in RECORD_FIELDS.items()
+    if isinstance(kind, type) and issubclass(kind, enum.Enum)
+}
+
+
+def parse_date(text):
+    """Return the ISO date for a GradCafe date string, or None."""
+    text = text.strip()
+    if text.lower().startswith("added on "):
+        text = text[len("added on "):]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+class RecordTyper:
+    """Converts cleaned records to the typed schema and counts bad values.
+
+    Attributes:
+        invalid (collections.Counter): Field -> values nulled as invalid.
+        records (int): Records typed so far.
+    """
+
+    def __init__(self):
+        """Initialize with empty counters."""
+        self.invalid = collections.Counter()
+        self.records = 0
+
+    def type_record(self, record):
+        """Return a typed copy of a cleaned record (same key order).
+
+        Args:
+            record (dict): Cleaned record with string values.
+
+        Returns:
+            dict: Record with floats, ISO dates and canonical enum values;
+                missing ("") typed values become None.
+        """
+        self.records += 1
+        typed = {}
+        for key, value in record.items():
+            kind, check = RECORD_FIELDS.get(key, ("string", None))
+            if kind == "string":
+                typed[key] = value
+                continue
+            if value is None or value == "":
+                typed[key] = None
+                continue
+            if kind == "float64":
+                typed[key] = self._number(key, value, check)
+            elif kind == "date32":
+                date = parse_date(value) if isinstance(value, str) else None
+                typed[key] = self._checked(key, date)
+            else:
+                canonical = _ENUM_LOOKUP[key].get(value.lower()) if isinstance(value, str) else None
+                typed[key] = self._checked(key, canonical)
+        return typed
+
+    def _number(self, key, value, bounds):
+        """Parse a score as a float within bounds, or count it as invalid."""
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            number = None
+        if number is not None and not bounds[0] <= number <= bounds[1]:
+            number = None
+        return self._checked(key, number)
+
+    def _checked(self, key, value):
+        """Count a None (invalid) typed value against its field."""
+        if value is None:
+            self.invalid[key] += 1
+        return value
+
+    def summary(self):
+        """Return a one-line report of invalid values found."""
+        if not self.invalid:
+            return f"Schema: {self.records} records typed, no invalid values"
+        detail = ", ".join(f"{key}: {count}" for key, count in sorted(self.invalid.items()))
+        return (f"Schema: {self.records} records typed, "
+                f"{sum(self.invalid.values())} invalid values set to null ({detail})")
+
+
+def arrow_schema(pa):
+    """Return the pyarrow schema for RECORD_FIELDS."""
+    types = {
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int8(), pa.string()),
+        "date32": pa.date32(),
+        "float64": pa.float64(),
+    }
+    return pa.schema([(field, types[kind]) for field, (kind, _) in RECORD_FIELDS.items()])
+
+
+class ParquetSink:
+    """Streams typed records to a Parquet file in row groups.
+
+    pyarrow is imported when the sink is created, so it stays an optional
+    dependency of the cleaner.
+
+    Attributes:
+        path (str): Output Parquet file.
+        count (int): Records written.
+    """
+
+    def __init__(self, path, batch_size=PARQUET_BATCH):
+        """Open the Parquet writer.
+
+        Args:
+            path (str): Output Parquet file.
+            batch_size (int): Records per row group.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        self._pa = importlib.import_module("pyarrow")
+        pq = importlib.import_module("pyarrow.parquet")
+        self.path = path
+        self.count = 0
+        self.batch_size = batch_size
+        self._writer = pq.ParquetWriter(path, arrow_schema(self._pa))
+        self._batch = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        """Buffer one typed record, writing a row group when the batch is full."""
+        self._batch.append(record)
+        self.count += 1
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        """Write the buffered records as one row group."""
+        if not self._batch:
+            return
+        columns = {}
+        for field, (kind, _) in RECORD_FIELDS.items():
+            values = [record.get(field) for record in self._batch]
+            if kind == "date32":
+                values = [datetime.date.fromisoformat(v) if v else None for v in values]
+            columns[field] = values
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self._writer.schema))
+        self._batch = []
+
+    def close(self):
+        """Write any buffered records and close the file."""
+        self._flush()
+        self._writer.close()
@@ -0,0 +1,163 @@
+"""Streaming reader and writer for applicant record files.
+
+Records are written as NDJSON (one JSON object per line) as soon as they
+are produced, so a stage never holds a whole crawl in memory and the next
+stage can start reading before the file is complete. The reader accepts
+both NDJSON and the older pretty-printed JSON array files and yields one
+record at a time in either case.
+"""
+
+import json
+import os
+
+_CHUNK = 1 << 16
+_WHITESPACE = " \t\r\n"
+# Longest tail a cut-off token can leave unparsed ("-Infinity", "\ud83d\ude00")
+_TOKEN_SLACK = 16
+
+
+class NDJSONWriter:
+    """Append-style NDJSON writer with a durable sync point.
+
+    The file is opened lazily on first use. In write mode an existing file
+    is replaced; in append mode new records extend it.
+
+    Attributes:
+        path (str): Output file path.
+        count (int): Records in the file (including any present on resume).
+    """
+
+    def __init__(self, path, append=False):
+        """Initialize the writer.
+
+        Args:
+            path (str): Output file path.
+            append (bool): Extend an existing file instead of replacing it.
+        """
+        self.path = path
+        self.count = 0
+        self._mode = "ab" if append else "wb"
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, self._mode)  # pylint: disable=consider-using-with
+            # Later reopens (e.g. after truncate()) must not wipe the file
+            self._mode = "ab"
+        return self._file
+
+    def write(self, record):
+        """Write one record as a single line."""
+        self._open().write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.count += 1
+
+    def write_many(self, records):
+        """Write every record of an iterable."""
+        for record in records:
+            self.write(record)
+
+    def sync(self):
+        """Flush and fsync everything written so far.
+
+        Returns:
+            int: File size in bytes, i.e. the offset the data is durable up to.
+        """
+        f = self._open()
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+    def truncate(self, size, count):
+        """Cut the file back to a known-good point and continue appending.
+
+        Args:
+            size (int): Byte length to keep.
+            count (int): Number of records in those bytes.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if os.path.exists(self.path) and os.path.getsize(self.path) > size:
+            os.truncate(self.path, size)
+        self._mode = "ab"
+        self.count = count
+
+    def close(self):
+        """Close the file, creating it first if nothing was ever written."""
+        self._open().close()
+        self._file = None
+
+
+def iter_records(path, chunk_size=_CHUNK):
+    """Yield records from an NDJSON file or a JSON array file.
+
+    The format is detected from the first non-blank character. Either way
+    the file is read incrementally, so memory use does not grow with the
+    file size.
+
+    Args:
+        path (str): Input file path.
+        chunk_size (int): Characters read per chunk for JSON arrays.
+
+    Yields:
+        dict: One record at a time, in file order.
+
+    Raises:
+        ValueError: If the file is not valid NDJSON or a JSON array.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        head = f.read(chunk_size).lstrip(_WHITESPACE + "\ufeff")
+        if head.startswith("["):
+            yield from _iter_array(f, head[1:], chunk_size)
+            return
+        f.seek(0)
+        for lineno, line in enumerate(f, 1):
+            line = line.strip(_WHITESPACE + "\ufeff")
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{lineno}: invalid NDJSON record: {e}") from None
+
+
+def _iter_array(f, buf, chunk_size):
+    """Decode the elements of a JSON array one at a time from a file."""
+    decoder = json.JSONDecoder()
+    consumed = 1  # characters dropped from the front of buf, incl. "["
+    pos = 0
+    eof = False
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE + ",":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            # A cut-off element fails at (or just before) the end of the
+            # buffer, or inside its last, still open string; anything
+            # earlier is a real syntax error that more input cannot fix
+            if e.pos < len(buf) - _TOKEN_SLACK and not e.msg.startswith("Unterminated string"):
+                raise ValueError(f"{f.name}: invalid JSON array: {e.msg} "
+                                 f"(char {consumed + e.pos})") from None
+            end = None
+        # An element ending exactly at the buffer edge may be cut short
+        # (e.g. a number), so only trust it once more input is seen.
+        if end is not None and (end < len(buf) or eof):
+            yield value
+            pos = end
+            continue
+        if eof:
+            raise ValueError(f"{f.name}: truncated JSON array")
+        more = f.read(chunk_size)
+        eof = not more
+        consumed += pos
+        buf = buf[pos:] + more
+        pos = 0
@@ -0,0 +1,253 @@
+"""Retry policy and circuit breaker for GradCafe page fetches.
+
+RetryPolicy retries transient failures (transport errors, 429 and 5xx)
+with capped exponential backoff and full jitter, and honours
+``Retry-After``. CircuitBreaker wraps the fetch rate limiter: it watches
+the recent error rate and, when it climbs past a threshold, pauses every
+fetch thread for a cooldown and cuts the request rate, which then recovers
+step by step as requests succeed again. A ``Retry-After`` from the server
+pauses all threads, not only the one that saw it.
+"""
+
+from __future__ import annotations
+
+import collections
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+
+class FetchCancelled(Exception):
+    """Raised in a fetch thread whose stage stopped while it was waiting."""
+
+
+def check_stop(stop):
+    """Raise FetchCancelled if the ``stop`` event (or None) is set."""
+    if stop is not None and stop.is_set():
+        raise FetchCancelled("fetch stage stopped")
+
+
+def _sleep(seconds, stop=None):
+    """Sleep, ending early with FetchCancelled once ``stop`` is set."""
+    if stop is None:
+        time.sleep(seconds)
+    elif stop.wait(seconds):
+        raise FetchCancelled("fetch stage stopped")
+
+
+def retry_after_seconds(headers, now=None):
+    """Return the delay requested by a ``Retry-After`` header, or None.
+
+    Args:
+        headers: Response headers (any mapping; lookup is case-insensitive).
+        now: Current time as an aware datetime (for HTTP-date values).
+    """
+    value = next((v for k, v in (headers or {}).items() if k.lower() == "retry-after"), None)
+    if value is None:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class CircuitBreaker:  # pylint: disable=too-many-instance-attributes
+    """Rate limiter wrapper that backs off when fetches keep failing.
+
+    Args:
+        limiter: Object with ``acquire(stop=None)`` and a writable ``rate`` attribute
+            (TokenBucket or SharedRateLimiter).
+        window: Number of recent outcomes the error rate is computed over.
+        threshold: Error rate that trips the breaker.
+        cooldown: Seconds every fetch waits after the breaker trips.
+        min_factor: Lowest fraction of the configured rate to slow down to.
+        recovery: Fraction of the configured rate regained per success.
+
+    Attributes:
+        trips (int): Times the breaker has opened.
+        paused (float): Total seconds of pauses imposed (trips and Retry-After).
+    """
+
+    def __init__(self, limiter, window=20, threshold=0.5, cooldown=30.0,  # pylint: disable=too-many-arguments
+                 *, min_factor=0.125, recovery=0.05):
+        self.limiter = limiter
+        self.base_rate = limiter.rate
+        self.window = collections.deque(maxlen=max(1, window))
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.min_factor = min_factor
+        self.recovery = recovery
+        self.factor = 1.0
+        self.trips = 0
+        self.paused = 0.0
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        """The configured (not the currently throttled) request rate."""
+        return self.base_rate
+
+    @property
+    def is_open(self):
+        """True while fetches are paused."""
+        return time.monotonic() < self._resume_at
+
+    def acquire(self, stop=None):
+        """Wait out any pause, then take a token from the wrapped limiter.
+
+        Args:
+            stop: Optional threading.Event; once set, a pause ends early
+                with FetchCancelled.
+        """
+        while True:
+            with self._lock:
+                wait = self._resume_at - time.monotonic()
+            if wait <= 0:
+                break
+            _sleep(wait, stop)
+        self.limiter.acquire(stop)
+
+    def pause(self, seconds):
+        """Hold every fetch for ``seconds`` (e.g. a server's Retry-After)."""
+        with self._lock:
+            self._pause(seconds)
+
+    def _pause(self, seconds):
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._resume_at:
+            self.paused += resume_at - max(self._resume_at, time.monotonic())
+            self._resume_at = resume_at
+
+    def _set_factor(self, factor):
+        self.factor = factor
+        if self.base_rate:
+            self.limiter.rate = self.base_rate * factor
+
+    def record_success(self):
+        """Record a successful fetch and restore some of the request rate."""
+        with self._lock:
+            self.window.append(True)
+            if self.factor < 1.0:
+                self._set_factor(min(1.0, self.factor + self.recovery))
+
+    def record_failure(self):
+        """Record a failed fetch; trip the breaker if the error rate is too high."""
+        with self._lock:
+            self.window.append(False)
+            if len(self.window) < self.window.maxlen:
+                return
+            error_rate = self.window.count(False) / len(self.window)
+            if error_rate < self.threshold:
+                return
+            self.trips += 1
+            self._set_factor(max(self.min_factor, self.factor / 2))
+            self._pause(self.cooldown)
+            self.window.clear()
+        log.warning("Circuit breaker open: %.0f%% of recent fetches failed; pausing %.0fs "
+                    "and slowing to %.2f req/s.", error_rate * 100, self.cooldown,
+                    self.base_rate * self.factor if self.base_rate else 0.0)
+
+
+class RetryPolicy:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """Retry transient fetch failures with exponential backoff and jitter.
+
+    Args:
+        attempts: Maximum tries per page (1 disables retrying).
+        backoff: Base delay in seconds; attempt ``n`` waits a random time in
+            ``[0, min(max_backoff, backoff * 2**n)]``.
+        max_backoff: Upper bound for a computed backoff.
+        max_retry_after: Upper bound for an honoured Retry-After.
+        statuses: HTTP statuses worth retrying; transport errors (no status)
+            are always retried.
+
+    Attributes:
+        retries (int): Retries performed.
+        gave_up (int): Fetches that failed after the last attempt.
+    """
+
+    def __init__(self, attempts=4, backoff=0.5, max_backoff=30.0,  # pylint: disable=too-many-arguments
+                 max_retry_after=300.0, statuses=RETRY_STATUSES):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.statuses = statuses
+        self.retries = 0
+        self.gave_up = 0
+        self._lock = threading.Lock()
+
+    def delay(self, attempt, exc):
+        """Return the seconds to wait before retrying, or None to give up.
+
+        Args:
+            attempt: Zero-based number of the attempt that just failed.
+            exc: The OSError it raised (FetchError carries status/headers).
+        """
+        status = getattr(exc, "status", None)
+        if status is not None and status not in self.statuses:
+            return None
+        if attempt + 1 >= self.attempts:
+            return None
+        requested = retry_after_seconds(getattr(exc, "headers", None))
+        if requested is not None:
+            return min(requested, self.max_retry_after)
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, fetch, page_num, limiter, stop=None):
+        """Fetch a page, retrying transient failures.
+
+        Each attempt takes a token from ``limiter`` first. When the limiter
+        is a CircuitBreaker it is told about every outcome, and a server's
+        Retry-After pauses all fetch threads. ``stop`` (a threading.Event)
+        is checked before every attempt and ends any wait early, so a
+        stopped stage does not keep retrying or taking rate-limit slots.
+
+        Raises:
+            OSError: The last error once retries are exhausted or the error
+                is not retryable.
+            FetchCancelled: If ``stop`` was set.
+        """
+        breaker = limiter if isinstance(limiter, CircuitBreaker) else None
+        attempt = 0
+        while True:
+            check_stop(stop)
+            limiter.acquire(stop)
+            check_stop(stop)
+            try:
+                body = fetch(page_num)
+            except OSError as exc:
+                if breaker is not None:
+                    breaker.record_failure()
+                wait = self.delay(attempt, exc)
+                with self._lock:
+                    if wait is None:
+                        self.gave_up += 1
+                    else:
+                        self.retries += 1
+                if wait is None:
+                    raise
+                log.info("Page %s failed (%s); retry %d in %.1fs.",
+                         page_num, exc, attempt + 1, wait)
+                if breaker is not None and retry_after_seconds(getattr(exc, "headers", None)):
+                    breaker.pause(wait)
+                else:
+                    _sleep(wait, stop)
+                attempt += 1
+                continue
+            if breaker is not None:
+                breaker.record_success()
+            return body
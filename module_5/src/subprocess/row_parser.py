@@ -0,0 +1,296 @@
+"""Pluggable HTML backends for extracting GradCafe survey table rows.
+
+Each backend turns a survey page into a list of TableRow tuples for the
+first ``<table>`` on the page, pulling cell texts, row texts and the
+``/result/<id>`` link in one pass. Record building then works on these
+tuples only, so every backend yields identical records.
+
+Backends:
+    bs4: BeautifulSoup reference implementation.
+    stream: Single-pass regex tokenizer that stops at the end of the
+        first table. Several times faster; the default.
+"""
+
+from __future__ import annotations
+
+import html as html_lib
+import os
+import re
+from collections import namedtuple
+
+from bs4 import BeautifulSoup
+from bs4.dammit import EncodingDetector, EntitySubstitution, UnicodeDammit
+
+TableRow = namedtuple("TableRow", "cells text spaced_text link")
+TableRow.__doc__ = """One ``<tr>`` of the survey table.
+
+    cells: Texts of the row's ``<td>`` descendants (``get_text(strip=True)``).
+    text: Row text joined without separator (``get_text(strip=True)``).
+    spaced_text: Row text joined with spaces (``get_text(" ", strip=True)``).
+    link: First ``href`` matching ``/result/<id>``, or None.
+"""
+
+RESULT_LINK_RE = re.compile(r"/result/\d+")
+
+
+def parse_table_bs4(html, encoding=None):
+    """Extract survey rows with BeautifulSoup (reference backend).
+
+    Args:
+        html: Page HTML as bytes or str.
+        encoding: Charset from the response headers, if known.
+
+    Returns:
+        list[TableRow] or None if the page has no table.
+    """
+    soup = BeautifulSoup(
+        html, "html.parser", from_encoding=encoding if isinstance(html, bytes) else None,
+    )
+    table = soup.find("table")
+    if not table:
+        return None
+
+    rows = []
+    for tr in table.find_all("tr"):
+        link = tr.find("a", href=RESULT_LINK_RE)
+        rows.append(TableRow(
+            cells=tuple(td.get_text(strip=True) for td in tr.find_all("td")),
+            text=tr.get_text(strip=True),
+            spaced_text=tr.get_text(" ", strip=True),
+            link=link["href"] if link else None,
+        ))
+    return rows
+
+
+# Comments, raw-text elements, tags (attribute values may contain '>'),
+# CDATA sections, and other declarations / processing instructions.
+_TOKEN_RE = re.compile(
+    r"<!--.*?(?:-->|\Z)"
+    r"|<(script|style)\b(?:[^>\"']|\"[^\"]*\"|'[^']*')*>.*?(?:</\1\s*>|\Z)"
+    r"|<(/?)([a-zA-Z][^\s/>]*)((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>"
+    r"|<!\[CDATA\[(.*?)\]\s*\]\s*>"
+    r"|<[!?][^>]*>",
+    re.S | re.I,
+)
+# Character references as html.parser finds them in text: the number or
+# name must be followed by a character that cannot continue it, and only
+# a ";" terminator is consumed. bs4 decodes names from its own entity
+# table, so "&copy2024" or "&ampx" stay literal (html.unescape would
+# expand their HTML5 legacy prefixes).
+_CHARREF_RE = re.compile(
+    r"&(?:#(?:([0-9]+)|[xX]([0-9a-fA-F]+))(?=[^0-9a-fA-F]|\Z)"
+    r"|([a-zA-Z][-.a-zA-Z0-9]*)(?=[^a-zA-Z0-9]|\Z));?"
+)
+_HREF_RE = re.compile(
+    r"(?:^|\s)href\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'=<>`]+))", re.I,
+)
+
+
+class _OpenRow:  # pylint: disable=too-few-public-methods
+    """Mutable accumulator for a ``<tr>`` while it is being tokenized."""
+
+    __slots__ = ("parts", "cells", "link")
+
+    def __init__(self):
+        self.parts = []
+        self.cells = []
+        self.link = None
+
+    def freeze(self):
+        """Return the finished TableRow."""
+        return TableRow(
+            cells=tuple("".join(cell) for cell in self.cells),
+            text="".join(self.parts),
+            spaced_text=" ".join(self.parts),
+            link=self.link,
+        )
+
+
+def _unescape_ref(match):
+    """Return the text bs4 stores for one _CHARREF_RE match."""
+    decimal, hexadecimal, name = match.groups()
+    if name is not None:
+        return EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name, "&" + name)
+    number = int(decimal) if decimal is not None else int(hexadecimal, 16)
+    return UnicodeDammit.numeric_character_reference(number)[0]
+
+
+def _href(attrs):
+    """Return the unescaped href attribute value from a tag's attribute text.
+
+    html.parser itself decodes attribute values with html.unescape, so
+    unlike text, bs4 sees HTML5 legacy entities there expanded too.
+    """
+    match = _HREF_RE.search(attrs)
+    if not match:
+        return None
+    value = next(g for g in match.groups() if g is not None)
+    return html_lib.unescape(value) if "&" in value else value
+
+
+class _TableBuilder:
+    """Tokenizer state for the rows of the first table on a page."""
+
+    def __init__(self):
+        self.rows = []
+        self.stack = []       # open table/tr/td elements as (name, obj)
+        self.open_rows = []   # _OpenRow objects currently open, outermost first
+        self.open_cells = []  # cell part lists currently open
+        self.depth = 0        # open <table> elements
+        self.found = False    # whether the first table has started
+
+    def text(self, text, cdata=False):
+        """Add one run of text (or a CDATA section's content) to every open row and cell."""
+        if not (self.depth and self.open_rows):
+            return
+        if "&" in text and not cdata:
+            text = _CHARREF_RE.sub(_unescape_ref, text)
+        text = text.strip()
+        if text:
+            for row in self.open_rows:
+                row.parts.append(text)
+            for cell in self.open_cells:
+                cell.append(text)
+
+    def start(self, name, attrs):
+        """Handle a start tag; self-closing table/tr/td also end at once."""
+        if not self.found:
+            if name == "table":
+                self.found = True
+                self.depth = 1
+                self.stack.append(("table", None))
+            return
+        if name == "table":
+            self.depth += 1
+            self.stack.append(("table", None))
+        elif name == "tr":
+            row = _OpenRow()
+            self.rows.append(row)
+            self.open_rows.append(row)
+            self.stack.append(("tr", row))
+        elif name == "td":
+            cell = []
+            for row in self.open_rows:
+                row.cells.append(cell)
+            self.open_cells.append(cell)
+            self.stack.append(("td", cell))
+        elif name == "a" and self.open_rows:
+            self._link(_href(attrs))
+            return
+        else:
+            return
+        if attrs.rstrip().endswith("/"):
+            self.end(name)
+
+    def _link(self, href):
+        """Record a result link on every open row that has none yet."""
+        if href and RESULT_LINK_RE.search(href):
+            for row in self.open_rows:
+                if row.link is None:
+                    row.link = href
+
+    def end(self, name):
+        """Close the most recent open element called ``name`` and all above it."""
+        if not self.found:
+            return
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i][0] == name:
+                for popped, obj in self.stack[i:]:
+                    if popped == "table":
+                        self.depth -= 1
+                    elif popped == "tr":
+                        self.open_rows.remove(obj)
+                    else:
+                        self.open_cells.remove(obj)
+                del self.stack[i:]
+                return
+
+    @property
+    def done(self):
+        """True once the first table has been closed."""
+        return self.found and not self.depth
+
+
+def decode_html(html, encoding=None):
+    """Decode page bytes to the same text BeautifulSoup would parse.
+
+    Tries the response charset, a byte-order mark, the page's ``<meta>``
+    or XML declaration, then UTF-8. Pages none of these decode fall back
+    to bs4's own UnicodeDammit detection.
+    """
+    markup, sniffed = EncodingDetector.strip_byte_order_mark(html)
+    declared = EncodingDetector.find_declared_encoding(markup, is_html=True)
+    for candidate in (encoding, sniffed, declared, "utf-8"):
+        if candidate:
+            try:
+                return markup.decode(candidate)
+            except (LookupError, UnicodeDecodeError):
+                continue
+    known = [encoding] if encoding else None
+    return UnicodeDammit(html, known, is_html=True).unicode_markup
+
+
+def parse_table_stream(html, encoding=None):
+    """Extract survey rows with a single-pass tokenizer (fast backend).
+
+    Mirrors how BeautifulSoup's html.parser builds and reads the tree:
+    each run of text between markup is one string, stripped on its own,
+    and so is each CDATA section; comments and script/style bodies are
+    not text; an end tag closes the
+    most recent open element of the same name and everything above it.
+    Tokenizing stops as soon as the first table is closed. Pages on which
+    html.parser itself gives up and returns the rest of the document as
+    text (an unterminated CDATA section, or a malformed "&#" reference)
+    are not mirrored.
+
+    Args:
+        html: Page HTML as bytes or str.
+        encoding: Charset from the response headers, if known.
+
+    Returns:
+        list[TableRow] or None if the page has no table.
+    """
+    if isinstance(html, bytes):
+        html = decode_html(html, encoding)
+
+    builder = _TableBuilder()
+    pos = 0
+    for match in _TOKEN_RE.finditer(html):
+        if match.start() > pos:
+            builder.text(html[pos:match.start()])
+        pos = match.end()
+
+        name = match.group(3)
+        if name is None:
+            if match.group(5) is not None:
+                builder.text(match.group(5), cdata=True)
+            continue
+        if match.group(2):
+            builder.end(name.lower())
+        else:
+            builder.start(name.lower(), match.group(4))
+        if builder.done:
+            break
+
+    if not builder.found:
+        return None
+    return [row.freeze() for row in builder.rows]
+
+
+BACKENDS = {
+    "bs4": parse_table_bs4,
+    "stream": parse_table_stream,
+}
+
+
+def get_backend(name=None):
+    """Return the table parser for ``name`` (defaults to HTML_PARSER or 'stream').
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    name = name or os.getenv("HTML_PARSER", "stream")
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown HTML parser backend: {name!r}") from None
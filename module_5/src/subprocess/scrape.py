@@ -2,40 +2,74 @@
 
 This module provides functionality to scrape graduate applicant data from
 The GradCafe website (https://www.thegradcafe.com/survey/index.php) and store
-the results in JSON format. It respects robots.txt and includes rate limiting
-to avoid overloading the server.
+the results as NDJSON (streamed while crawling) or a JSON array. It respects
+robots.txt and includes rate limiting to avoid overloading the server.
 
 Author: Siva Govindarajan
 Date: January 2026
 """
 
+import argparse
+import itertools
 import json
 import os
 import re
-import time
-import urllib.request
-import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
 
-from bs4 import BeautifulSoup
 import psycopg
 from dotenv import load_dotenv
 from psycopg import sql
 
+from checkpoint import CrawlCheckpoint
+from fetcher import FetchStats, PageFetcher, TokenBucket
+from http_session import HTTPSession
+from page_archive import PageArchive, new_run_id
+from record_stream import NDJSONWriter
+from retry import CircuitBreaker, RetryPolicy
+from row_parser import BACKENDS, get_backend
+
 load_dotenv()
 
+# Parser processes when --workers is not given; parsing keeps up with the
+# default 1 request/s crawl easily, so one process per core would sit idle
+DEFAULT_PARSE_WORKERS = 2
+
 
-class GradCafeScraper:
+class GradCafeScraper:  # pylint: disable=too-many-instance-attributes
     """Scrapes graduate applicant data from The GradCafe website.
 
     Attributes:
         url (str): Base URL for GradCafe survey index.
         headers (dict): HTTP headers with User-Agent for requests.
-        data (list): List of scraped applicant records.
+        data (list): Scraped applicant records, kept only when not streaming
+            to a sink.
+        collected (int): Records collected in this crawl, streamed or not.
+        sink (NDJSONWriter): Optional writer that receives each record as it
+            is collected instead of self.data.
         max_entries (int): Target number of entries to scrape (30,000).
         existing_urls (set): Set of URLs already present in the database.
+        session (HTTPSession): Keep-alive session shared by all page fetches.
+        archive (PageArchive): Optional archive that receives every fetched page.
+        run_id (str): Identifier of this crawl run inside the archive.
+        parser (str): HTML backend name used to turn pages into TableRows.
+        workers (int): Parser processes; None uses DEFAULT_PARSE_WORKERS
+            (capped at the CPU count).
+        fetch_threads (int): Maximum in-flight page requests (read-ahead depth).
+        retry (RetryPolicy): Retry/backoff policy for transient fetch errors.
+        checkpoint (CrawlCheckpoint): Optional checkpoint written during scrape_data.
+        checkpoint_every (int): Pages collected between checkpoints.
+        start_page (int): First page to fetch (set by resume()).
     """
-    def __init__(self):
-        """Initialize the GradCafeScraper with URL and headers."""
+    def __init__(self, archive=None, load_existing=True, parser=None):
+        """Initialize the GradCafeScraper with URL and headers.
+
+        Args:
+            archive (PageArchive, optional): Archive to append raw pages to.
+            load_existing (bool): Load known URLs from the database so the
+                crawl stops at the first existing record.
+            parser (str, optional): HTML backend name ('stream' or 'bs4');
+                defaults to the HTML_PARSER environment variable.
+        """
         url = "https://www.thegradcafe.com/survey/index.php"
         headers = {
             'User-Agent': (
@@ -47,9 +81,25 @@ class GradCafeScraper:
         self.url = url
         self.headers = headers
         self.data = []
+        self.collected = 0
+        self.sink = None
         self.max_entries = 30000
         self.existing_urls = set()
-        self._load_existing_records()
+        self.session = HTTPSession(headers=headers)
+        self.archive = archive
+        self.run_id = new_run_id()
+        self.parser = parser or os.getenv("HTML_PARSER", "stream")
+        get_backend(self.parser)  # fail fast on an unknown backend
+        self.workers = None
+        self.fetch_threads = 4
+        self.retry = RetryPolicy()
+        self.checkpoint = None
+        self.checkpoint_every = 25
+        self.start_page = 1
+        self._next_page = 1
+        self._checkpointed = 0
+        if load_existing:
+            self._load_existing_records()
 
     def _load_existing_records(self):
         """Load existing URLs from the database to avoid duplicate scraping."""
@@ -85,113 +135,258 @@ class GradCafeScraper:
         Returns:
             bytes: Raw HTML content from the page, or None if fetch fails.
         """
-        # Build query parameters for GradCafe survey
-        params = {'q': '', 't': 'a', 'o': '', 'page': page_num}
-        url = f"{self.url}?{urllib.parse.urlencode(params)}"
         try:
-            req = urllib.request.Request(url, headers=self.headers)
-            with urllib.request.urlopen(req) as response:
-                return response.read()
+            return self._fetch_page(page_num)
         except Exception as e:  # pylint: disable=broad-exception-caught
             print(f"Error fetching page {page_num}: {e}")
             return None
 
-    def scrape_data(self):
+    def _fetch_page(self, page_num):
+        """Fetch (and archive) one page, raising FetchError on failure."""
+        # Build query parameters for GradCafe survey
+        params = {'q': '', 't': 'a', 'o': '', 'page': page_num}
+        html = self.session.get(self.url, fields=params)
+        if self.archive is not None:
+            self.archive.append(page_num, html, run=self.run_id)
+        return html
+
+    def scrape_data(self, rate=1.0):
         """Scrape applicant data from GradCafe across multiple pages.
 
-        Iterates through pages, extracts applicant records, and stores them
-        in self.data. Continues until max_entries is reached or no more pages
-        are available. Includes a 1-second delay between requests to be polite.
+        Pages are fetched on a small thread pool under a token-bucket rate
+        limit (one request per second by default, to be polite) and handed
+        straight to a process pool for parsing. Transient errors (timeouts,
+        429, 5xx) are retried with backoff per self.retry, and a circuit
+        breaker slows the crawl while errors persist. Records are collected
+        in page order until max_entries is reached, a page still fails after
+        its retries, or an already-known record is found.
+
+        Args:
+            rate (float): Maximum requests per second.
+        """
+        stats = self._run_pipeline(self._fetch_page, rate, checkpoint=self.checkpoint)
+        print(f"HTTP session: {self.session.summary()}")
+        print(f"Retries: {self.retry.retries} retried, {self.retry.gave_up} gave up")
+        if self.checkpoint is not None:
+            print(f"Checkpoint overhead: {self.checkpoint.summary(stats.elapsed)}")
+
+    def resume(self, checkpoint):
+        """Continue a crawl from the last checkpoint, if there is one.
+
+        Restores the records already emitted, the page cursor and the run
+        id (so archived pages keep extending the same run). When streaming,
+        the checkpoint's journal is the sink, so the records stay on disk
+        and the sink simply continues after them.
+
+        Args:
+            checkpoint (CrawlCheckpoint): Checkpoint written by an earlier run.
+
+        Returns:
+            bool: True if a checkpoint was loaded.
+        """
+        if not checkpoint.exists():
+            print("No checkpoint found; starting a fresh crawl.")
+            return False
+        state = checkpoint.load()
+        if self.sink is None:
+            self.data = list(checkpoint.records())
+        self.collected = state["records"]
+        self.start_page = state["next_page"]
+        self.run_id = state["run_id"]
+        self._checkpointed = self.collected
+        print(f"Resuming at page {self.start_page} with {self.collected} records "
+              f"from checkpoint saved {state['saved_at']}.")
+        return True
+
+    def _checkpoint_due(self):
+        """True after every checkpoint_every pages collected in this run."""
+        return (self._next_page - self.start_page) % self.checkpoint_every == 0
+
+    def _save_checkpoint(self, checkpoint):
+        """Write records collected since the last checkpoint plus the page cursor.
+
+        When streaming, those records are already in the sink (which is the
+        checkpoint journal) and self.data is empty, so nothing is rewritten.
         """
-        page = 1
-        stop_scraping = False
-        while len(self.data) < self.max_entries:
-            try:
-                html = self.fetch_data(page_num=page)
-                if not html:
-                    print("Failed to fetch initial data.")
-                    return
-
-                soup = BeautifulSoup(html, 'html.parser')
-                results = []
-                table = soup.find('table')
-
-                if table:
-                    rows = table.find_all('tr')
-                    results, stop_scraping = self._process_rows(rows)
-
-                print(json.dumps(results))
-
-                if stop_scraping:
+        checkpoint.save(self._next_page, self.data[self._checkpointed:], self.run_id)
+        self._checkpointed = self.collected
+
+    def reparse_archive(self, archive, run=None):
+        """Rebuild self.data from archived pages without touching the network.
+
+        Archived pages are replayed without any rate limit, so parsing
+        is the only cost and it is spread over all parser processes.
+
+        Args:
+            archive (PageArchive): Archive written by a previous crawl.
+            run (str, optional): Run to reparse; defaults to the latest run.
+        """
+        stats = self._run_pipeline(archive.replay(run), rate=None, echo=False)
+        print(f"Reparsed {stats.pages} archived pages into {self.collected} records.")
+
+    def _parse_workers(self):
+        """Return the parse pool size: self.workers or a small default."""
+        return self.workers or min(DEFAULT_PARSE_WORKERS, os.cpu_count() or 1)
+
+    def _run_pipeline(self, fetch, rate, echo=True, checkpoint=None):
+        """Run the fetch stage and the process-pool parse stage.
+
+        Args:
+            fetch (callable): ``fetch(page_num)`` returning bytes or None;
+                OSErrors it raises are retried per self.retry, and a page
+                that still fails ends the run.
+            rate (float or None): Maximum fetches per second.
+            echo (bool): Print each page's records as JSON progress output.
+            checkpoint (CrawlCheckpoint, optional): Saved every
+                checkpoint_every pages and once more when the run ends.
+
+        Returns:
+            FetchStats: Throughput counters for the run.
+        """
+        stats = FetchStats()
+        parse_pool = ProcessPoolExecutor(max_workers=self._parse_workers())
+
+        def submit_parse(_page_num, html):
+            if not html:
+                return None
+            return parse_pool.submit(GradCafeScraper.parse_page, html, self.parser)
+
+        breaker = CircuitBreaker(TokenBucket(rate))
+        self._next_page = self.start_page
+        pages = PageFetcher(
+            fetch, concurrency=self.fetch_threads, limiter=breaker,
+            retry=self.retry, stats=stats, process=submit_parse,
+        ).iter_pages(itertools.count(self.start_page))
+        try:
+            while True:
+                try:
+                    page_num, parsed = next(pages)
+                except OSError as e:
+                    print(f"Error fetching page {self._next_page}: {e}")
                     break
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                print(json.dumps({"error": str(e)}))
+                if parsed is None:
+                    if echo:
+                        print("Failed to fetch initial data.")
+                    break
+                try:
+                    results, stop_scraping = self._collect_records(parsed.result() or [])
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    print(json.dumps({"error": str(e)}))
+                    continue
+
+                stats.add_records(len(results))
+                self._next_page = page_num + 1
+                if echo:
+                    print(json.dumps(results))
+                if checkpoint is not None and self._checkpoint_due():
+                    self._save_checkpoint(checkpoint)
+                if stop_scraping or self.collected >= self.max_entries:
+                    break
+        finally:
+            # Stop promptly: drop queued fetches and parses. Closing the
+            # fetch stage joins its threads first, so none can submit to the
+            # parse pool after it starts shutting down
+            pages.close()
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+            # Also checkpoint on the way out, e.g. on Ctrl-C or an unexpected error
+            if checkpoint is not None and self.collected > self._checkpointed:
+                self._save_checkpoint(checkpoint)
+            stats.finish()
+
+        print(f"Pipeline: {stats.summary()}")
+        if breaker.trips:
+            print(f"Circuit breaker: tripped {breaker.trips}x, paused {breaker.paused:.0f}s")
+        return stats
+
+    def _handle_page(self, html, echo=True):
+        """Parse one survey page in-process and collect its records.
+
+        Args:
+            html (bytes): Raw page HTML.
+            echo (bool): Print the page's records as JSON progress output.
 
-            page += 1
-            # Be polite - add delay between requests
-            time.sleep(1)
+        Returns:
+            bool: True if scraping should stop.
+        """
+        results, stop_scraping = self._collect_records(self.parse_page(html, self.parser) or [])
+        if echo:
+            print(json.dumps(results))
+        return stop_scraping
 
-    def _process_rows(self, rows):
-        """Process table rows and extract applicant records.
+    def _collect_records(self, records):
+        """Collect parsed records until a known record is found.
+
+        Records go to the sink when one is set, otherwise to self.data.
 
         Args:
-            rows: List of BeautifulSoup tr elements.
+            records (list): Records of one page, in page order.
 
         Returns:
-            tuple: (list of record dicts, bool indicating if scraping should stop)
+            tuple: (list of collected record dicts, bool indicating if scraping should stop)
         """
         results = []
-        stop_scraping = False
-
-        for i in range(1, len(rows)):
-            tr = rows[i]
-            tds = tr.find_all('td')
-            if len(tds) < 4:
-                continue
-
-            record, should_stop = self._parse_row(rows, tr, tds, i)
-            if should_stop:
-                stop_scraping = True
-                break
-            if record:
-                results.append(record)
+        for record in records:
+            entry_url = record["url"]
+            # Check if we already have this record
+            if entry_url and entry_url in self.existing_urls:
+                print(f"Found existing record ({entry_url}). Stopping scrape.")
+                return results, True
+            results.append(record)
+            if self.sink is not None:
+                self.sink.write(record)
+            else:
                 self.data.append(record)
+            self.collected += 1
+        return results, False
 
-        return results, stop_scraping
+    @staticmethod
+    def parse_page(html, parser=None):
+        """Parse one survey page into applicant records.
 
-    def _parse_row(self, rows, tr, tds, idx):
-        """Parse a single table row into an applicant record.
+        Pure function of its inputs so it can run in a worker process.
 
         Args:
-            rows: All table rows (for accessing adjacent rows).
-            tr: The current row element.
-            tds: The td cells in the current row.
-            idx: Index of the current row.
+            html (bytes): Raw page HTML.
+            parser (str, optional): HTML backend name.
 
         Returns:
-            tuple: (record dict or None, bool indicating if scraping should stop)
+            list or None: Record dicts in page order, or None if the page
+            has no results table.
         """
-        entry_url = self._extract_url(tr.find('a', href=re.compile(r'/result/\d+')))
+        rows = get_backend(parser)(html)
+        if rows is None:
+            return None
+        return [
+            GradCafeScraper._build_record(rows, i)
+            for i in range(1, len(rows))
+            if len(rows[i].cells) >= 4
+        ]
+
+    @staticmethod
+    def _build_record(rows, idx):
+        """Build an applicant record from a single table row.
 
-        # Check if we already have this record
-        if entry_url and entry_url in self.existing_urls:
-            print(f"Found existing record ({entry_url}). Stopping scrape.")
-            return None, True
+        Args:
+            rows: All TableRow tuples (for accessing adjacent rows).
+            idx: Index of the current row.
 
-        decision, dec_date = self._parse_decision(tds[3].get_text(strip=True))
+        Returns:
+            dict: The applicant record.
+        """
+        cells = rows[idx].cells
+        decision, dec_date = GradCafeScraper._parse_decision(cells[3])
 
-        record = {
-            "university": re.sub(r'Report$', '', tds[0].get_text(strip=True)).strip(),
-            "program": tds[1].get_text(strip=True),
-            "degree": self._determine_degree(tds[1].get_text(strip=True)),
+        return {
+            "university": re.sub(r'Report$', '', cells[0]).strip(),
+            "program": cells[1],
+            "degree": GradCafeScraper._determine_degree(cells[1]),
             "status": decision,
             "decisionDate": dec_date,
-            "date_added": tds[2].get_text(strip=True),
-            "url": entry_url,
-            "comments": self._extract_comments(rows, idx)[:500],
-            "raw": self._extract_stats(rows, tr, idx),
+            "date_added": cells[2],
+            "url": GradCafeScraper._extract_url(rows[idx].link),
+            "comments": GradCafeScraper._extract_comments(rows, idx)[:500],
+            "raw": GradCafeScraper._extract_stats(rows, idx),
         }
-        return record, False
 
     @staticmethod
     def _parse_decision(decision_text):
@@ -208,33 +403,32 @@ class GradCafeScraper:
         )
 
     @staticmethod
-    def _extract_stats(rows, tr, idx):
+    def _extract_stats(rows, idx):
         """Extract stats text from current and adjacent rows."""
-        stats_text = tr.get_text(" ", strip=True)
+        stats_text = rows[idx].spaced_text
         if idx + 1 < len(rows):
-            stats_text += " " + rows[idx + 1].get_text(" ", strip=True)
+            stats_text += " " + rows[idx + 1].spaced_text
         return stats_text
 
     @staticmethod
     def _extract_comments(rows, idx):
         """Extract comments from the row two positions after current."""
-        if idx + 2 < len(rows) and len(rows[idx + 2].find_all('td')) == 1:
-            return rows[idx + 2].get_text(strip=True)
+        if idx + 2 < len(rows) and len(rows[idx + 2].cells) == 1:
+            return rows[idx + 2].text
         return ""
 
     @staticmethod
-    def _extract_url(link_tag):
-        """Extract a full URL from a link tag.
+    def _extract_url(path):
+        """Extract a full URL from a result link href.
 
         Args:
-            link_tag: BeautifulSoup tag element with href attribute.
+            path (str or None): The href of the row's /result/<id> link.
 
         Returns:
             str or None: The full URL, or None if no valid link found.
         """
-        if not link_tag or 'href' not in link_tag.attrs:
+        if not path:
             return None
-        path = link_tag['href']
         if path.startswith('/'):
             return f"https://www.thegradcafe.com{path}"
         return path
@@ -256,18 +450,78 @@ class GradCafeScraper:
         return "Other"
 
     def save_data(self, filename="applicant_data.json"):
-        """Save scraped applicant data to a JSON file.
+        """Finish the output file.
+
+        When streaming, records are already on disk and the sink is just
+        closed. Otherwise self.data is written as a JSON array.
 
         Args:
-            filename (str): Output file path. Defaults to 'applicant_data.json'.
+            filename (str): Output file path for non-streamed data.
+                Defaults to 'applicant_data.json'.
         """
+        if self.sink is not None:
+            self.sink.close()
+            print(f"{self.sink.count} records streamed to {self.sink.path}")
+            return
         with open(filename, 'w', encoding='utf-8') as f:
             json.dump(self.data, f, indent=4)
         print(f"Data saved to {filename}")
 
 
 if __name__ == "__main__":
-    # Initialize scraper and run the scraping process
-    scraper = GradCafeScraper()
-    scraper.scrape_data()
-    scraper.save_data()
+    arg_parser = argparse.ArgumentParser(description="Scrape GradCafe survey results.")
+    arg_parser.add_argument("--out", default="applicant_data.json",
+                        help="Output file.")
+    arg_parser.add_argument("--format", choices=["ndjson", "json"], default="ndjson",
+                        help="Output format: records streamed one per line as they "
+                             "are collected (default), or one JSON array written at the end.")
+    arg_parser.add_argument("--archive", default="raw_pages.archive",
+                        help="Compressed raw-page archive to append to / reparse from.")
+    arg_parser.add_argument("--no-archive", action="store_true",
+                        help="Do not archive fetched pages.")
+    arg_parser.add_argument("--reparse", action="store_true",
+                        help="Rebuild --out from the archive instead of crawling.")
+    arg_parser.add_argument("--run", default=None,
+                        help="Archive run to reparse (defaults to the latest run).")
+    arg_parser.add_argument("--parser", choices=sorted(BACKENDS), default=None,
+                        help="HTML parser backend (default: HTML_PARSER or 'stream').")
+    arg_parser.add_argument("--workers", type=int, default=None,
+                        help=f"Parser processes (default: {DEFAULT_PARSE_WORKERS}).")
+    arg_parser.add_argument("--fetch-threads", type=int, default=4,
+                        help="Maximum in-flight page requests.")
+    arg_parser.add_argument("--rate", type=float, default=1.0,
+                        help="Maximum page requests per second.")
+    arg_parser.add_argument("--checkpoint", default="scrape_checkpoint.json",
+                        help="Checkpoint file for resumable crawls.")
+    arg_parser.add_argument("--checkpoint-every", type=int, default=25,
+                        help="Pages between checkpoints.")
+    arg_parser.add_argument("--resume", action="store_true",
+                        help="Continue from the last checkpoint instead of page 1.")
+    args = arg_parser.parse_args()
+
+    sink = NDJSONWriter(args.out) if args.format == "ndjson" else None
+    if args.reparse:
+        # Offline mode: parse archived pages at CPU speed, no network or DB
+        scraper = GradCafeScraper(load_existing=False, parser=args.parser)
+        scraper.workers = args.workers
+        scraper.sink = sink
+        scraper.reparse_archive(PageArchive(args.archive), run=args.run)
+    else:
+        # Initialize scraper and run the scraping process
+        scraper = GradCafeScraper(
+            archive=None if args.no_archive else PageArchive(args.archive),
+            parser=args.parser,
+        )
+        scraper.workers = args.workers
+        scraper.fetch_threads = args.fetch_threads
+        scraper.sink = sink
+        # A streamed output file doubles as the checkpoint's record journal
+        scraper.checkpoint = CrawlCheckpoint(args.checkpoint, journal=sink)
+        scraper.checkpoint_every = max(1, args.checkpoint_every)
+        if not (args.resume and scraper.resume(scraper.checkpoint)):
+            scraper.checkpoint.clear()
+        scraper.scrape_data(rate=args.rate)
+    scraper.save_data(args.out)
+    if not args.reparse:
+        # The crawl finished and its output is on disk; the checkpoint is spent
+        scraper.checkpoint.clear()
@@ -0,0 +1,119 @@
+"""Bounded memo cache for repetitive field cleaning.
+
+A crawl repeats the same university, program, status and date strings
+thousands of times. ValueMemo remembers the cleaned form of each raw
+string (per field type) in a small LRU, so the cleaning passes run once
+per distinct value. Cleaned strings are interned, so every record that
+carries the same value shares one string object.
+"""
+
+import sys
+
+# Distinct (field type, raw string) pairs remembered per cleaner
+MEMO_SIZE = 50_000
+# Longer values (free-text comments) rarely repeat and are cleaned directly
+MEMO_MAX_LENGTH = 256
+
+_COUNTERS = ("hits", "misses", "evictions", "bypassed", "entries", "nbytes")
+
+
+class ValueMemo:  # pylint: disable=too-many-instance-attributes
+    """LRU cache of cleaned strings keyed by (field type, raw string).
+
+    The cache is a plain dict in recency order: a hit moves its key to the
+    end and an insert past maxsize evicts the first (least recently used)
+    key. Memory is tracked approximately as the size of the cached raw and
+    cleaned strings.
+
+    Attributes:
+        maxsize (int): Maximum number of cached values.
+        max_length (int): Values longer than this bypass the cache.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that ran the cleaning function.
+        evictions (int): Entries dropped to stay within maxsize.
+        bypassed (int): Values too long to cache.
+        nbytes (int): Approximate bytes held by cached strings.
+    """
+
+    def __init__(self, maxsize=MEMO_SIZE, max_length=MEMO_MAX_LENGTH):
+        """Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of cached values.
+            max_length (int): Longest raw string that is cached.
+        """
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+        self.nbytes = 0
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, kind, value, clean):
+        """Return clean(value), computing it at most once per cached value.
+
+        Args:
+            kind (str): Field type, e.g. "value" or "program".
+            value (str): Raw string.
+            clean (callable): Cleaning function for this field type.
+
+        Returns:
+            str: The (interned) cleaned string.
+        """
+        if len(value) > self.max_length:
+            self.bypassed += 1
+            return clean(value)
+
+        key = (kind, value)
+        entries = self._entries
+        try:
+            result = entries.pop(key)
+        except KeyError:
+            pass
+        else:
+            entries[key] = result
+            self.hits += 1
+            return result
+
+        self.misses += 1
+        result = sys.intern(clean(value))
+        entries[key] = result
+        self.nbytes += sys.getsizeof(value) + (0 if result is value else sys.getsizeof(result))
+        if len(entries) > self.maxsize:
+            old_key = next(iter(entries))
+            old_result = entries.pop(old_key)
+            old_value = old_key[1]
+            self.nbytes -= sys.getsizeof(old_value)
+            if old_result is not old_value:
+                self.nbytes -= sys.getsizeof(old_result)
+            self.evictions += 1
+        return result
+
+    def snapshot(self):
+        """Return the counters as a plain (picklable) dict."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "bypassed": self.bypassed, "entries": len(self._entries),
+                "nbytes": self.nbytes}
+
+
+def combine(snapshots):
+    """Sum snapshot() dicts, e.g. one per cleaning process."""
+    total = dict.fromkeys(_COUNTERS, 0)
+    for snap in snapshots:
+        for name in _COUNTERS:
+            total[name] += snap[name]
+    return total
+
+
+def format_stats(stats):
+    """Return a one-line summary of snapshot() or combine() counters."""
+    lookups = stats["hits"] + stats["misses"]
+    rate = 100.0 * stats["hits"] / lookups if lookups else 0.0
+    return (f"Value memo: {stats['hits']} hits / {lookups} lookups ({rate:.1f}% hit rate), "
+            f"{stats['entries']} entries (~{stats['nbytes'] / 1024:.1f} KiB), "
+            f"{stats['evictions']} evictions, {stats['bypassed']} long values uncached")
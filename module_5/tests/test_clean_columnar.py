@@ -0,0 +1,87 @@
+"""Tests for the pandas column engine (clean_columnar.ColumnarCleaner)."""
+
+import os
+import random
+import sys
+
+import pytest
+
+pytest.importorskip("pandas")
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+sys.path.insert(0, SUBPROCESS_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+# pylint: disable=wrong-import-position,import-error
+from clean import CleanOptions, DataCleaner, _clean_chunk_task, iter_clean
+from clean_columnar import ColumnarCleaner, clean_column
+from record_stream import iter_records
+from test_clean_stats import DATA_FILES, _fuzz_strings
+
+
+def _same_records(expected, actual):
+    """Equal records with the same key order and value types."""
+    assert actual == expected
+    assert [list(r.items()) for r in actual] == [list(r.items()) for r in expected]
+    assert [type(v) for r in actual for v in r.values()] == \
+        [type(v) for r in expected for v in r.values()]
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("path", DATA_FILES, ids=os.path.relpath)
+def test_columnar_engine_matches_python_engine_on_checked_in_data(path):
+    """Every checked-in dataset cleans to the same records with either engine."""
+    records = list(iter_records(path))
+    columnar = CleanOptions(engine="columnar")
+    _same_records(list(iter_clean(records)), list(iter_clean(records, columnar)))
+
+
+@pytest.mark.pipeline
+def test_columnar_engine_matches_on_mixed_and_generated_records():
+    """Mixed key sets, non-string cells and edge-case strings agree too."""
+    rng = random.Random(11)
+    texts = _fuzz_strings(3000)
+    cells = texts + [None, 0, 1, True, 2.5, float("inf")]
+    records = [
+        {"program": rng.choice(texts), "status": rng.choice(cells),
+         "raw": rng.choice(texts), "term": rng.choice(cells)}
+        for _ in range(3000)
+    ]
+    records += [{}, {"raw": "GPA 3.5 Fall 2026", "gpa": " 4.0 "}, {"comments": ["a"]}]
+    rng.shuffle(records)
+
+    expected = list(DataCleaner().iter_clean(records))
+    _same_records(expected, list(ColumnarCleaner(batch_size=500).iter_clean(records)))
+    # Process-pool chunks use the column engine as well
+    _same_records(expected, _clean_chunk_task(records, "columnar", 0)[2])
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("missing", [None, float("nan")], ids=["None", "NaN"])
+def test_engines_reject_missing_raw_text_alike(missing):
+    """A None/NaN "raw" cell fails the same way in both engines."""
+    records = [{"raw": "GPA 3.5 Fall 2026"}, {"raw": missing}, {"raw": "GRE 320"}]
+    with pytest.raises(AttributeError) as python_error:
+        list(DataCleaner().iter_clean(records))
+    with pytest.raises(AttributeError) as columnar_error:
+        ColumnarCleaner().clean_batch(records)
+    assert str(columnar_error.value) == str(python_error.value)
+    # Every value missing leaves factorize with no uniques at all
+    with pytest.raises(AttributeError, match=str(python_error.value)):
+        ColumnarCleaner().clean_batch([{"raw": missing}] * 2)
+
+
+@pytest.mark.pipeline
+def test_clean_column_cleans_each_distinct_value_once():
+    """Missing values normalize to "" and NaN / numbers pass through."""
+    cleaned = clean_column(["<b>PhD</b>", None, "N/A", 1, True, float("nan"), "<b>PhD</b>"])
+    assert cleaned[:5] == ["PhD", "", "", 1, True]
+    assert cleaned[4] is True and cleaned[5] != cleaned[5]
+    assert clean_column([" Computer  Science M.S. "], program=True) == ["Computer Science"]
+
+
+@pytest.mark.pipeline
+def test_unknown_engine_is_rejected():
+    """Engine names are validated up front."""
+    with pytest.raises(ValueError, match="arrow"):
+        DataCleaner(CleanOptions(engine="arrow"))
@@ -0,0 +1,107 @@
+"""Tests for incremental cleaning with the content-hash sidecar index."""
+
+import json
+import os
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+from clean import CleanOptions, DataCleaner  # pylint: disable=wrong-import-position,import-error
+import clean_index  # pylint: disable=wrong-import-position,import-error
+from clean_index import CleanIndex, clean_incremental  # pylint: disable=wrong-import-position,import-error
+from record_stream import NDJSONWriter, iter_records  # pylint: disable=wrong-import-position,import-error
+
+
+def _full_clean(records, path):
+    """Write the output of a plain, non-incremental run."""
+    with NDJSONWriter(str(path)) as out:
+        out.write_many(DataCleaner().iter_clean(records))
+
+
+class _CountingCleaner(DataCleaner):
+    """DataCleaner that records how many records it actually cleaned."""
+
+    def __init__(self, options=None):
+        super().__init__(options)
+        self.cleaned = 0
+
+    def iter_clean(self, records):
+        for record in super().iter_clean(records):
+            self.cleaned += 1
+            yield record
+
+
+def _run(records, out, workers=1):
+    cleaner = _CountingCleaner(CleanOptions(workers=workers, chunk_size=5))
+    index = CleanIndex(str(out) + ".index", "test")
+    result = clean_incremental(records, cleaner.iter_clean, str(out), index)
+    return result, cleaner.cleaned
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("workers", [1, 2])
+def test_rerun_cleans_only_changed_records(tmp_path, workers):
+    """Unchanged records are copied; output matches a full clean byte for byte."""
+    records = list(iter_records(DATA_FILE))
+    out = tmp_path / "cleaned.ndjson"
+
+    assert _run(records, out, workers) == ((len(records), len(records), 0), len(records))
+
+    # New records at the top (as the scraper writes them), one edited record
+    changed = [dict(records[0], program="Brand New Program PhD"),
+               {"program": "Another <b>Program</b>", "raw": "GPA 3.5 Fall 2027"}]
+    rerun = changed + records[1:]
+    (total, cleaned, copied), calls = _run(rerun, out, workers)
+    assert (total, cleaned, copied, calls) == (len(rerun), 2, len(rerun) - 2, 2)
+
+    expected = tmp_path / "expected.ndjson"
+    _full_clean(rerun, expected)
+    assert out.read_bytes() == expected.read_bytes()
+
+
+@pytest.mark.pipeline
+def test_stale_index_triggers_full_clean(tmp_path):
+    """A different cleaner version or an edited output invalidates the index."""
+    records = list(iter_records(DATA_FILE))[:20]
+    out = tmp_path / "cleaned.ndjson"
+    _run(records, out)
+
+    index_path = str(out) + ".index"
+    assert CleanIndex(index_path, "test").load(str(out))
+    assert not CleanIndex(index_path, "other-version").load(str(out))
+
+    with open(out, "ab") as f:
+        f.write(json.dumps({"program": "hand edit"}).encode() + b"\n")
+    assert _run(records, out)[1] == len(records)
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sparse_changes_keep_the_queue_bounded(tmp_path, monkeypatch, workers):
+    """Copies stream out instead of queueing; a full queue restarts clean()."""
+    records = [{"program": f"Program {i} PhD", "raw": f"GPA 3.{i % 10}"} for i in range(300)]
+    out = tmp_path / "cleaned.ndjson"
+    _run(records, out, workers)
+
+    # A changed record every 50 rows; the pool reads ahead past several
+    rerun = [dict(r, program="Changed") if i % 50 == 0 else r for i, r in enumerate(records)]
+    monkeypatch.setattr(clean_index, "MAX_PENDING", 120)
+    calls = []
+    cleaner = _CountingCleaner(CleanOptions(workers=workers, chunk_size=5))
+
+    def clean(changed):
+        calls.append(1)
+        return cleaner.iter_clean(changed)
+
+    result = clean_incremental(rerun, clean, str(out), CleanIndex(str(out) + ".index", "test"))
+    assert result == (300, 6, 294)
+    # In-process cleaning never queues a copy; the pool fills the queue
+    assert len(calls) == (1 if workers == 1 else 3)
+
+    expected = tmp_path / "expected.ndjson"
+    _full_clean(rerun, expected)
+    assert out.read_bytes() == expected.read_bytes()
@@ -0,0 +1,75 @@
+"""Tests for the DataCleaner value memo (value_memo.ValueMemo)."""
+
+import os
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+from clean import CleanOptions, DataCleaner, iter_clean  # pylint: disable=wrong-import-position,import-error
+from record_stream import iter_records  # pylint: disable=wrong-import-position,import-error
+from value_memo import ValueMemo, format_stats  # pylint: disable=wrong-import-position,import-error
+
+
+@pytest.mark.pipeline
+def test_memo_output_matches_uncached_cleaning():
+    """Memoized cleaning yields exactly the records of uncached cleaning."""
+    records = list(iter_records(DATA_FILE))
+    cleaner = DataCleaner()
+    # Clean twice so the second pass is answered from the memo
+    list(cleaner.iter_clean(records))
+    assert list(cleaner.iter_clean(records)) == list(iter_clean(records, CleanOptions(memo_size=0)))
+
+    stats = cleaner.memo_stats()
+    assert stats["hits"] >= stats["misses"] > 0
+    assert "hit rate" in format_stats(stats)
+
+
+@pytest.mark.pipeline
+def test_memo_interns_results_and_keys_by_field_type():
+    """Equal cleaned values share one object; program and value cache apart."""
+    cleaner = DataCleaner()
+    first = cleaner._clean_value("Accepted ")  # pylint: disable=protected-access
+    second = cleaner._clean_value("  Accepted")  # pylint: disable=protected-access
+    assert first == "Accepted" and first is second
+
+    assert cleaner._clean_value("Physics PhD") == "Physics PhD"  # pylint: disable=protected-access
+    assert cleaner._clean_program("Physics PhD") == "Physics"  # pylint: disable=protected-access
+    assert cleaner._clean_value(None) == ""  # pylint: disable=protected-access
+
+
+@pytest.mark.pipeline
+def test_memo_evicts_least_recently_used():
+    """The cache stays within maxsize and keeps recently used values."""
+    memo = ValueMemo(maxsize=2, max_length=10)
+    calls = []
+
+    def clean(value):
+        calls.append(value)
+        return value.upper()
+
+    memo.lookup("value", "a", clean)
+    memo.lookup("value", "b", clean)
+    memo.lookup("value", "a", clean)     # "a" is now the most recent
+    memo.lookup("value", "c", clean)     # evicts "b"
+    memo.lookup("value", "a", clean)
+    memo.lookup("value", "b", clean)
+    assert memo.lookup("value", "x" * 11, clean) == "X" * 11
+
+    assert calls == ["a", "b", "c", "b", "x" * 11]
+    stats = memo.snapshot()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["bypassed"]) == (2, 4, 2, 1)
+    assert stats["entries"] == 2 and stats["nbytes"] > 0
+
+
+@pytest.mark.pipeline
+def test_pool_reports_worker_memo_stats():
+    """Memo counters from pool workers are combined in the parent."""
+    records = list(iter_records(DATA_FILE))
+    cleaner = DataCleaner(CleanOptions(workers=2, chunk_size=7))
+    assert list(cleaner.iter_clean(records)) == list(iter_clean(records, CleanOptions(memo_size=0)))
+    stats = cleaner.memo_stats()
+    assert stats["hits"] + stats["misses"] > 0
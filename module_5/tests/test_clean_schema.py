@@ -0,0 +1,109 @@
+"""Tests for typed, schema-validated cleaner output (record_schema)."""
+
+import datetime
+import json
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+from psycopg.adapt import PyFormat, Transformer
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+from clean import CleanOptions, DataCleaner, iter_clean  # pylint: disable=wrong-import-position,import-error
+# pylint: disable=wrong-import-position,import-error
+from record_schema import RECORD_FIELDS, Degree, RecordTyper, Status, parse_date
+from record_stream import iter_records
+from module_5.src.load_new_data import load_new_records
+
+
+@pytest.mark.pipeline
+def test_typed_records_match_string_records():
+    """Typing changes value types only: same keys, order and meaning."""
+    records = list(iter_records(DATA_FILE))
+    for plain, typed in zip(iter_clean(records), iter_clean(records, CleanOptions(typed=True))):
+        assert list(plain) == list(typed)
+        for key, value in typed.items():
+            kind = RECORD_FIELDS.get(key, ("string",))[0]
+            if kind == "float64" and value is not None:
+                assert isinstance(value, float) and value == float(plain[key])
+            elif kind == "date32":
+                assert value == parse_date(plain[key])
+            elif kind == "string":
+                assert value == plain[key]
+
+
+@pytest.mark.pipeline
+def test_invalid_values_are_nulled_and_counted():
+    """Out-of-range scores, bad dates and unknown enums become None."""
+    typer = RecordTyper()
+    typed = typer.type_record({
+        "status": "accepted", "degree": "MFA", "date_added": "yesterday",
+        "gpa": "39.0", "greV": "165", "greAW": "", "comments": "",
+    })
+    assert typed == {"status": "Accepted", "degree": None, "date_added": None,
+                     "gpa": None, "greV": 165.0, "greAW": None, "comments": ""}
+    assert typer.invalid == {"degree": 1, "date_added": 1, "gpa": 1}
+    assert "3 invalid values" in typer.summary()
+    assert parse_date("Added on March 31, 2026") == "2026-03-31"
+
+
+@pytest.mark.pipeline
+def test_parquet_output_has_typed_columns(tmp_path):
+    """The Parquet file holds the same records with real column types."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    records = list(iter_records(DATA_FILE))
+    cleaner = DataCleaner(CleanOptions(typed=True))
+    cleaner.data = iter(records)
+    cleaner.clean_data()
+    cleaner.save_data(str(tmp_path / "out.ndjson"), parquet=str(tmp_path / "out.parquet"))
+
+    table = pq.read_table(str(tmp_path / "out.parquet"))
+    assert table.num_rows == len(records)
+    assert str(table.schema.field("gpa").type) == "double"
+    assert str(table.schema.field("date_added").type) == "date32[day]"
+    expected = list(iter_clean(records, CleanOptions(typed=True)))
+    assert table.column("gpa").to_pylist() == [r.get("gpa") for r in expected]
+    assert table.column("status").to_pylist() == [r["status"] for r in expected]
+
+
+@pytest.mark.pipeline
+def test_parquet_requires_typed_records(tmp_path):
+    """String records cannot be written to the typed Parquet schema."""
+    cleaner = DataCleaner()
+    with pytest.raises(ValueError):
+        cleaner.save_data(str(tmp_path / "out.ndjson"), parquet=str(tmp_path / "out.parquet"))
+
+
+@pytest.mark.db
+def test_loader_binds_typed_records(tmp_path, monkeypatch):
+    """--typed output (after the LLM step) loads with float scores and ISO dates."""
+    typed = list(iter_clean(iter_records(DATA_FILE), CleanOptions(typed=True)))
+    with open(tmp_path / "llm_extend_applicant_data.json", "w", encoding="utf-8") as f:
+        for record in typed:
+            row = dict(record, **{"llm-generated-program": record["program"],
+                                  "llm-generated-university": record["university"]})
+            f.write(json.dumps(row) + "\n")
+    monkeypatch.chdir(tmp_path)
+
+    with patch("module_5.src.load_new_data.psycopg.connect") as connect:
+        cur = connect.return_value.cursor.return_value
+        cur.fetchone.return_value = ["applicants"]
+        cur.fetchall.return_value = []
+        load_new_records()
+
+    inserts = [c.args[1] for c in cur.execute.call_args_list if len(c.args) > 1]
+    assert len(inserts) == len(typed)
+    transformer = Transformer()
+    for params, record in zip(inserts, typed):
+        degree, status, date_added, scores = params[2], params[3], params[8], params[10:14]
+        assert degree in {d.value for d in Degree} and status in {s.value for s in Status}
+        # date_added DATE: ISO text, which Postgres parses under any DateStyle
+        assert datetime.date.fromisoformat(date_added).isoformat() == record["date_added"]
+        for score in scores:
+            # gpa/gre FLOAT columns: bound as float8, not text
+            assert score is None or transformer.get_dumper(score, PyFormat.AUTO).oid == 701
+    assert any(score is not None for params in inserts for score in params[10:14])
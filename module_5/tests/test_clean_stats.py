@@ -0,0 +1,128 @@
+"""Equivalence tests for the single-pass DataCleaner stats extractor.
+
+The reference functions below are the previous per-field regex
+implementations; the compiled versions in clean.py must agree with them
+on every checked-in applicant_data.json and on generated edge cases.
+"""
+
+import glob
+import os
+import random
+import re
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+from clean import DataCleaner  # pylint: disable=wrong-import-position,import-error
+from record_stream import iter_records  # pylint: disable=wrong-import-position,import-error
+
+DATA_FILES = sorted(
+    glob.glob(os.path.join(REPO_ROOT, 'applicant_data.json'))
+    + glob.glob(os.path.join(REPO_ROOT, 'module_*', 'applicant_data.json'))
+)
+
+
+def reference_parse_stats(stats_text):
+    """Previous implementation: one re.search per field."""
+    data = {}
+    gpa_match = re.search(r'GPA\s*([\d\.]+)', stats_text, re.I)
+    if gpa_match:
+        data['gpa'] = gpa_match.group(1)
+    gre_match = re.search(r'GRE\s*(\d+)', stats_text, re.I)
+    if gre_match:
+        data['greScore'] = gre_match.group(1)
+    gre_v_match = re.search(r'GRE V\s*(\d+)', stats_text, re.I)
+    if gre_v_match:
+        data['greV'] = gre_v_match.group(1)
+    gre_aw_match = re.search(r'GRE AW\s*([\d\.]+)', stats_text, re.I)
+    if gre_aw_match:
+        data['greAW'] = gre_aw_match.group(1)
+    if 'International' in stats_text:
+        data['US/International'] = 'International'
+    elif 'American' in stats_text:
+        data['US/International'] = 'American'
+    sem_year = re.search(r'(Fall|Spring|Summer|Winter)\s*(\d{4})', stats_text, re.I)
+    if sem_year:
+        data['term'] = sem_year.group(1) + " " + sem_year.group(2)
+    return data
+
+
+def reference_clean_value(value):
+    """Previous implementation: regex and replace passes on every value."""
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        return value
+    value = re.sub(r'<[^>]+>', '', value)
+    value = value.replace('&nbsp;', ' ').replace('\n', ' ').replace('\r', '').replace('\t', ' ')
+    value = re.sub(r'\s+', ' ', value)
+    value = value.strip()
+    if value.lower() in ["n/a", "na", "none", "unknown", ""]:
+        return ""
+    return value
+
+
+def reference_clean_program(value):
+    """Previous implementation of program cleaning."""
+    value = reference_clean_value(value)
+    value = re.sub(
+        r"\s*(PhD|Master'?s?|M\.S\.|M\.A\.|M\.B\.A\.|M\.D\.|M\.E\.)\s*",
+        ' ', value, flags=re.I
+    )
+    return re.sub(r'\s+', ' ', value).strip()
+
+
+def _fuzz_strings(count, seed=7):
+    """Random strings built from stats tokens, separators and HTML remnants."""
+    pieces = [
+        "GPA", "gpa ", "GRE", "GRE V", "gre v", "GRE AW", "Gre Aw ", "3.91", "3.", ".5",
+        "320", "165", "4.5", "2026", "Fall", "fall ", "Spring", "SUMMER", "Winter",
+        "International", "international", "American", "Latin American", "Congress",
+        "Degree", " ", "  ", "\t", "\n", "\r", "\r\n", "&nbsp;", "&nb\rsp;", "<b>", "</b>",
+        "<", ">", "N/A", "none", "PhD", "Masters", "M.S.", "\u00a0", "\u2003", "\x1c", "x",
+        # Non-ASCII text takes the case-insensitive path: long s, dotted I,
+        # Kelvin sign and Arabic-Indic digits must match as before
+        "\u017fpring", "\u0130nternational", "\u212a", "Gr\u00e9", "\u0663",
+    ]
+    rng = random.Random(seed)
+    return ["".join(rng.choice(pieces) for _ in range(rng.randint(0, 12))) for _ in range(count)]
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("path", DATA_FILES, ids=os.path.relpath)
+def test_parse_stats_matches_reference_on_checked_in_data(path):
+    """Every raw stats string in the repo parses exactly as before."""
+    cleaner = DataCleaner()
+    records = list(iter_records(path))
+    assert records
+    for record in records:
+        raw = record.get("raw") or ""
+        assert cleaner.parse_stats(raw) == reference_parse_stats(raw)
+        assert list(cleaner.parse_stats(raw)) == list(reference_parse_stats(raw))
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("path", DATA_FILES, ids=os.path.relpath)
+def test_clean_values_match_reference_on_checked_in_data(path):
+    """Field cleaning is unchanged for every value in the repo's data."""
+    cleaner = DataCleaner()
+    for record in iter_records(path):
+        for key, value in record.items():
+            if key == "program":
+                assert cleaner._clean_program(value) == reference_clean_program(value)  # pylint: disable=protected-access
+            else:
+                assert cleaner._clean_value(value) == reference_clean_value(value)  # pylint: disable=protected-access
+
+
+@pytest.mark.pipeline
+def test_single_pass_matches_reference_on_generated_edge_cases():
+    """Case, overlap, whitespace and entity edge cases agree with the old code."""
+    cleaner = DataCleaner()
+    for text in _fuzz_strings(20000):
+        assert cleaner.parse_stats(text) == reference_parse_stats(text), text
+        assert cleaner._clean_value(text) == reference_clean_value(text), text  # pylint: disable=protected-access
+        assert cleaner._clean_program(text) == reference_clean_program(text), text  # pylint: disable=protected-access
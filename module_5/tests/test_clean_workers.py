@@ -0,0 +1,63 @@
+"""Tests for process-pool (chunked) cleaning in DataCleaner."""
+
+import itertools
+import os
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+# pylint: disable=wrong-import-position,import-error
+from clean import CleanOptions, DataCleaner, _clean_chunk_task, iter_clean
+from record_stream import NDJSONWriter, iter_records
+
+
+@pytest.mark.pipeline
+def test_pool_output_is_byte_identical_to_serial(tmp_path):
+    """Chunks come back in input order and serialize exactly like serial cleaning."""
+    records = list(iter_records(DATA_FILE))
+    serial, pooled = tmp_path / "serial.ndjson", tmp_path / "pooled.ndjson"
+    with NDJSONWriter(str(serial)) as out:
+        out.write_many(iter_clean(records))
+    with NDJSONWriter(str(pooled)) as out:
+        # A chunk size that does not divide the input leaves a short last chunk
+        out.write_many(iter_clean(iter(records), CleanOptions(workers=2, chunk_size=7)))
+
+    assert pooled.read_bytes() == serial.read_bytes()
+    assert out.count == len(records)
+
+
+@pytest.mark.pipeline
+def test_pool_reads_input_lazily():
+    """Only a bounded number of chunks is read ahead of the consumer."""
+    consumed = []
+
+    def source():
+        for i in itertools.count():
+            consumed.append(i)
+            yield {"program": f"Program {i} PhD", "raw": "GPA 3.9 Fall 2026"}
+
+    cleaner = DataCleaner(CleanOptions(workers=2, chunk_size=5))
+    cleaned = cleaner.iter_clean(source())
+    first = next(cleaned)
+    cleaned.close()
+
+    assert first == {"program": "Program 0", "gpa": "3.9", "term": "Fall 2026"}
+    # Two chunks per worker in flight, plus the chunk that triggered the yield
+    assert len(consumed) <= 5 * (2 * 2 + 1) + 1
+
+
+@pytest.mark.pipeline
+def test_clean_chunk_task_matches_serial_cleaning():
+    """The process-pool task cleans exactly like the in-process path."""
+    records = list(itertools.islice(iter_records(DATA_FILE), 50))
+    expected = list(DataCleaner().iter_clean(records))
+    pid, memo_stats, cleaned = _clean_chunk_task(records, "python", 100)
+    assert cleaned == expected
+    assert pid == os.getpid()
+    assert memo_stats["misses"] > 0
+    # Without a memo the task reports no counters
+    assert _clean_chunk_task(records, "python", 0)[1:] == (None, expected)
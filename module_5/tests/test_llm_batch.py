@@ -0,0 +1,47 @@
+"""Tests for the llm_hosting batch planner (dedup and fan-out)."""
+
+import os
+import sys
+
+import pytest
+
+LLM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess', 'llm_hosting'))
+sys.path.insert(0, LLM_DIR)
+
+from batch_plan import BatchPlan, standardize_rows  # pylint: disable=wrong-import-position,import-error
+
+
+def _fake_standardize(calls):
+    def standardize(program, university):
+        calls.append((program, university))
+        return {"standardized_program": program.strip().title(),
+                "standardized_university": university.strip() or "Unknown"}
+    return standardize
+
+
+@pytest.mark.pipeline
+def test_each_distinct_pair_is_standardized_once():
+    """Repeated pairs share one call and results keep row order."""
+    rows = [
+        {"program": "math", "university": "UBC", "id": 0},
+        {"program": "Physics", "university": "MIT", "id": 1},
+        {"program": " MATH ", "university": "ubc", "id": 2},
+        {"program": "math", "university": "UBC", "id": 3},
+        {"program": None, "id": 4},
+    ]
+    calls = []
+    stats = standardize_rows(rows, _fake_standardize(calls))
+
+    assert calls == [("math", "UBC"), ("Physics", "MIT"), ("", "")]
+    assert [row["id"] for row in rows] == [0, 1, 2, 3, 4]
+    assert [row["llm-generated-program"] for row in rows] == ["Math", "Physics", "Math", "Math", ""]
+    assert rows[4]["llm-generated-university"] == "Unknown"
+    assert stats == {"rows": 5, "unique_pairs": 3, "dedup_ratio": 1.67, "llm_calls_saved": 2}
+
+
+@pytest.mark.pipeline
+def test_empty_batch():
+    """An empty request plans nothing and reports zeros."""
+    plan = BatchPlan([])
+    assert plan.run(_fake_standardize([])) == []
+    assert plan.stats() == {"rows": 0, "unique_pairs": 0, "dedup_ratio": 0.0, "llm_calls_saved": 0}
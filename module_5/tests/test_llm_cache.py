@@ -0,0 +1,76 @@
+"""Tests for the persistent standardization result cache (llm_hosting)."""
+
+import os
+import sys
+
+import pytest
+
+LLM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess', 'llm_hosting'))
+sys.path.insert(0, LLM_DIR)
+
+from result_cache import ResultCache, normalize_pair, prompt_version  # pylint: disable=wrong-import-position,import-error
+
+
+def _result(program, university):
+    return {"standardized_program": program, "standardized_university": university}
+
+
+@pytest.mark.pipeline
+def test_cache_persists_across_instances(tmp_path):
+    """A result stored by one process is a hit for the next."""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path, "model@v1")
+    assert cache.get("Info Studies", "McG") is None
+    cache.put("Info Studies", "McG", _result("Information Studies", "McGill University"))
+    cache.close()
+
+    warm = ResultCache(path, "model@v1")
+    # Whitespace and case differences share one entry
+    assert warm.get("  info   studies", "MCG ") == _result("Information Studies", "McGill University")
+    assert warm.stats()["hits"] == 1 and warm.stats()["misses"] == 0
+    assert len(warm) == 1
+
+
+@pytest.mark.pipeline
+def test_namespace_separates_models_and_prompts(tmp_path):
+    """Entries from another model or prompt version are never returned."""
+    path = str(tmp_path / "cache.sqlite3")
+    ResultCache(path, "model@v1").put("Math", "UBC", _result("Mathematics", "UBC"))
+    assert ResultCache(path, "model@v2").get("Math", "UBC") is None
+    assert prompt_version("prompt", [1]) != prompt_version("prompt", [2])
+    assert normalize_pair(" A  b ", None) == ("a b", "")
+
+
+@pytest.mark.pipeline
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    """Past max_entries the least recently used entries are dropped."""
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), "ns", max_entries=20)
+    for i in range(20):
+        cache.put(f"p{i}", "u", _result(f"P{i}", "U"))
+    assert cache.get("p0", "u") is not None      # p0 is now the most recent
+    cache.put("p20", "u", _result("P20", "U"))
+
+    assert len(cache) == 19 and cache.evictions == 2
+    assert cache.get("p0", "u") is not None
+    assert cache.get("p1", "u") is None and cache.get("p2", "u") is None
+    assert cache.get("p20", "u") is not None
+
+
+@pytest.mark.pipeline
+def test_processes_sharing_the_file_share_size_and_lru_order(tmp_path):
+    """Size and recency come from the table, not from per-process counters."""
+    path = str(tmp_path / "cache.sqlite3")
+    first = ResultCache(path, "ns", max_entries=20)
+    second = ResultCache(path, "ns", max_entries=20)
+    for i in range(10):
+        first.put(f"p{i}", "u", _result(f"P{i}", "U"))
+        second.put(f"q{i}", "u", _result(f"Q{i}", "U"))
+    assert len(first) == len(second) == 20
+    # A hit through one connection makes p0 the newest entry for both
+    assert second.get("p0", "u") is not None
+
+    first.put("r", "u", _result("R", "U"))
+    assert len(second) == 19 and first.evictions == 2 and second.evictions == 0
+    assert second.get("p0", "u") is not None
+    assert second.get("q0", "u") is None and second.get("p1", "u") is None
+    assert second.stats()["entries"] == 19
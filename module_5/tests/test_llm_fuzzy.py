@@ -0,0 +1,73 @@
+"""Agreement tests: FuzzyIndex.best() against difflib.get_close_matches."""
+
+import difflib
+import json
+import os
+import random
+import sys
+
+import pytest
+
+LLM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess', 'llm_hosting'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, LLM_DIR)
+
+from fuzzy_index import FuzzyIndex  # pylint: disable=wrong-import-position,import-error
+
+
+def _read(name):
+    with open(os.path.join(LLM_DIR, name), encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def _perturb(rng, text):
+    """Apply one random typo-like edit."""
+    if not text:
+        return text
+    i = rng.randrange(len(text))
+    edit = rng.choice(("drop", "dup", "swap", "case", "suffix", "prefix"))
+    if edit == "drop":
+        return text[:i] + text[i + 1:]
+    if edit == "dup":
+        return text[:i] + text[i] + text[i:]
+    if edit == "swap" and i + 1 < len(text):
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    if edit == "case":
+        return text.title() if rng.random() < 0.5 else text.lower()
+    if edit == "suffix":
+        return text + rng.choice((" Program", "s", ", USA", " (MS)"))
+    return rng.choice(("The ", "Univ ", "Dept of ")) + text
+
+
+def _queries(candidates, field):
+    rng = random.Random(20260115)
+    with open(DATA_FILE, encoding="utf-8") as f:
+        queries = [row[field] for row in json.load(f)]
+    for name in rng.sample(candidates, min(60, len(candidates))):
+        queries.append(name)
+        queries.append(_perturb(rng, name))
+        queries.append(_perturb(rng, _perturb(rng, name)))
+    queries += ["", "x", "MIT", "ubc", "Universty of Toronto", "Mathematic"]
+    return queries
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("list_name, field", [("canon_universities.txt", "university"),
+                                              ("canon_programs.txt", "program")])
+@pytest.mark.parametrize("cutoff", [0.75, 0.84, 0.86, 0.95])
+def test_index_agrees_with_difflib(list_name, field, cutoff):
+    """Every query returns exactly difflib's best match (or None)."""
+    candidates = _read(list_name)
+    index = FuzzyIndex(candidates)
+    for query in _queries(candidates, field):
+        matches = difflib.get_close_matches(query, candidates, n=1, cutoff=cutoff) if query else []
+        assert index.best(query, cutoff) == (matches[0] if matches else None), query
+
+
+@pytest.mark.pipeline
+def test_ties_break_like_difflib():
+    """Equal scores pick the lexicographically largest candidate."""
+    candidates = ["abcx", "abcy", "abcz"]
+    index = FuzzyIndex(candidates)
+    assert index.best("abc", 0.5) == difflib.get_close_matches("abc", candidates, n=1, cutoff=0.5)[0]
+    assert "abcx" in index and "abc" not in index
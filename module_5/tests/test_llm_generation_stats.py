@@ -0,0 +1,21 @@
+"""Tests for the llm_hosting model-call timing counters."""
+
+import os
+import sys
+
+import pytest
+
+LLM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess', 'llm_hosting'))
+sys.path.insert(0, LLM_DIR)
+
+from generation_stats import GenerationStats  # pylint: disable=wrong-import-position,import-error
+
+
+@pytest.mark.pipeline
+def test_generation_stats_summary():
+    """Mean time to first token and rows/sec over recorded calls."""
+    stats = GenerationStats()
+    assert stats.summary() == {"calls": 0, "avg_ttft_seconds": None, "rows_per_second": None}
+    stats.record(0.1, 0.5)
+    stats.record(0.3, 1.5)
+    assert stats.summary() == {"calls": 2, "avg_ttft_seconds": 0.2, "rows_per_second": 1.0}
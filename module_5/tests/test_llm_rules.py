@@ -0,0 +1,96 @@
+"""Tests for the rules-first standardizer (llm_hosting/rules.py)."""
+
+import difflib
+import json
+import os
+import re
+import sys
+
+import pytest
+
+LLM_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess', 'llm_hosting'))
+DATA_FILE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'applicant_data.json'))
+sys.path.insert(0, LLM_DIR)
+
+from rules import CanonicalRules, ResolverStats  # pylint: disable=wrong-import-position,import-error
+
+
+def _read(name):
+    with open(os.path.join(LLM_DIR, name), encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+CANON_PROGS = _read("canon_programs.txt")
+CANON_UNIS = _read("canon_universities.txt")
+ABBREV_UNI = {r"(?i)^mcg(\.|ill)?$": "McGill University", r"(?i)^(ubc|u\.?b\.?c\.?)$":
+              "University of British Columbia", r"(?i)^uoft$": "University of Toronto"}
+UNI_FIXES = {"McGiill University": "McGill University",
+             "University Of British Columbia": "University of British Columbia"}
+PROG_FIXES = {"Mathematic": "Mathematics", "Info Studies": "Information Studies"}
+RULES = CanonicalRules(CANON_PROGS, CANON_UNIS, ABBREV_UNI, UNI_FIXES, PROG_FIXES)
+
+
+def reference_university(uni):
+    """The previous _post_normalize_university from app.py."""
+    u = (uni or "").strip()
+    for pat, full in ABBREV_UNI.items():
+        if re.fullmatch(pat, u):
+            u = full
+            break
+    u = UNI_FIXES.get(u, u)
+    if u:
+        u = re.sub(r"\bOf\b", "of", u.title())
+    if u in CANON_UNIS:
+        return u
+    match = difflib.get_close_matches(u, CANON_UNIS, n=1, cutoff=0.86) if u else []
+    return match[0] if match else (u or "Unknown")
+
+
+def reference_program(prog):
+    """The previous _post_normalize_program from app.py."""
+    p = PROG_FIXES.get((prog or "").strip(), (prog or "").strip()).title()
+    if p in CANON_PROGS:
+        return p
+    match = difflib.get_close_matches(p, CANON_PROGS, n=1, cutoff=0.84) if p else []
+    return match[0] if match else p
+
+
+def _rows():
+    with open(DATA_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+@pytest.mark.pipeline
+def test_post_normalization_matches_previous_rules():
+    """Refactored clean/match steps give the old post-normalized names."""
+    for row in _rows():
+        prog = RULES.clean_program(row["program"])
+        assert (RULES.match_program(prog, 0.84) or prog) == reference_program(row["program"])
+        uni = RULES.clean_university(row["university"])
+        assert (RULES.match_university(uni, 0.86) or uni or "Unknown") == \
+            reference_university(row["university"])
+
+
+@pytest.mark.pipeline
+def test_resolve_only_confident_rows():
+    """Canonical, abbreviated or fixed-up pairs resolve; vague ones do not."""
+    assert RULES.resolve(" Info Studies", "McG") == {
+        "standardized_program": "Information Studies",
+        "standardized_university": "McGill University"}
+    assert RULES.resolve("Mathematic", "University Of British Columbia") == {
+        "standardized_program": "Mathematics",
+        "standardized_university": "University of British Columbia"}
+    assert RULES.resolve("Information Studies, McGill University", "") is None
+    assert RULES.resolve("Mathematics", "Some Unlisted College") is None
+
+
+@pytest.mark.pipeline
+def test_resolver_stats_summary():
+    """The summary reports the skipped fraction and an estimated gain."""
+    stats = ResolverStats()
+    stats.counts.update(rules=6, cache=2, model=2)
+    stats.seconds.update(rules=0.01, cache=0.01, model=2.0)
+    summary = stats.summary()
+    assert summary["rows"] == 10 and summary["skipped_model_fraction"] == 0.8
+    assert summary["avg_model_seconds"] == 1.0
+    assert summary["est_throughput_gain"] == pytest.approx(10 / 2.02, abs=0.01)
@@ -0,0 +1,125 @@
+"""Tests for the streaming NDJSON / JSON array record reader and writer."""
+
+import json
+import os
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+# pylint: disable=wrong-import-position,import-error
+from record_stream import NDJSONWriter, iter_records
+from scrape import GradCafeScraper
+
+RECORDS = [{"id": i, "name": f"row {i}", "gpa": 3.5 + i / 100, "flag": i % 2 == 0}
+           for i in range(200)]
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("chunk_size", [7, 64, 1 << 16])
+def test_array_elements_split_across_chunks(tmp_path, chunk_size):
+    """Elements cut at any chunk boundary are decoded once complete."""
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(RECORDS, indent=2), encoding="utf-8")
+    assert list(iter_records(str(path), chunk_size=chunk_size)) == RECORDS
+
+
+@pytest.mark.pipeline
+def test_array_syntax_error_fails_without_reading_to_eof(tmp_path):
+    """A bad element mid-file is reported at once, not as truncation."""
+    path = tmp_path / "records.json"
+    body = json.dumps(RECORDS[:3])[:-1] + ', {"id": 3 "name": "x"}, ' + json.dumps(RECORDS[4:])[1:]
+    path.write_text(body, encoding="utf-8")
+
+    records = iter_records(str(path), chunk_size=256)
+    assert [next(records) for _ in range(3)] == RECORDS[:3]
+    with pytest.raises(ValueError, match="invalid JSON array: Expecting ',' delimiter") as exc:
+        next(records)
+    assert "truncated" not in str(exc.value)
+
+
+@pytest.mark.pipeline
+def test_truncated_array_is_reported(tmp_path):
+    """A file cut off mid-element is still reported as truncated."""
+    path = tmp_path / "records.json"
+    path.write_text(json.dumps(RECORDS)[:-30], encoding="utf-8")
+    with pytest.raises(ValueError, match="truncated JSON array"):
+        list(iter_records(str(path), chunk_size=64))
+
+
+@pytest.mark.pipeline
+def test_writer_opens_lazily(tmp_path):
+    """A write-mode writer leaves an existing file alone until the first write."""
+    path = tmp_path / "out.ndjson"
+    path.write_text('{"old": 1}\n', encoding="utf-8")
+
+    writer = NDJSONWriter(str(path))
+    assert path.read_text(encoding="utf-8") == '{"old": 1}\n'
+    writer.write({"new": 1})
+    writer.close()
+    assert list(iter_records(str(path))) == [{"new": 1}]
+
+
+@pytest.mark.pipeline
+def test_writer_sync_returns_durable_offset(tmp_path):
+    """sync() reports the byte length written so far."""
+    path = tmp_path / "out.ndjson"
+    with NDJSONWriter(str(path)) as writer:
+        writer.write_many(RECORDS[:5])
+        offset = writer.sync()
+        assert offset == os.path.getsize(path)
+        writer.write(RECORDS[5])
+        assert writer.sync() > offset
+    assert writer.count == 6
+
+
+@pytest.mark.pipeline
+def test_truncate_rolls_back_and_switches_to_append(tmp_path):
+    """After truncate() a write-mode writer appends instead of replacing the file."""
+    path = tmp_path / "out.ndjson"
+    with NDJSONWriter(str(path)) as writer:
+        writer.write_many(RECORDS[:2])
+        kept = writer.sync()
+        writer.write_many(RECORDS[2:4])
+        writer.truncate(kept, 2)
+        writer.write(RECORDS[9])
+    assert writer.count == 3
+    assert list(iter_records(str(path))) == [RECORDS[0], RECORDS[1], RECORDS[9]]
+
+    # A fresh write-mode writer rolled back on resume keeps what is on disk
+    resumed = NDJSONWriter(str(path))
+    resumed.truncate(kept, 2)
+    resumed.write(RECORDS[10])
+    resumed.close()
+    assert list(iter_records(str(path))) == [RECORDS[0], RECORDS[1], RECORDS[10]]
+
+
+@pytest.mark.pipeline
+def test_close_without_writes_creates_empty_file(tmp_path):
+    """Closing an unused writer still leaves a (empty) output file behind."""
+    path = tmp_path / "out.ndjson"
+    NDJSONWriter(str(path)).close()
+    assert path.read_bytes() == b""
+    assert not list(iter_records(str(path)))
+
+
+@pytest.mark.pipeline
+def test_scraper_streams_records_to_sink(tmp_path):
+    """With a sink, collected records go to disk as NDJSON instead of self.data."""
+    path = tmp_path / "out.ndjson"
+    scraper = GradCafeScraper(load_existing=False, parser="stream")
+    scraper.sink = NDJSONWriter(str(path))
+    records = [{"url": f"https://www.thegradcafe.com/result/{r['id']}", **r} for r in RECORDS[:6]]
+    scraper.existing_urls = {records[4]["url"]}
+
+    results, stop = scraper._collect_records(records)  # pylint: disable=protected-access
+    scraper.save_data(str(tmp_path / "unused.json"))
+
+    assert stop and results == records[:4]
+    assert not scraper.data
+    assert scraper.collected == scraper.sink.count == 4
+    assert not (tmp_path / "unused.json").exists()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == records[:4]
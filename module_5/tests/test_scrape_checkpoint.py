@@ -0,0 +1,160 @@
+"""Tests for resuming an interrupted crawl from its checkpoint."""
+
+import json
+import os
+import sys
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+# pylint: disable=wrong-import-position,import-error
+from checkpoint import CrawlCheckpoint
+from record_stream import NDJSONWriter, iter_records
+from scrape import GradCafeScraper
+
+LAST_PAGE = 9
+PER_PAGE = 3
+
+
+def _page(page_num):
+    """One survey page with PER_PAGE results whose ids encode the page."""
+    rows = "".join(
+        f"<tr><td>University {page_num}</td><td>Computer Science PhD</td>"
+        f"<td>March {page_num}, 2026</td><td>Accepted on 1 Mar</td>"
+        f'<td><a href="/result/{page_num * 100 + i}">See More</a></td></tr>'
+        for i in range(PER_PAGE)
+    )
+    return f"<table><tr><th>School</th></tr>{rows}</table>".encode("utf-8")
+
+
+def _fetch(crash_at=None):
+    """Fake fetch: LAST_PAGE pages, then the end; raises on page crash_at."""
+    def fetch(page_num):
+        if page_num == crash_at:
+            raise RuntimeError(f"crashed on page {page_num}")
+        return _page(page_num) if page_num <= LAST_PAGE else None
+    return fetch
+
+
+def _scraper(sink, checkpoint):
+    scraper = GradCafeScraper(load_existing=False, parser="stream")
+    scraper.workers = 1
+    scraper.fetch_threads = 2
+    scraper.checkpoint_every = 2
+    scraper.sink = sink
+    scraper.checkpoint = checkpoint
+    return scraper
+
+
+def _crawl(tmp_path, name, fmt, fetch, resume=False):
+    """Run one crawl the way scrape.py's __main__ does and return the scraper."""
+    out = str(tmp_path / name)
+    sink = NDJSONWriter(out) if fmt == "ndjson" else None
+    scraper = _scraper(sink, CrawlCheckpoint(str(tmp_path / (name + ".ckpt")), journal=sink))
+    if not (resume and scraper.resume(scraper.checkpoint)):
+        scraper.checkpoint.clear()
+    scraper._run_pipeline(fetch, rate=None, echo=False,  # pylint: disable=protected-access
+                          checkpoint=scraper.checkpoint)
+    scraper.save_data(out)
+    scraper.checkpoint.clear()
+    return scraper
+
+
+def _journal_path(tmp_path, name, fmt):
+    if fmt == "ndjson":
+        return tmp_path / name
+    return tmp_path / (name + ".ckpt.records.ndjson")
+
+
+@pytest.fixture(scope="module")
+def clean_records(tmp_path_factory):
+    """Records of an uninterrupted crawl."""
+    tmp_path = tmp_path_factory.mktemp("clean")
+    _crawl(tmp_path, "clean.ndjson", "ndjson", _fetch())
+    records = list(iter_records(str(tmp_path / "clean.ndjson")))
+    assert len(records) == LAST_PAGE * PER_PAGE
+    return records
+
+
+@pytest.mark.pipeline
+@pytest.mark.parametrize("fmt", ["ndjson", "json"])
+@pytest.mark.parametrize("torn", [b"", b'{"university": "Univ', b'{"a": 1}\n{"b": 2}\n{"c"'],
+                         ids=["no-tail", "partial-line", "records-after-save"])
+def test_resume_matches_uninterrupted_crawl(tmp_path, clean_records, fmt, torn):
+    """A crash, a torn journal tail and --resume give the same output as one clean run."""
+    with pytest.raises(RuntimeError, match="crashed on page 6"):
+        _crawl(tmp_path, "out", fmt, _fetch(crash_at=6))
+
+    state = json.loads((tmp_path / "out.ckpt").read_text(encoding="utf-8"))
+    assert state["next_page"] == 6
+    assert state["records"] == 5 * PER_PAGE
+    # Bytes written after the last state update, as if the process died
+    # between appending records and replacing the state file
+    with open(_journal_path(tmp_path, "out", fmt), "ab") as f:
+        f.write(torn)
+
+    scraper = _crawl(tmp_path, "out", fmt, _fetch(), resume=True)
+
+    assert scraper.start_page == 6
+    assert list(iter_records(str(tmp_path / "out"))) == clean_records
+    if fmt == "json":
+        assert (tmp_path / "out").read_text(encoding="utf-8").lstrip().startswith("[")
+
+
+@pytest.mark.pipeline
+def test_resume_without_checkpoint_starts_fresh(tmp_path, capsys):
+    """--resume with no checkpoint on disk crawls from page 1."""
+    scraper = _scraper(None, CrawlCheckpoint(str(tmp_path / "missing.ckpt")))
+    assert scraper.resume(scraper.checkpoint) is False
+    assert scraper.start_page == 1
+    assert "No checkpoint found" in capsys.readouterr().out
+
+
+@pytest.mark.pipeline
+def test_load_rolls_back_bytes_after_last_save(tmp_path):
+    """load() truncates the journal to the saved offset and later saves append."""
+    checkpoint = CrawlCheckpoint(str(tmp_path / "state.json"))
+    checkpoint.save(3, [{"id": 1}, {"id": 2}], "run-a")
+    saved_size = os.path.getsize(checkpoint.journal.path)
+    checkpoint.journal.write({"id": 3})
+    checkpoint.journal.sync()
+    checkpoint.journal.close()
+
+    reloaded = CrawlCheckpoint(str(tmp_path / "state.json"))
+    state = reloaded.load()
+
+    assert state["records"] == 2 and state["run_id"] == "run-a"
+    assert os.path.getsize(reloaded.journal.path) == saved_size
+    reloaded.save(4, [{"id": 4}], "run-a")
+    assert list(reloaded.records()) == [{"id": 1}, {"id": 2}, {"id": 4}]
+    assert reloaded.journal.count == 3
+
+
+@pytest.mark.pipeline
+def test_clear_keeps_a_caller_owned_journal(tmp_path):
+    """clear() removes the state file but not the output passed in as journal."""
+    out = tmp_path / "out.ndjson"
+    sink = NDJSONWriter(str(out))
+    checkpoint = CrawlCheckpoint(str(tmp_path / "state.json"), journal=sink)
+    sink.write({"id": 1})
+    checkpoint.save(2, [], "run-a")
+
+    checkpoint.clear()
+
+    assert not checkpoint.exists()
+    assert list(iter_records(str(out))) == [{"id": 1}]
+
+
+@pytest.mark.pipeline
+def test_clear_removes_its_own_journal(tmp_path):
+    """A private journal is deleted along with the state file."""
+    checkpoint = CrawlCheckpoint(str(tmp_path / "state.json"))
+    checkpoint.save(2, [{"id": 1}], "run-a")
+
+    checkpoint.clear()
+
+    assert not checkpoint.exists()
+    assert not os.path.exists(checkpoint.journal.path)
+    assert not list(checkpoint.records())
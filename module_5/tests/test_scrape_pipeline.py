@@ -0,0 +1,128 @@
+"""Tests for the scraper's fetch / process-pool parse pipeline."""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+SUBPROCESS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src', 'subprocess'))
+sys.path.insert(0, SUBPROCESS_DIR)
+
+# pylint: disable=wrong-import-position,import-error
+import scrape
+from scrape import GradCafeScraper
+
+PER_PAGE = 3
+FETCH_THREADS = 3
+
+
+def _url(page_num, i):
+    return f"https://www.thegradcafe.com/result/{page_num * 100 + i}"
+
+
+def _page(page_num):
+    """One survey page with PER_PAGE results whose ids encode the page."""
+    rows = "".join(
+        f"<tr><td>University {page_num}</td><td>Computer Science PhD</td>"
+        f"<td>March {page_num}, 2026</td><td>Accepted on 1 Mar</td>"
+        f'<td><a href="/result/{page_num * 100 + i}">See More</a></td></tr>'
+        for i in range(PER_PAGE)
+    )
+    return f"<table><tr><th>School</th></tr>{rows}</table>".encode("utf-8")
+
+
+class StubFetch:  # pylint: disable=too-few-public-methods
+    """Fake fetch with uneven delays so later pages often finish first."""
+
+    def __init__(self, last_page=None, bodies=None):
+        self.last_page = last_page
+        self.bodies = bodies or {}
+        self.fetched = []
+
+    def __call__(self, page_num):
+        self.fetched.append(page_num)
+        time.sleep((page_num * 7 % 5) * 0.01)
+        if self.last_page is not None and page_num > self.last_page:
+            return None
+        return self.bodies.get(page_num, _page(page_num))
+
+
+class RecordingPool(ProcessPoolExecutor):
+    """Process pool that remembers every parse future it hands out."""
+
+    futures = []
+
+    def submit(self, *args, **kwargs):  # pylint: disable=arguments-differ
+        future = super().submit(*args, **kwargs)
+        RecordingPool.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def scraper(monkeypatch):
+    RecordingPool.futures = []
+    monkeypatch.setattr(scrape, "ProcessPoolExecutor", RecordingPool)
+    scraper = GradCafeScraper(load_existing=False, parser="stream")
+    scraper.workers = 1
+    scraper.fetch_threads = FETCH_THREADS
+    return scraper
+
+
+def _run(scraper, fetch):
+    scraper._run_pipeline(fetch, rate=None, echo=False)  # pylint: disable=protected-access
+
+
+@pytest.mark.pipeline
+def test_records_are_emitted_in_page_order(scraper):
+    """Pages finishing out of order are still collected in page order."""
+    fetch = StubFetch(last_page=8)
+    _run(scraper, fetch)
+
+    assert [r["url"] for r in scraper.data] == [_url(p, i) for p in range(1, 9) for i in range(PER_PAGE)]
+    assert scraper.collected == 8 * PER_PAGE
+
+
+@pytest.mark.pipeline
+def test_stops_at_existing_url_and_cancels_queued_work(scraper):
+    """A known URL on page k ends the crawl without fetching past the window."""
+    scraper.existing_urls = {_url(4, 1)}
+    fetch = StubFetch()
+    _run(scraper, fetch)
+
+    assert [r["url"] for r in scraper.data] == (
+        [_url(p, i) for p in range(1, 4) for i in range(PER_PAGE)] + [_url(4, 0)])
+    # Page 4 was consumed with pages 5..4+FETCH_THREADS in flight, and nothing else
+    assert max(fetch.fetched) <= 4 + FETCH_THREADS
+    assert all(future.done() for future in RecordingPool.futures)
+    fetched = list(fetch.fetched)
+    time.sleep(0.2)
+    assert fetch.fetched == fetched
+
+
+@pytest.mark.pipeline
+def test_max_entries_ends_the_crawl_after_the_page_reaching_it(scraper):
+    """Collection stops at the first page boundary at or past max_entries."""
+    scraper.max_entries = 2 * PER_PAGE + 1
+    fetch = StubFetch()
+    _run(scraper, fetch)
+
+    assert scraper.collected == 3 * PER_PAGE
+    assert [r["url"] for r in scraper.data][-1] == _url(3, PER_PAGE - 1)
+    assert max(fetch.fetched) <= 3 + FETCH_THREADS
+    assert all(future.done() for future in RecordingPool.futures)
+
+
+@pytest.mark.pipeline
+def test_failed_parse_skips_the_page(scraper, capsys):
+    """A page whose parse raises is reported and the crawl moves on."""
+    # Not HTML at all: the parser raises TypeError in the worker process
+    fetch = StubFetch(last_page=4, bodies={2: [1, 2]})
+    _run(scraper, fetch)
+
+    assert [r["url"] for r in scraper.data] == [_url(p, i) for p in (1, 3, 4) for i in range(PER_PAGE)]
+    errors = [json.loads(line) for line in capsys.readouterr().out.splitlines()
+              if line.startswith('{"error"')]
+    assert len(errors) == 1 and "expected string or bytes-like object" in errors[0]["error"]
@@ -16,17 +16,49 @@ CREATE TABLE IF NOT EXISTS applicants (
     gre_v FLOAT,
     gre_aw FLOAT,
     llm_generated_program TEXT,
-    llm_generated_university TEXT
+    llm_generated_university TEXT,
+    -- set once the /result/<id> detail page has been fetched (enrich_results)
+    enriched_at TIMESTAMPTZ,
+    -- digest of the survey-index fields, compared by refresh_recent
+    content_hash BYTEA
 );
 
 ALTER TABLE applicants ADD CONSTRAINT applicants_url_unique UNIQUE (url);
 
+-- Rows still waiting for detail-page enrichment, newest first
+CREATE INDEX IF NOT EXISTS applicants_unenriched_idx
+    ON applicants (p_id) WHERE enriched_at IS NULL;
+
+-- last_seen_id is the highest numeric GradCafe result ID ingested;
+-- known_ids is a serialized Bloom filter of every ingested result ID.
 CREATE TABLE IF NOT EXISTS ingestion_watermarks (
     source TEXT PRIMARY KEY,
     last_seen TEXT,
+    last_seen_id BIGINT,
+    known_ids BYTEA,
     updated_at TIMESTAMPTZ DEFAULT now()
 );
 
+-- Next free request slot per rate limit, shared by all worker replicas
+CREATE TABLE IF NOT EXISTS fetch_rate_limits (
+    name TEXT PRIMARY KEY,
+    next_slot TIMESTAMPTZ NOT NULL
+);
+
+-- Progress of sharded historical backfills (one row per page-range shard);
+-- status is pending, running, done or failed
+CREATE TABLE IF NOT EXISTS backfill_shards (
+    backfill_id TEXT NOT NULL,
+    first_page INT NOT NULL,
+    last_page INT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    records INT,
+    error TEXT,
+    updated_at TIMESTAMPTZ DEFAULT now(),
+    PRIMARY KEY (backfill_id, first_page)
+);
+
 -- Materialized view for analytics summary
 CREATE MATERIALIZED VIEW IF NOT EXISTS analytics_summary AS
 SELECT
@@ -49,13 +49,27 @@ def load_data(json_path=None, db_url=None):
     conn = psycopg.connect(db_url)
     cur = conn.cursor()
 
-    # Ensure watermarks table exists
+    # Ensure watermarks table exists (and has the result-ID columns on
+    # databases created before they were added, as well as applicants'
+    # enrichment timestamp and content hash)
     cur.execute(sql.SQL(
         "CREATE TABLE IF NOT EXISTS ingestion_watermarks ("
         "source TEXT PRIMARY KEY, "
         "last_seen TEXT, "
+        "last_seen_id BIGINT, "
+        "known_ids BYTEA, "
         "updated_at TIMESTAMPTZ DEFAULT now())"
     ))
+    cur.execute(sql.SQL(
+        "ALTER TABLE ingestion_watermarks "
+        "ADD COLUMN IF NOT EXISTS last_seen_id BIGINT, "
+        "ADD COLUMN IF NOT EXISTS known_ids BYTEA"
+    ))
+    cur.execute(sql.SQL(
+        "ALTER TABLE applicants "
+        "ADD COLUMN IF NOT EXISTS enriched_at TIMESTAMPTZ, "
+        "ADD COLUMN IF NOT EXISTS content_hash BYTEA"
+    ))
 
     insert_sql = sql.SQL(
         "INSERT INTO applicants "
@@ -5,6 +5,8 @@ import os
 
 # Add the web directory to sys.path so we can import app and publisher
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "web")))
+# Add the worker directory so the etl package can be imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "worker")))
 
 from unittest.mock import MagicMock, patch
 
@@ -74,3 +76,12 @@ def in_memory_db():
         mock_cur.execute.side_effect = db_state.execute
         mock_cur.fetchone.side_effect = db_state.fetchone
         yield db_state
+
+
+@pytest.fixture
+def worker_db():
+    """Mock the worker consumer's DB connection; yields (conn, cur)."""
+    with patch("consumer._get_db_conn") as mock_connect:
+        mock_conn = MagicMock()
+        mock_connect.return_value = mock_conn
+        yield mock_conn, mock_conn.cursor.return_value
@@ -0,0 +1,127 @@
+"""Tests for sharded backfill planning, shard crawling and the shared rate limit."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import consumer
+import plan_backfill
+from etl import incremental_scraper
+from etl.rate_limit import SharedRateLimiter
+
+PAGE = (
+    "<table><tr><th>School</th></tr>"
+    "<tr><td>MIT</td><td>CS PhD</td><td>March 1, 2026</td><td>Accepted on 1 Mar</td>"
+    "<td><a href='/result/{id}'>See More</a></td></tr></table>"
+)
+
+
+@pytest.mark.etl
+def test_plan_shards_covers_range_without_overlap():
+    """Shards tile the page range; the last one may be short."""
+    assert plan_backfill.plan_shards(1, 120, 50) == [(1, 50), (51, 100), (101, 120)]
+    assert plan_backfill.plan_shards(7, 7, 50) == [(7, 7)]
+    with pytest.raises(ValueError):
+        plan_backfill.plan_shards(10, 5, 50)
+
+
+@pytest.mark.etl
+def test_scrape_page_range_stops_at_end_of_survey():
+    """Every page in range is parsed; a page with no table ends the range."""
+    pages = {3: PAGE.format(id=30), 4: PAGE.format(id=40), 5: b"<p>no results</p>"}
+    with patch.object(incremental_scraper, "fetch_page", side_effect=pages.get):
+        done = []
+        records = incremental_scraper.scrape_page_range(3, 9, rate=0, on_page=done.append)
+    assert done == [3, 4, 5]
+    assert [r["url"] for r in records] == [
+        "https://www.thegradcafe.com/result/30", "https://www.thegradcafe.com/result/40",
+    ]
+
+
+@pytest.mark.etl
+def test_scrape_page_range_raises_fetch_errors():
+    """A failed page fails the shard rather than silently truncating it."""
+    def fetch(page):
+        if page == 2:
+            raise OSError("HTTP 503")
+        return PAGE.format(id=page)
+
+    with patch.object(incremental_scraper, "fetch_page", side_effect=fetch):
+        with pytest.raises(OSError):
+            incremental_scraper.scrape_page_range(1, 3, rate=0)
+
+
+@pytest.mark.etl
+def test_backfill_skips_shard_that_is_already_done(worker_db):
+    """A redelivered shard whose row is 'done' does no crawling."""
+    _, cur = worker_db
+    cur.fetchone.return_value = None
+    with patch.object(consumer, "scrape_page_range") as scrape:
+        consumer.handle_backfill_pages({"backfill_id": "b1", "first_page": 1, "last_page": 50})
+    scrape.assert_not_called()
+
+
+@pytest.mark.etl
+def test_backfill_records_failed_shard(worker_db):
+    """A fetch error rolls back the inserts and marks only this shard failed."""
+    conn, cur = worker_db
+    cur.fetchone.return_value = (2,)
+    with patch.object(consumer, "scrape_page_range", side_effect=OSError("HTTP 503")):
+        consumer.handle_backfill_pages({"backfill_id": "b1", "first_page": 51, "last_page": 100})
+
+    conn.rollback.assert_called_once()
+    sql_text, params = cur.execute.call_args.args
+    assert "UPDATE backfill_shards" in sql_text.as_string(None)
+    assert params == ("failed", None, "HTTP 503", "b1", 51)
+
+
+@pytest.mark.etl
+def test_backfill_marks_shard_failed_on_unexpected_error(worker_db):
+    """Any error leaves the shard 'failed', never stuck in 'running'."""
+    conn, cur = worker_db
+    cur.fetchone.return_value = (1,)
+    with patch.object(consumer, "scrape_page_range", side_effect=KeyError("cells")), \
+            pytest.raises(KeyError):
+        consumer.handle_backfill_pages({"backfill_id": "b1", "first_page": 1, "last_page": 50})
+
+    _, params = cur.execute.call_args.args
+    assert params[:3] == ("failed", None, "'cells'")
+    assert conn.commit.call_count == 2
+
+
+@pytest.mark.etl
+def test_backfill_heartbeat_after_every_page(worker_db):
+    """A running shard bumps updated_at per page, so retry does not requeue it."""
+    _, cur = worker_db
+    cur.fetchone.return_value = (1,)
+
+    def scrape(first_page, last_page, limiter, on_page):
+        for page in range(first_page, last_page + 1):
+            on_page(page)
+        return []
+
+    with patch.object(consumer, "scrape_page_range", side_effect=scrape), \
+            patch.object(consumer, "_shared_limiter"), \
+            patch.object(consumer, "_load_known_results",
+                         return_value=(MagicMock(last_seen_id=None), False)), \
+            patch.object(consumer, "_update_watermark"):
+        consumer.handle_backfill_pages({"backfill_id": "b1", "first_page": 1, "last_page": 3})
+
+    heartbeats = [c for c in cur.execute.call_args_list
+                  if "SET updated_at = now()" in c.args[0].as_string(None)]
+    assert [c.args[1] for c in heartbeats] == [("b1", 1)] * 3
+
+
+@pytest.mark.etl
+def test_shared_rate_limiter_sleeps_until_booked_slot():
+    """The limiter sleeps for the booked slot minus one interval, once per call."""
+    conn = MagicMock()
+    conn.execute.return_value.fetchone.side_effect = [(0.5,), (1.25,)]
+    limiter = SharedRateLimiter(lambda: conn, rate=2.0)
+    with patch("etl.rate_limit.time.sleep") as sleep:
+        limiter.acquire()
+        limiter.acquire()
+    sleep.assert_called_once_with(0.75)
+    assert conn.autocommit is True and limiter.waited == 0.75
+    limiter.close()
+    conn.close.assert_called_once()
@@ -0,0 +1,123 @@
+"""Tests for detail-page enrichment of GradCafe results."""
+
+from unittest.mock import patch
+
+import pika
+import pytest
+
+import consumer
+from etl import enrichment
+from etl.http_session import FetchError
+
+DETAIL = (
+    "<html><body><dl>"
+    "<div><dt>Institution</dt><dd>MIT</dd></div>"
+    "<div><dt>Degree's Country of Origin</dt><dd>International</dd></div>"
+    "<div><dt>Undergrad GPA</dt><dd>3.85</dd></div>"
+    "<div><dt>GRE General:</dt><dd>0</dd></div>"
+    "<div><dt>GRE Verbal:</dt><dd>165</dd></div>"
+    "<div><dt>Analytical Writing:</dt><dd>4.50</dd></div>"
+    "<div><dt>Notes</dt><dd>Funded &amp; happy</dd></div>"
+    "</dl></body></html>"
+)
+URL = "https://www.thegradcafe.com/result/{}"
+
+
+@pytest.mark.etl
+def test_parse_result_page_maps_fields_to_columns():
+    """Known labels become typed column values; unreported (0) scores are dropped."""
+    assert enrichment.parse_result_page(DETAIL.encode()) == {
+        "us_or_international": "International",
+        "gpa": 3.85,
+        "gre_v": 165.0,
+        "gre_aw": 4.5,
+    }
+    assert not enrichment.parse_result_page("<p>nothing here</p>")
+
+
+@pytest.mark.etl
+def test_enrich_results_dedupes_and_skips_removed_results():
+    """Each ID is fetched once; a 404 is recorded as None, not an error."""
+    requested = []
+
+    def get(url):
+        requested.append(url)
+        if url.endswith("/2"):
+            raise FetchError("HTTP 404", status=404)
+        return DETAIL.encode()
+
+    with patch.object(enrichment.SESSION, "get", side_effect=get):
+        details = enrichment.enrich_results([1, 2, 1, 3], rate=0)
+
+    assert list(details) == [1, 2, 3]
+    assert details[2] is None and details[3]["gpa"] == 3.85
+    assert sorted(requested) == [URL.format(i) for i in (1, 2, 3)]
+
+
+@pytest.mark.etl
+def test_enrich_results_keeps_progress_when_a_page_keeps_failing():
+    """A page that fails after its retries ends the run with earlier results kept."""
+    def get(url):
+        if url.endswith("/2"):
+            raise FetchError("HTTP 403", status=403)
+        return DETAIL.encode()
+
+    with patch.object(enrichment.SESSION, "get", side_effect=get):
+        details = enrichment.enrich_results([1, 2, 3], concurrency=1, rate=0)
+    assert list(details) == [1]
+
+
+@pytest.mark.etl
+def test_handle_enrich_results_updates_claimed_rows(worker_db):
+    """Claimed rows are updated with detail values and marked enriched."""
+    conn, cur = worker_db
+    cur.fetchall.return_value = [(URL.format(7),), (URL.format(8),)]
+    details = {7: {"gpa": 3.9, "gre_v": 160.0}, 8: None}
+    with patch.object(consumer, "enrich_results", return_value=details) as enrich:
+        consumer.handle_enrich_results({"result_ids": [7, 8, 8]})
+
+    claimed = enrich.call_args.args[0]
+    assert claimed == {7: URL.format(7), 8: URL.format(8)}
+    select_sql, select_params = cur.execute.call_args.args
+    assert "FOR UPDATE SKIP LOCKED" in select_sql.as_string(None)
+    assert select_params == ([URL.format(7), URL.format(8), URL.format(8)],)
+
+    update_sql, rows = cur.executemany.call_args.args
+    assert "enriched_at = now()" in update_sql.as_string(None)
+    assert rows == [
+        (None, 3.9, None, 160.0, None, URL.format(7)),
+        (None, None, None, None, None, URL.format(8)),
+    ]
+    conn.commit.assert_called_once()
+
+
+@pytest.mark.etl
+def test_claim_looks_up_stored_urls_when_fetching_elsewhere(worker_db):
+    """GRADCAFE_RESULT_URL only changes where pages are fetched, not the stored key."""
+    _, cur = worker_db
+    cur.fetchall.return_value = [(URL.format(7),)]
+    standin = "http://127.0.0.1:8000/result/{id}"
+    # As if GRADCAFE_RESULT_URL was set, wherever the template was imported
+    with patch.object(enrichment, "RESULT_URL", standin), \
+            patch.object(consumer, "RESULT_URL", standin, create=True), \
+            patch.object(consumer, "enrich_results", return_value={7: None}) as enrich:
+        consumer.handle_enrich_results({"result_ids": [7]})
+
+    assert cur.execute.call_args.args[1] == ([URL.format(7)],)
+    assert enrich.call_args.args[0] == {7: URL.format(7)}
+
+
+@pytest.mark.etl
+def test_queue_enrichment_batches_new_result_ids():
+    """Scraped result IDs are queued once each, in ENRICH_BATCH-sized tasks."""
+    records = [{"url": URL.format(i)} for i in (5, 4, 4, 3)] + [{"url": None}]
+    with patch.object(consumer, "ENRICH_AFTER_SCRAPE", True), \
+            patch.object(consumer, "ENRICH_BATCH", 2), \
+            patch.object(consumer, "_publish_tasks") as publish:
+        consumer._queue_enrichment(records)  # pylint: disable=protected-access
+        publish.assert_called_once_with(
+            "enrich_results", [{"result_ids": [5, 4]}, {"result_ids": [3]}],
+        )
+
+        publish.side_effect = pika.exceptions.AMQPConnectionError()
+        consumer._queue_enrichment(records)  # pylint: disable=protected-access
@@ -0,0 +1,97 @@
+"""Tests for the concurrent, rate-limited page fetcher."""
+
+import threading
+import time
+
+import pytest
+
+from etl import incremental_scraper
+from etl.fetcher import FetchStats, PageFetcher, TokenBucket
+
+
+def _page_html(page, ids):
+    """Build a minimal survey page with one result row per id."""
+    rows = "".join(
+        f"<tr><td>Uni {i}</td><td>Computer Science PhD</td><td>01/02/2026</td>"
+        f'<td>Accepted on 1 Feb</td><td><a href="/result/{i}">View</a></td></tr>'
+        for i in ids
+    )
+    return f"<html><body><table><tr><th>h</th></tr>{rows}</table></body></html>".encode()
+
+
+@pytest.mark.etl
+def test_pages_yielded_in_order_despite_out_of_order_completion():
+    """Later pages finishing first must not reorder results."""
+    def fetch(page):
+        time.sleep(0.05 if page == 1 else 0.0)
+        return str(page).encode()
+
+    fetcher = PageFetcher(fetch, concurrency=4, rate=None)
+    assert [p for p, _ in fetcher.iter_pages(range(1, 9))] == list(range(1, 9))
+    assert fetcher.stats.pages == 8
+
+
+@pytest.mark.etl
+def test_closing_iterator_cancels_outstanding_pages():
+    """Stopping early fetches at most the read-ahead window."""
+    fetched = []
+    lock = threading.Lock()
+
+    def fetch(page):
+        with lock:
+            fetched.append(page)
+        return b"x"
+
+    fetcher = PageFetcher(fetch, concurrency=2, rate=None)
+    pages = fetcher.iter_pages(range(1, 1000))
+    next(pages)
+    pages.close()
+    time.sleep(0.05)
+    assert len(fetched) <= 4
+
+
+@pytest.mark.etl
+def test_closing_iterator_waits_for_running_fetches():
+    """After close() no fetch thread is still running its process hook."""
+    started = threading.Event()
+    processed = []
+
+    def fetch(page):
+        if page == 2:
+            started.set()
+            time.sleep(0.1)
+        return b"x"
+
+    fetcher = PageFetcher(fetch, concurrency=2, rate=None,
+                          process=lambda page, body: processed.append(page))
+    pages = fetcher.iter_pages(range(1, 3))
+    next(pages)
+    started.wait(1)
+    pages.close()
+    assert processed == [1, 2]
+
+
+@pytest.mark.etl
+def test_token_bucket_limits_rate():
+    """Five acquisitions at 50/s take roughly 80ms after the first token."""
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.07
+
+
+@pytest.mark.etl
+def test_scrape_stops_at_first_known_url(monkeypatch):
+    """Records stop at the first known URL; later pages are not parsed."""
+    pages = {1: _page_html(1, [30, 29, 28]), 2: _page_html(2, [27, 26, 25]),
+             3: _page_html(3, [24, 23])}
+    monkeypatch.setattr(incremental_scraper, "fetch_page", lambda p: pages.get(p, b""))
+
+    stats = FetchStats()
+    records = incremental_scraper.scrape_new_records(
+        {"https://www.thegradcafe.com/result/26"}, max_pages=3, rate=0, stats=stats,
+    )
+    assert [r["url"].rsplit("/", 1)[1] for r in records] == ["30", "29", "28", "27"]
+    assert stats.records == 4
+    assert stats.pages_per_sec > 0
@@ -0,0 +1,71 @@
+"""Tests for the keep-alive, compression-aware HTTP session."""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from etl.http_session import FetchError, HTTPSession
+
+BODY = b"<table>" + b"<tr><td>row</td></tr>" * 500 + b"</table>"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve a gzip-compressed page over HTTP/1.1 keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if "missing" in self.path:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = BODY
+        self.send_response(200)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            payload = gzip.compress(BODY)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    """Run a local HTTP server for the duration of a test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.etl
+def test_session_reuses_connection_and_decompresses(server_url):
+    """Sequential requests share one connection and bodies are decoded."""
+    session = HTTPSession()
+    for page in range(5):
+        assert session.get(f"{server_url}/survey", fields={"page": page}) == BODY
+    assert session.connections_opened == 1
+    assert session.connections_reused == 4
+    assert session.bytes_saved > 0
+    session.close()
+
+
+@pytest.mark.etl
+def test_session_raises_fetch_error_with_status(server_url):
+    """HTTP errors surface as FetchError (an OSError) carrying the status."""
+    session = HTTPSession()
+    with pytest.raises(FetchError) as info:
+        session.get(f"{server_url}/missing")
+    assert info.value.status == 404
+    assert isinstance(info.value, OSError)
+    session.get(f"{server_url}/survey")
+    assert session.statuses == {404: 1, 200: 1}
+    assert "statuses 200:1 404:1" in session.summary()
@@ -0,0 +1,134 @@
+"""Tests for the numeric result-ID watermark and the known-ID Bloom filter."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import consumer
+from etl.known_ids import BloomFilter, KnownResults, result_id
+
+URL = "https://www.thegradcafe.com/result/{}"
+
+
+@pytest.mark.etl
+def test_result_id_parses_numeric_id():
+    """IDs are compared as numbers, so 1000 ranks above 999."""
+    assert result_id(URL.format(1000)) > result_id(URL.format(999))
+    assert result_id("/result/42") == 42
+    assert result_id("https://www.thegradcafe.com/survey") is None
+    assert result_id(None) is None
+
+
+@pytest.mark.etl
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    """Every added ID is found; unseen IDs rarely are."""
+    bloom = BloomFilter(10_000, error_rate=0.01)
+    for rid in range(0, 20_000, 2):
+        bloom.add(rid)
+
+    assert all(rid in bloom for rid in range(0, 20_000, 2))
+    false_positives = sum(rid in bloom for rid in range(1, 20_000, 2))
+    assert false_positives < 10_000 * 0.03
+    assert 9_900 < len(bloom) <= 10_000 and not bloom.full
+
+
+@pytest.mark.etl
+def test_bloom_filter_round_trips_through_bytes():
+    """A persisted filter answers exactly like the original."""
+    bloom = BloomFilter(1000)
+    for rid in (7, 995259, 1_000_000):
+        bloom.add(rid)
+
+    restored = BloomFilter.from_bytes(bloom.to_bytes())
+    assert (restored.capacity, restored.count, restored.num_hashes) == (1000, 3, bloom.num_hashes)
+    assert all(rid in restored for rid in (7, 995259, 1_000_000))
+    with pytest.raises(ValueError):
+        BloomFilter.from_bytes(b"garbage")
+
+
+@pytest.mark.etl
+def test_bloom_filter_update_merges_compatible_filters():
+    """OR-ing two filters keeps every ID of both and estimates the count."""
+    left, right = BloomFilter(10_000), BloomFilter(10_000)
+    for rid in range(0, 3000):
+        left.add(rid)
+    for rid in range(2000, 5000):
+        right.add(rid)
+
+    left.update(right)
+    assert all(rid in left for rid in range(5000))
+    assert 4900 < len(left) < 5100
+    with pytest.raises(ValueError):
+        left.update(BloomFilter(100))
+
+
+@pytest.mark.etl
+def test_known_results_only_consults_filter_at_or_below_watermark():
+    """IDs above the watermark are always new; lower ones go through the filter."""
+    known = KnownResults(None, BloomFilter(100))
+    assert URL.format(5) not in known
+
+    known.add(URL.format(999))
+    known.add(URL.format(1000))
+    assert known.last_seen_id == 1000
+    assert URL.format(999) in known
+    assert URL.format(998) not in known
+    assert URL.format(1001) not in known
+    assert None not in known
+
+
+@pytest.mark.etl
+def test_insert_records_tracks_numeric_max_id():
+    """The watermark follows the numeric ID, not the lexically largest URL."""
+    cur = MagicMock()
+    known = KnownResults(None, BloomFilter(100))
+    records = [{"url": URL.format(999)}, {"url": URL.format(1000)}, {"url": None}]
+
+    assert consumer._insert_records(cur, records, known) == (1000, URL.format(1000))  # pylint: disable=protected-access
+    assert cur.execute.call_count == 3
+    assert URL.format(999) in known
+
+
+@pytest.mark.etl
+def test_load_known_results_rebuilds_then_reuses_persisted_filter():
+    """A missing filter is rebuilt from applicants; a stored one is loaded as is."""
+    cur = MagicMock()
+    cur.fetchone.return_value = None
+    cur.fetchall.return_value = [(URL.format(10),), (URL.format(12),)]
+    known, rebuilt = consumer._load_known_results(cur)  # pylint: disable=protected-access
+    assert rebuilt and known.last_seen_id == 12 and URL.format(10) in known
+
+    cur = MagicMock()
+    cur.fetchone.return_value = (12, known.id_filter.to_bytes())
+    reloaded, rebuilt = consumer._load_known_results(cur)  # pylint: disable=protected-access
+    assert not rebuilt and reloaded.last_seen_id == 12 and URL.format(10) in reloaded
+    cur.fetchall.assert_not_called()
+
+
+@pytest.mark.etl
+def test_scrape_locks_watermark_only_after_the_crawl(worker_db):
+    """The crawl runs unlocked; IDs saved meanwhile are merged, not overwritten."""
+    conn, cur = worker_db
+    ours, theirs = BloomFilter(1000), BloomFilter(1000)
+    ours.add(10)
+    theirs.add(10)
+    theirs.add(500)  # saved by a backfill shard during the crawl
+    cur.fetchone.side_effect = [(10, ours.to_bytes()), (500, theirs.to_bytes())]
+    events = []
+    cur.execute.side_effect = lambda query, *args: events.append(
+        "lock" if "FOR UPDATE" in str(query) else "sql")
+    conn.commit.side_effect = lambda: events.append("commit")
+
+    def scrape(_known, limiter):
+        events.append("scrape")
+        return [{"url": URL.format(20)}]
+
+    with patch.object(consumer, "scrape_new_records", side_effect=scrape), \
+            patch.object(consumer, "_shared_limiter"), \
+            patch.object(consumer, "_queue_enrichment"):
+        consumer.handle_scrape_new_data({})
+
+    assert events == ["sql", "commit", "scrape", "sql", "lock", "sql", "commit"]
+    saved_id, saved_filter = cur.execute.call_args.args[1][2:]
+    assert saved_id == 500
+    assert all(rid in BloomFilter.from_bytes(saved_filter) for rid in (10, 20, 500))
@@ -0,0 +1,100 @@
+"""Tests for the compressed, append-only raw-page archive."""
+
+import multiprocessing
+
+import pytest
+
+from etl.page_archive import PageArchive
+
+
+@pytest.mark.etl
+def test_archive_round_trip_latest_run(tmp_path):
+    """Pages come back decompressed, in page order, for the latest run."""
+    path = str(tmp_path / "pages.archive")
+    archive = PageArchive(path)
+    archive.append(1, b"old page one", run="r1")
+    archive.append(2, b"<html>two</html>", run="r2")
+    archive.append(1, b"<html>one</html>", run="r2")
+
+    reopened = PageArchive(path)
+    assert reopened.runs() == ["r1", "r2"]
+    assert list(reopened.iter_pages()) == [(1, b"<html>one</html>"), (2, b"<html>two</html>")]
+    assert list(reopened.iter_pages("r1")) == [(1, b"old page one")]
+    assert reopened.replay()(2) == b"<html>two</html>"
+    assert reopened.replay()(3) is None
+
+
+@pytest.mark.etl
+def test_truncated_trailing_frame_is_ignored(tmp_path):
+    """A crash mid-append leaves earlier frames readable."""
+    path = tmp_path / "pages.archive"
+    archive = PageArchive(str(path))
+    archive.append(1, b"complete" * 100, run="r1")
+    archive.append(2, b"partial" * 100, run="r1")
+    path.write_bytes(path.read_bytes()[:-5])
+
+    assert [page for page, _ in PageArchive(str(path)).iter_pages()] == [1]
+
+
+@pytest.mark.etl
+def test_append_after_torn_frame_round_trips(tmp_path):
+    """Appending after a crash cuts the torn frame off instead of burying it."""
+    path = tmp_path / "pages.archive"
+    archive = PageArchive(str(path))
+    archive.append(1, b"one" * 100, run="r1")
+    archive.append(2, b"two" * 100, run="r1")
+    archive.append(3, b"three" * 100, run="r1")
+    path.write_bytes(path.read_bytes()[:-5])
+
+    resumed = PageArchive(str(path))
+    for page in (3, 4, 5):
+        resumed.append(page, f"page {page}".encode() * 50, run="r1")
+
+    reopened = PageArchive(str(path))
+    assert [e.page for e in reopened.entries()] == [1, 2, 3, 4, 5]
+    assert list(reopened.iter_pages()) == [
+        (1, b"one" * 100), (2, b"two" * 100),
+        *((page, f"page {page}".encode() * 50) for page in (3, 4, 5)),
+    ]
+
+
+@pytest.mark.etl
+def test_writers_sharing_a_file_keep_each_others_frames(tmp_path):
+    """A stale writer picks up frames appended by another before its own."""
+    path = tmp_path / "pages.archive"
+    shard_a = PageArchive(str(path))
+    shard_b = PageArchive(str(path))
+    shard_a.append(1, b"a1", run="a")
+    shard_b.append(1, b"b1", run="b")
+    shard_a.append(2, b"a2", run="a")
+    shard_b.append(2, b"b2", run="b")
+
+    reopened = PageArchive(str(path))
+    assert [(e.run, e.page) for e in reopened.entries()] == [("a", 1), ("b", 1), ("a", 2), ("b", 2)]
+    assert list(reopened.iter_pages("a")) == [(1, b"a1"), (2, b"a2")]
+
+
+def _append_pages(path, run, count):
+    archive = PageArchive(path)
+    for page in range(count):
+        archive.append(page, f"{run} page {page}".encode() * 20, run=run)
+
+
+@pytest.mark.etl
+def test_concurrent_processes_append_without_losing_frames(tmp_path):
+    """Appends from several processes at once all survive intact."""
+    path = str(tmp_path / "pages.archive")
+    PageArchive(path).append(0, b"seed", run="seed")
+    workers = [multiprocessing.Process(target=_append_pages, args=(path, f"w{i}", 25)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    reopened = PageArchive(path)
+    assert len(reopened.entries()) == 1 + 4 * 25
+    for i in range(4):
+        run = f"w{i}"
+        assert list(reopened.iter_pages(run)) == [
+            (page, f"{run} page {page}".encode() * 20) for page in range(25)
+        ]
@@ -0,0 +1,103 @@
+"""Tests for re-crawl change detection (refresh_recent)."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+import consumer
+from etl.row_hash import content_hash
+
+URL = "https://www.thegradcafe.com/result/{}"
+
+
+def _record(rid, status="Interview"):
+    return {
+        "university": "MIT", "program": "Computer Science PhD", "degree": "PhD",
+        "status": status, "decisionDate": "1 Mar", "date_added": "March 1, 2026",
+        "url": URL.format(rid), "comments": "",
+    }
+
+
+@pytest.mark.etl
+def test_content_hash_tracks_index_fields_only():
+    """A status edit changes the hash; the URL and extra keys do not."""
+    record = _record(1)
+    assert len(content_hash(record)) == 16
+    assert content_hash(record) == content_hash({**_record(2), "gpa": 3.9})
+    assert content_hash(record) != content_hash(_record(1, status="Accepted"))
+
+
+@pytest.mark.etl
+def test_changed_records_compares_stored_hashes():
+    """Rows whose stored hash differs are changed; NULL hashes get a baseline."""
+    same, edited, legacy = _record(1), _record(2, "Accepted"), _record(3)
+    cur = MagicMock()
+    cur.fetchall.return_value = [
+        (same["url"], memoryview(content_hash(same))),
+        (edited["url"], content_hash(_record(2))),
+        (legacy["url"], None),
+    ]
+    changed, baselines, missing = consumer._changed_records(  # pylint: disable=protected-access
+        cur, [same, edited, legacy, _record(4), _record(2, "Rejected"), {"url": None}],
+    )
+
+    assert [(rec["url"], digest) for rec, digest in changed] == [
+        (edited["url"], content_hash(edited)),
+    ]
+    assert baselines == [(content_hash(legacy), legacy["url"])]
+    assert missing == 1
+
+
+@pytest.mark.etl
+def test_refresh_writes_only_changed_rows(worker_db):
+    """One hash lookup for every scanned row, one UPDATE row per change."""
+    conn, cur = worker_db
+    records = [_record(1), _record(2, "Accepted"), _record(3)]
+    cur.fetchall.return_value = [(URL.format(i), content_hash(_record(i))) for i in (1, 2, 3)]
+    with patch.object(consumer, "scrape_page_range", return_value=records) as scrape:
+        consumer.handle_refresh_recent({"pages": 3})
+
+    assert scrape.call_args.args == (1, 3)
+    assert cur.execute.call_count == 1
+    update_sql, rows = cur.executemany.call_args.args
+    assert "content_hash = %s WHERE url = %s" in update_sql.as_string(None)
+    assert rows == [(
+        "MIT", "Computer Science PhD", "PhD", "Accepted", "1 Mar", "March 1, 2026", "",
+        content_hash(records[1]), URL.format(2),
+    )]
+    conn.commit.assert_called_once()
+
+
+@pytest.mark.etl
+def test_refresh_keeps_seed_rows_without_a_hash(worker_db):
+    """A NULL-hash seed row only gets a baseline hash; its cleaned columns stay."""
+    _, cur = worker_db
+    raw = _record(1, "Accepted")
+    cur.fetchall.return_value = [(raw["url"], None)]
+    with patch.object(consumer, "scrape_page_range", return_value=[raw]):
+        consumer.handle_refresh_recent({"pages": 1})
+
+    assert cur.executemany.call_count == 1
+    update_sql, rows = cur.executemany.call_args.args
+    update_sql = update_sql.as_string(None)
+    assert update_sql.startswith("UPDATE applicants SET content_hash = %s WHERE url = %s")
+    assert "content_hash IS NULL" in update_sql and "status" not in update_sql
+    assert rows == [(content_hash(raw), raw["url"])]
+
+    # Once baselined, the next refresh compares against that hash as usual
+    cur.executemany.reset_mock()
+    cur.fetchall.return_value = [(raw["url"], content_hash(raw))]
+    with patch.object(consumer, "scrape_page_range", return_value=[raw]):
+        consumer.handle_refresh_recent({"pages": 1})
+    cur.executemany.assert_not_called()
+
+
+@pytest.mark.etl
+def test_refresh_gives_up_quietly_on_fetch_error(worker_db):
+    """A failed crawl writes nothing and leaves the next refresh to try again."""
+    conn, cur = worker_db
+    with patch.object(consumer, "scrape_page_range", side_effect=OSError("HTTP 503")):
+        consumer.handle_refresh_recent({})
+    cur.execute.assert_not_called()
+    conn.commit.assert_not_called()
+    conn.close.assert_called_once()
@@ -0,0 +1,144 @@
+"""Tests for fetch retries, Retry-After handling and the circuit breaker."""
+
+import threading
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+
+from etl.fetcher import PageFetcher, TokenBucket
+from etl.http_session import FetchError
+from etl.retry import CircuitBreaker, RetryPolicy, retry_after_seconds
+
+
+@pytest.mark.etl
+def test_retry_after_accepts_seconds_and_http_dates():
+    """Both Retry-After forms are understood; junk is ignored."""
+    now = datetime(2026, 3, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert retry_after_seconds({"Retry-After": "120"}) == 120.0
+    assert retry_after_seconds({"retry-after": "Sun, 01 Mar 2026 12:00:30 GMT"}, now) == 30.0
+    assert retry_after_seconds({"Retry-After": "Sun, 01 Mar 2026 11:00:00 GMT"}, now) == 0.0
+    assert retry_after_seconds({"Retry-After": "soon"}) is None
+    assert retry_after_seconds({}) is None
+
+
+@pytest.mark.etl
+def test_retry_delay_backs_off_and_skips_permanent_errors():
+    """Backoff is jittered under a growing cap; 404s and the last attempt give up."""
+    policy = RetryPolicy(attempts=4, backoff=1.0, max_backoff=3.0, max_retry_after=60)
+    unavailable = FetchError("HTTP 503", status=503)
+    for attempt, cap in ((0, 1.0), (1, 2.0), (2, 3.0)):
+        assert 0 <= policy.delay(attempt, unavailable) <= cap
+    assert policy.delay(3, unavailable) is None
+    assert policy.delay(0, FetchError("HTTP 404", status=404)) is None
+    assert policy.delay(0, OSError("connection reset")) is not None
+    assert policy.delay(0, FetchError("HTTP 429", 429, {"Retry-After": "600"})) == 60
+
+
+@pytest.mark.etl
+def test_fetcher_retries_transient_failure():
+    """A 503 followed by a success yields the page; the breaker sees both outcomes."""
+    calls = []
+
+    def fetch(page):
+        calls.append(page)
+        if len(calls) == 1:
+            raise FetchError("HTTP 503", status=503)
+        return b"page"
+
+    breaker = CircuitBreaker(TokenBucket(0))
+    policy = RetryPolicy(attempts=3, backoff=0)
+    fetcher = PageFetcher(fetch, concurrency=1, limiter=breaker, retry=policy)
+    assert list(fetcher.iter_pages([7])) == [(7, b"page")]
+    assert calls == [7, 7]
+    assert (policy.retries, policy.gave_up) == (1, 0)
+    assert list(breaker.window) == [False, True]
+
+
+@pytest.mark.etl
+def test_fetcher_raises_after_last_attempt():
+    """A page that keeps failing raises its last error once attempts run out."""
+    policy = RetryPolicy(attempts=2, backoff=0)
+    fetcher = PageFetcher(lambda page: (_ for _ in ()).throw(FetchError("HTTP 500", 500)),
+                          concurrency=1, rate=0, retry=policy)
+    with pytest.raises(FetchError):
+        list(fetcher.iter_pages([1]))
+    assert (policy.retries, policy.gave_up) == (1, 1)
+
+
+@pytest.mark.etl
+def test_retry_after_pauses_every_thread():
+    """A Retry-After is applied to the breaker, not slept off by one thread."""
+    breaker = CircuitBreaker(TokenBucket(0))
+    responses = iter([FetchError("HTTP 429", 429, {"Retry-After": "5"}), None])
+
+    def fetch(_page):
+        exc = next(responses)
+        if exc is not None:
+            raise exc
+        return b"ok"
+
+    clock = [100.0]
+
+    def advance(seconds):
+        clock[0] += seconds
+
+    with patch("etl.retry.time.monotonic", side_effect=lambda: clock[0]), \
+            patch("etl.retry.time.sleep", side_effect=advance) as sleep:
+        assert RetryPolicy(attempts=2).call(fetch, 1, breaker) == b"ok"
+    assert breaker.paused == 5
+    sleep.assert_called_once_with(5.0)
+
+
+@pytest.mark.etl
+def test_closing_fetcher_cancels_retry_waits():
+    """Stopping early ends back-off and Retry-After waits and joins the threads."""
+    class CountingBucket(TokenBucket):
+        """TokenBucket that counts acquired slots."""
+
+        acquired = 0
+
+        def acquire(self, stop=None):
+            type(self).acquired += 1
+            super().acquire(stop)
+
+    throttled = threading.Event()
+
+    def fetch(page):
+        if page == 1:
+            return b"one"
+        throttled.set()
+        raise FetchError("HTTP 429", 429, {"Retry-After": "300"})
+
+    fetcher = PageFetcher(fetch, concurrency=3, limiter=CircuitBreaker(CountingBucket(0)),
+                          retry=RetryPolicy(attempts=5, backoff=300, max_backoff=300))
+    pages = fetcher.iter_pages(range(1, 4))
+    assert next(pages) == (1, b"one")
+    throttled.wait(1)
+    started = time.monotonic()
+    pages.close()
+    assert time.monotonic() - started < 5
+    acquired = CountingBucket.acquired
+    time.sleep(0.05)
+    assert CountingBucket.acquired == acquired <= 4
+
+
+@pytest.mark.etl
+def test_breaker_trips_slows_rate_and_recovers():
+    """A failing window halves the rate and pauses; successes restore it gradually."""
+    bucket = TokenBucket(2.0)
+    breaker = CircuitBreaker(bucket, window=4, threshold=0.5, cooldown=10, recovery=0.25)
+    for ok in (True, False, True):
+        (breaker.record_success if ok else breaker.record_failure)()
+    assert breaker.trips == 0
+    breaker.record_failure()
+
+    assert breaker.trips == 1 and breaker.is_open
+    assert bucket.rate == 1.0 and breaker.rate == 2.0
+    assert breaker.paused == pytest.approx(10, abs=0.1)
+    breaker.record_success()
+    assert bucket.rate == 1.5
+    breaker.record_success()
+    breaker.record_success()
+    assert bucket.rate == 2.0
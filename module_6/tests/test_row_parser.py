@@ -0,0 +1,86 @@
+"""Tests that the fast table tokenizer matches the BeautifulSoup reference."""
+
+import pytest
+
+from etl.row_parser import get_backend, parse_table_bs4, parse_table_stream
+
+PAGES = [
+    # Typical entry: main row, stats badges, comment row with entities
+    b'<html><head><script>if (a < b) { x = "<table>"; }</script></head><body>'
+    b'<!-- <table><tr><td>commented out</td></tr></table> -->'
+    b'<table><tr><th>School</th></tr>'
+    b'<tr><td><div>Texas A&amp;M University</div></td>'
+    b'<td><span>Computer Science</span><svg><circle r="1"/></svg><span>PhD</span></td>'
+    b'<td>\n  January 31, 2026\n</td><td><div>Accepted on 30 Jan</div></td>'
+    b'<td><a href="#">Report</a><a title="a > b" href="/result/993524">See More</a></td></tr>'
+    b'<tr><td colspan="3"><div>Fall 2026</div><div>International</div><div>GPA 3.89</div></td></tr>'
+    b'<tr><td colspan="100%"><p>Great news &mdash; funded!<!-- hidden --> Yay</p></td></tr>'
+    b'</table><table><tr><td>second table</td></tr></table></body></html>',
+    # Nested table, self-closing cell, single-quoted and unquoted hrefs
+    b"<table><tr><td>outer<table><tr><td>inner</td><td/></tr></table></td>"
+    b"<td><a href='/result/1?x=1&amp;y=2'>a</a></td></tr>"
+    b"<tr><td><a href=/result/2>b</a></td></tr></table>",
+    # Unclosed cells and rows are closed by the enclosing end tag
+    "<TABLE><TR><TD>café <B>bold</TD><TD>x</TR><TR><TD>y</TABLE>".encode("utf-8"),
+    # Empty table and a page without any table
+    b"<table></table>",
+    b"<html><body><p>No results</p></body></html>",
+    # Latin-1 pages, with and without a charset declaration
+    '<meta charset="iso-8859-1"><table><tr><td>Universit\u00e9 de Montr\u00e9al</td></tr></table>'
+    .encode("latin-1"),
+    "<table><tr><td>Universit\u00e9 Laval</td><td>Caf\u00e9</td></tr></table>".encode("latin-1"),
+]
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize("page", PAGES)
+def test_stream_backend_matches_bs4(page):
+    """Cells, row texts and result links are identical to BeautifulSoup's."""
+    assert parse_table_stream(page) == parse_table_bs4(page)
+
+
+# Text html.unescape would decode differently from bs4: HTML5 entities
+# without ";" (including legacy prefixes of longer names), unknown names,
+# numeric references and CDATA sections. Each is checked in cell text and
+# in a result link's href, where html.parser itself uses html.unescape.
+REFERENCE_TEXTS = [
+    "&copy2024", "&ampx", "&nbspx", "&notit;", "&notit", "&bogus;", "&copy.x", "&AMP;",
+    "&amp;x", "&copy;", "&lt", "a & b", "&;", "&#169;", "&#xA9", "&#169x", "&#65 ",
+    "&#128;", "&#0;", "&#1;", "&#x110000;", "&#xD800;", "&#x2603",
+    "<![CDATA[q]]>", "x<![CDATA[q]]>y", "<![CDATA[&amp; <b>]]>", "<![cdata[ q ] ]>",
+]
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize("text", REFERENCE_TEXTS)
+def test_references_and_cdata_match_bs4(text):
+    """Only references bs4 itself decodes are decoded; CDATA is kept as text."""
+    page = (f"<table><tr><td>{text}</td><td>z {text} z</td>"
+            f'<td><a href="/result/1?q={text}">link</a></td></tr></table>')
+    assert parse_table_stream(page) == parse_table_bs4(page)
+    assert parse_table_stream(page.encode("utf-8")) == parse_table_bs4(page.encode("utf-8"))
+
+
+@pytest.mark.etl
+def test_legacy_entities_stay_literal():
+    """Entities without ";" are not prefix-matched; CDATA is its own text run."""
+    rows = parse_table_stream("<table><tr><td>&copy2024</td><td>&ampx</td>"
+                              "<td>x<![CDATA[q]]></td></tr></table>")
+    assert rows[0].cells == ("&copy2024", "&ampx", "xq")
+    assert rows[0].spaced_text == "&copy2024 &ampx x q"
+
+
+@pytest.mark.etl
+def test_response_charset_is_used():
+    """A charset from the response headers wins over guessing, as in bs4."""
+    page = "<table><tr><td>\u00c9cole Polytechnique</td></tr></table>".encode("cp1252")
+    rows = parse_table_stream(page, encoding="cp1252")
+    assert rows == parse_table_bs4(page, encoding="cp1252")
+    assert rows[0].cells == ("\u00c9cole Polytechnique",)
+
+
+@pytest.mark.etl
+def test_unknown_backend_rejected():
+    """Misconfigured HTML_PARSER values fail loudly."""
+    with pytest.raises(ValueError):
+        get_backend("html5lib")
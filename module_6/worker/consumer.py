@@ -11,12 +11,18 @@ import json
 import logging
 import os
 import time
+from datetime import datetime, timezone
 
 import pika
 import psycopg
 from psycopg import sql
 
-from etl.incremental_scraper import scrape_new_records
+from etl.enrichment import COLUMNS as DETAIL_COLUMNS
+from etl.enrichment import ENRICH_RATE, enrich_results
+from etl.incremental_scraper import SCRAPE_RATE, result_url, scrape_new_records, scrape_page_range
+from etl.known_ids import BloomFilter, KnownResults, result_id
+from etl.rate_limit import SharedRateLimiter
+from etl.row_hash import INDEX_FIELDS, content_hash
 
 logging.basicConfig(
     level=logging.INFO,
@@ -28,6 +34,13 @@ EXCHANGE = "tasks"
 QUEUE = "tasks_q"
 ROUTING_KEY = "tasks"
 
+SOURCE = "gradcafe"
+ID_FILTER_ERROR_RATE = float(os.getenv("ID_FILTER_ERROR_RATE", "0.001"))
+ID_FILTER_MIN_CAPACITY = 100_000
+ENRICH_AFTER_SCRAPE = os.getenv("ENRICH_AFTER_SCRAPE", "0") == "1"
+ENRICH_BATCH = int(os.getenv("ENRICH_BATCH", "200"))
+REFRESH_PAGES = int(os.getenv("REFRESH_PAGES", "5"))
+
 
 # ---------------------------------------------------------------------------
 # Task handlers
@@ -38,27 +51,135 @@ def _get_db_conn():
     return psycopg.connect(os.environ["DATABASE_URL"])
 
 
-def _fetch_existing_urls(cur, limit=100):
-    """Return a set of known applicant URLs from the database."""
-    cur.execute(sql.SQL(
-        "SELECT url FROM applicants WHERE url IS NOT NULL "
-        "ORDER BY date_added DESC LIMIT {limit}"
-    ).format(limit=sql.Literal(limit)))
-    return {r[0] for r in cur.fetchall()}
+def _shared_limiter():
+    """Return the GradCafe request limiter shared by all worker replicas."""
+    return SharedRateLimiter(_get_db_conn, SCRAPE_RATE)
+
+
+def _open_channel():
+    """Open a RabbitMQ connection and declare the durable task exchange/queue.
+
+    Returns:
+        tuple: (connection, channel) pair. Caller must close the connection.
+    """
+    conn = pika.BlockingConnection(pika.URLParameters(os.environ["RABBITMQ_URL"]))
+    ch = conn.channel()
+    ch.exchange_declare(exchange=EXCHANGE, exchange_type="direct", durable=True)
+    ch.queue_declare(queue=QUEUE, durable=True)
+    ch.queue_bind(exchange=EXCHANGE, queue=QUEUE, routing_key=ROUTING_KEY)
+    return conn, ch
+
+
+def _publish_tasks(kind, payloads):
+    """Publish one persistent task message of ``kind`` per payload."""
+    conn, ch = _open_channel()
+    try:
+        for payload in payloads:
+            body = json.dumps({
+                "kind": kind,
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "payload": payload,
+            }, separators=(",", ":")).encode("utf-8")
+            ch.basic_publish(
+                exchange=EXCHANGE,
+                routing_key=ROUTING_KEY,
+                body=body,
+                properties=pika.BasicProperties(delivery_mode=2),
+            )
+    finally:
+        conn.close()
+
 
+def _load_known_results(cur, lock=True):
+    """Load the KnownResults for gradcafe from its watermark row.
 
-def _insert_records(cur, records):
-    """Batch-insert records with ON CONFLICT DO NOTHING. Return max URL."""
+    With ``lock`` the row is locked until the task commits, so concurrent
+    tasks do not overwrite each other's filter. Without it, the caller
+    must fold in later changes with _merge_known_results() before saving.
+    The filter is rebuilt from the applicants table when it is missing or
+    has outgrown its capacity.
+
+    Returns:
+        tuple: (KnownResults, bool indicating the filter was rebuilt)
+    """
+    cur.execute(sql.SQL(
+        "SELECT last_seen_id, known_ids FROM ingestion_watermarks WHERE source = %s"
+        + (" FOR UPDATE" if lock else "")
+    ), (SOURCE,))
+    row = cur.fetchone()
+    if row and row[1] is not None:
+        id_filter = BloomFilter.from_bytes(row[1])
+        if not id_filter.full:
+            return KnownResults(row[0], id_filter), False
+    return _rebuild_known_results(cur), True
+
+
+def _merge_known_results(cur, known):
+    """Lock the watermark row and merge what other tasks saved into known.
+
+    Filters of the same size are OR-ed together and the higher watermark
+    wins. If the stored filter was rebuilt at another size meanwhile, the
+    filter is rebuilt once more from applicants, which already includes
+    this task's inserts.
+
+    Returns:
+        KnownResults: The merged results, ready for _update_watermark().
+    """
+    cur.execute(sql.SQL(
+        "SELECT last_seen_id, known_ids FROM ingestion_watermarks "
+        "WHERE source = %s FOR UPDATE"
+    ), (SOURCE,))
+    row = cur.fetchone()
+    if not row or row[1] is None:
+        return known
+    stored = BloomFilter.from_bytes(row[1])
+    if not known.id_filter.compatible(stored):
+        return _rebuild_known_results(cur)
+    known.id_filter.update(stored)
+    if row[0] is not None and (known.last_seen_id is None or row[0] > known.last_seen_id):
+        known.last_seen_id = row[0]
+    return known
+
+
+def _rebuild_known_results(cur):
+    """Build the watermark and ID filter from every URL in applicants."""
+    cur.execute(sql.SQL("SELECT url FROM applicants WHERE url IS NOT NULL"))
+    urls = [r[0] for r in cur.fetchall()]
+    capacity = max(ID_FILTER_MIN_CAPACITY, 2 * len(urls))
+    known = KnownResults(None, BloomFilter(capacity, ID_FILTER_ERROR_RATE))
+    for url in urls:
+        known.add(url)
+    log.info("Rebuilt result-ID filter: %d IDs, capacity %d, %d KiB.",
+             len(known.id_filter), capacity, len(known.id_filter.to_bytes()) // 1024)
+    return known
+
+
+def _insert_records(cur, records, known=None):
+    """Batch-insert records with ON CONFLICT DO NOTHING.
+
+    Each row is stored with its content hash so refresh_recent can tell
+    later edits apart from unchanged rows.
+
+    Args:
+        cur: Database cursor.
+        records: Record dicts to insert.
+        known: Optional KnownResults to add the inserted result IDs to.
+
+    Returns:
+        tuple: (highest numeric result ID, URL of that result), or
+        (None, None) if no record has a result URL.
+    """
     insert_stmt = sql.SQL(
         "INSERT INTO applicants "
         "(program, university, degree, status, term, us_or_international, "
         "comments, decision_date, date_added, url, "
-        "gpa, gre, gre_v, gre_aw, llm_generated_program, llm_generated_university) "
-        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+        "gpa, gre, gre_v, gre_aw, llm_generated_program, llm_generated_university, "
+        "content_hash) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
         "ON CONFLICT (url) DO NOTHING"
     )
 
-    max_url = None
+    max_id, max_url = None, None
     for rec in records:
         cur.execute(insert_stmt, (
             rec.get("program"),
@@ -77,40 +198,66 @@ def _insert_records(cur, records):
             rec.get("greAW"),
             rec.get("llm-generated-program"),
             rec.get("llm-generated-university"),
+            content_hash(rec),
         ))
-        url = rec.get("url") or ""
-        if url > (max_url or ""):
-            max_url = url
-
-    return max_url
-
-
-def _update_watermark(cur, max_url):
-    """Upsert the ingestion watermark for gradcafe."""
-    if max_url:
-        cur.execute(sql.SQL(
-            "INSERT INTO ingestion_watermarks (source, last_seen) "
-            "VALUES (%s, %s) "
-            "ON CONFLICT (source) DO UPDATE SET last_seen = EXCLUDED.last_seen, "
-            "updated_at = now()"
-        ), ("gradcafe", max_url))
+        url = rec.get("url")
+        rid = known.add(url) if known is not None else result_id(url)
+        if rid is not None and (max_id is None or rid > max_id):
+            max_id, max_url = rid, url
+
+    return max_id, max_url
+
+
+def _update_watermark(cur, known, max_url=None):
+    """Upsert the gradcafe watermark: highest result ID plus the ID filter.
+
+    Args:
+        cur: Database cursor.
+        known: KnownResults after this task's inserts.
+        max_url: URL of the highest result inserted by this task, if any;
+            kept in last_seen for readability when it is the new watermark
+            (a backfill of older pages leaves last_seen alone).
+    """
+    if result_id(max_url) != known.last_seen_id:
+        max_url = None
+    cur.execute(sql.SQL(
+        "INSERT INTO ingestion_watermarks (source, last_seen, last_seen_id, known_ids) "
+        "VALUES (%s, %s, %s, %s) "
+        "ON CONFLICT (source) DO UPDATE SET "
+        "last_seen = COALESCE(EXCLUDED.last_seen, ingestion_watermarks.last_seen), "
+        "last_seen_id = EXCLUDED.last_seen_id, known_ids = EXCLUDED.known_ids, "
+        "updated_at = now()"
+    ), (SOURCE, max_url, known.last_seen_id, known.id_filter.to_bytes()))
 
 
 def handle_scrape_new_data(_payload):
-    """Scrape new data, insert into DB with idempotent upserts, update watermark."""
+    """Scrape new data, insert into DB with idempotent upserts, update watermark.
+
+    The watermark row is not locked during the crawl, so backfill shards
+    and refreshes saving IDs meanwhile are not blocked; the filters are
+    merged under the lock in the short insert transaction instead.
+    """
     conn = _get_db_conn()
     try:
         cur = conn.cursor()
-        existing_urls = _fetch_existing_urls(cur)
+        known, rebuilt = _load_known_results(cur, lock=False)
+        conn.commit()
 
-        records = scrape_new_records(existing_urls)
+        limiter = _shared_limiter()
+        try:
+            records = scrape_new_records(known, limiter=limiter)
+        finally:
+            limiter.close()
         if not records:
             log.info("No new records to insert.")
+            if rebuilt:
+                # Persist the rebuilt filter so the next task can reuse it
+                _update_watermark(cur, _merge_known_results(cur, known))
             conn.commit()
             return
 
-        max_url = _insert_records(cur, records)
-        _update_watermark(cur, max_url)
+        _, max_url = _insert_records(cur, records, known)
+        _update_watermark(cur, _merge_known_results(cur, known), max_url)
 
         conn.commit()
         log.info("Inserted up to %d new records.", len(records))
@@ -119,6 +266,309 @@ def handle_scrape_new_data(_payload):
         raise
     finally:
         conn.close()
+    _queue_enrichment(records)
+
+
+def _queue_enrichment(records):
+    """Publish enrich_results tasks for scraped records (if ENRICH_AFTER_SCRAPE).
+
+    Called after the scrape has committed. A failed publish is only
+    logged: the rows stay unenriched and a later sweep picks them up.
+    """
+    if not ENRICH_AFTER_SCRAPE:
+        return
+    ids = list(dict.fromkeys(
+        rid for rid in (result_id(rec.get("url")) for rec in records) if rid is not None
+    ))
+    if not ids:
+        return
+    try:
+        _publish_tasks("enrich_results", [
+            {"result_ids": ids[i:i + ENRICH_BATCH]} for i in range(0, len(ids), ENRICH_BATCH)
+        ])
+    except pika.exceptions.AMQPError as exc:
+        log.warning("Could not queue enrichment of %d results: %s", len(ids), exc)
+
+
+def _claim_shard(cur, backfill_id, first_page, last_page):
+    """Mark a backfill shard as running.
+
+    Returns:
+        int or None: The attempt number, or None if the shard is already done.
+    """
+    cur.execute(sql.SQL(
+        "INSERT INTO backfill_shards (backfill_id, first_page, last_page, status, attempts) "
+        "VALUES (%s, %s, %s, 'running', 1) "
+        "ON CONFLICT (backfill_id, first_page) DO UPDATE SET status = 'running', "
+        "attempts = backfill_shards.attempts + 1, error = NULL, updated_at = now() "
+        "WHERE backfill_shards.status <> 'done' "
+        "RETURNING attempts"
+    ), (backfill_id, first_page, last_page))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def _finish_shard(cur, backfill_id, first_page, status, *, records=None, error=None):  # pylint: disable=too-many-arguments
+    """Record the outcome of a backfill shard ('done' or 'failed')."""
+    cur.execute(sql.SQL(
+        "UPDATE backfill_shards SET status = %s, records = %s, error = %s, updated_at = now() "
+        "WHERE backfill_id = %s AND first_page = %s"
+    ), (status, records, error, backfill_id, first_page))
+
+
+def _touch_shard(conn, cur, backfill_id, first_page):
+    """Heartbeat: bump a running shard's updated_at so retry skips it."""
+    cur.execute(sql.SQL(
+        "UPDATE backfill_shards SET updated_at = now() "
+        "WHERE backfill_id = %s AND first_page = %s AND status = 'running'"
+    ), (backfill_id, first_page))
+    conn.commit()
+
+
+def _fail_shard(conn, cur, backfill_id, first_page, exc):
+    """Roll back the shard's work and record it as failed."""
+    conn.rollback()
+    _finish_shard(cur, backfill_id, first_page, "failed", error=str(exc))
+    conn.commit()
+
+
+def handle_backfill_pages(payload):
+    """Crawl one shard of a historical backfill and record its progress.
+
+    Payload: ``{"backfill_id": str, "first_page": int, "last_page": int}``.
+    Shards are published by plan_backfill.py. Their state lives in the
+    backfill_shards table, so a failed shard is recorded there and can be
+    requeued on its own; a redelivered shard that is already done is
+    skipped. The shard's updated_at is bumped after every page, so a slow
+    but healthy shard is not mistaken for a stale one by
+    ``plan_backfill.py retry``. Unexpected errors also mark the shard
+    failed before they propagate.
+    """
+    backfill_id = payload["backfill_id"]
+    first_page, last_page = int(payload["first_page"]), int(payload["last_page"])
+
+    conn = _get_db_conn()
+    try:
+        cur = conn.cursor()
+        attempt = _claim_shard(cur, backfill_id, first_page, last_page)
+        conn.commit()
+        if attempt is None:
+            log.info("Backfill %s pages %d-%d already done; skipping.",
+                     backfill_id, first_page, last_page)
+            return
+
+        limiter = _shared_limiter()
+        try:
+            records = scrape_page_range(
+                first_page, last_page, limiter=limiter,
+                on_page=lambda _page: _touch_shard(conn, cur, backfill_id, first_page),
+            )
+            known, _ = _load_known_results(cur)
+            _, max_url = _insert_records(cur, records, known)
+            _update_watermark(cur, known, max_url)
+            _finish_shard(cur, backfill_id, first_page, "done", records=len(records))
+            conn.commit()
+            log.info("Backfill %s pages %d-%d done: %d records (attempt %d).",
+                     backfill_id, first_page, last_page, len(records), attempt)
+            _queue_enrichment(records)
+        except (OSError, ValueError) as exc:
+            _fail_shard(conn, cur, backfill_id, first_page, exc)
+            log.warning("Backfill %s pages %d-%d failed (attempt %d): %s",
+                        backfill_id, first_page, last_page, attempt, exc)
+        except Exception as exc:
+            # Never leave the shard 'running' behind an unexpected error
+            _fail_shard(conn, cur, backfill_id, first_page, exc)
+            raise
+        finally:
+            limiter.close()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _claim_unenriched(cur, result_ids=None, limit=ENRICH_BATCH):
+    """Lock applicants rows that still need enrichment.
+
+    Rows locked by another enrichment task are skipped, so concurrent
+    tasks never fetch the same result.
+
+    Args:
+        cur: Database cursor.
+        result_ids: Result IDs to enrich; None sweeps the newest
+            unenriched rows instead.
+        limit: Maximum rows to claim in a sweep.
+
+    Returns:
+        dict: Result ID -> stored URL, deduplicated by result ID.
+    """
+    if result_ids is not None:
+        cur.execute(sql.SQL(
+            "SELECT url FROM applicants WHERE url = ANY(%s) AND enriched_at IS NULL "
+            "FOR UPDATE SKIP LOCKED"
+        ), ([result_url(int(rid)) for rid in result_ids],))
+    else:
+        cur.execute(sql.SQL(
+            "SELECT url FROM applicants WHERE url IS NOT NULL AND enriched_at IS NULL "
+            "ORDER BY p_id DESC LIMIT %s FOR UPDATE SKIP LOCKED"
+        ), (limit,))
+    claimed = {}
+    for (url,) in cur.fetchall():
+        rid = result_id(url)
+        if rid is not None:
+            claimed.setdefault(rid, url)
+    return claimed
+
+
+def _store_details(cur, claimed, details):
+    """Write detail-page values and mark the rows enriched.
+
+    Detail values replace those parsed from the index page; fields the
+    detail page lacks keep their current value.
+    """
+    assignments = sql.SQL(", ").join(
+        sql.SQL("{col} = COALESCE(%s, {col})").format(col=sql.Identifier(col))
+        for col in DETAIL_COLUMNS
+    )
+    cur.executemany(sql.SQL(
+        "UPDATE applicants SET {assignments}, enriched_at = now() WHERE url = %s"
+    ).format(assignments=assignments), [
+        tuple((values or {}).get(col) for col in DETAIL_COLUMNS) + (claimed[rid],)
+        for rid, values in details.items()
+    ])
+
+
+def handle_enrich_results(payload):
+    """Fetch result detail pages and store their structured fields.
+
+    Payload: ``{"result_ids": [int, ...]}`` (published after a scrape when
+    ENRICH_AFTER_SCRAPE=1) or ``{"limit": int}`` to sweep the newest
+    unenriched rows. Results already enriched, or claimed by another
+    task, are skipped. Detail pages are fetched under their own shared
+    rate budget (ENRICH_RATE), separate from index scraping.
+    """
+    conn = _get_db_conn()
+    try:
+        cur = conn.cursor()
+        claimed = _claim_unenriched(cur, payload.get("result_ids"),
+                                    int(payload.get("limit", ENRICH_BATCH)))
+        if not claimed:
+            conn.commit()
+            log.info("No results to enrich.")
+            return
+
+        limiter = SharedRateLimiter(_get_db_conn, ENRICH_RATE, name="gradcafe-detail")
+        try:
+            details = enrich_results(claimed, limiter=limiter)
+        finally:
+            limiter.close()
+        _store_details(cur, claimed, details)
+        conn.commit()
+        log.info("Enriched %d of %d results.", len(details), len(claimed))
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _changed_records(cur, records):
+    """Split re-scraped records into changed rows and rows not yet stored.
+
+    Reads the stored hashes of all scraped URLs in one query. Rows stored
+    before hashes existed (NULL hash, e.g. the cleaned seed data) are not
+    rewritten: their raw index values would overwrite cleaned columns, so
+    they only get the current hash as a baseline for later refreshes.
+
+    Returns:
+        tuple: (list of ``(record, hash)`` to rewrite, list of
+        ``(hash, url)`` baselines for NULL-hash rows, number of records
+        whose URL is not in applicants yet)
+    """
+    by_url = {}
+    for rec in records:
+        if rec.get("url"):
+            by_url.setdefault(rec["url"], rec)
+    if not by_url:
+        return [], [], 0
+    cur.execute(sql.SQL(
+        "SELECT url, content_hash FROM applicants WHERE url = ANY(%s)"
+    ), (list(by_url),))
+    stored = {url: bytes(digest) if digest is not None else None
+              for url, digest in cur.fetchall()}
+
+    changed, baselines = [], []
+    for url, rec in by_url.items():
+        if url not in stored:
+            continue
+        digest = content_hash(rec)
+        if stored[url] is None:
+            baselines.append((digest, url))
+        elif stored[url] != digest:
+            changed.append((rec, digest))
+    return changed, baselines, len(by_url) - len(stored)
+
+
+def _update_changed(cur, changed):
+    """Rewrite the index fields and content hash of changed rows."""
+    if not changed:
+        return
+    assignments = sql.SQL(", ").join(
+        sql.SQL("{} = %s").format(sql.Identifier(column)) for column in INDEX_FIELDS.values()
+    )
+    cur.executemany(sql.SQL(
+        "UPDATE applicants SET {assignments}, content_hash = %s WHERE url = %s"
+    ).format(assignments=assignments), [
+        tuple(rec.get(key) for key in INDEX_FIELDS) + (digest, rec["url"])
+        for rec, digest in changed
+    ])
+
+
+def _store_baselines(cur, baselines):
+    """Record the first content hash of rows stored without one."""
+    if not baselines:
+        return
+    cur.executemany(sql.SQL(
+        "UPDATE applicants SET content_hash = %s WHERE url = %s AND content_hash IS NULL"
+    ), baselines)
+
+
+def handle_refresh_recent(payload):
+    """Re-crawl the newest pages and update rows whose content changed.
+
+    Payload: ``{"pages": int}`` (default REFRESH_PAGES). Every row on
+    those pages is hashed and compared with its stored content hash in a
+    single query; only changed rows are written, so the database work
+    follows the number of edits rather than the pages scanned. Rows not
+    stored yet are left to scrape_new_data, which owns the watermark.
+    """
+    pages = int(payload.get("pages", REFRESH_PAGES))
+
+    conn = _get_db_conn()
+    try:
+        cur = conn.cursor()
+        limiter = _shared_limiter()
+        try:
+            records = scrape_page_range(1, pages, limiter=limiter)
+        except (OSError, ValueError) as exc:
+            log.warning("Refresh of %d pages failed: %s", pages, exc)
+            return
+        finally:
+            limiter.close()
+
+        changed, baselines, unknown = _changed_records(cur, records)
+        _update_changed(cur, changed)
+        _store_baselines(cur, baselines)
+        conn.commit()
+        log.info("Refreshed %d pages: %d rows scanned, %d changed, %d hashed for the "
+                 "first time, %d not ingested yet.",
+                 pages, len(records), len(changed), len(baselines), unknown)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
 
 
 def handle_recompute_analytics(_payload):
@@ -142,6 +592,9 @@ def handle_recompute_analytics(_payload):
 
 TASK_MAP = {
     "scrape_new_data": handle_scrape_new_data,
+    "backfill_pages": handle_backfill_pages,
+    "enrich_results": handle_enrich_results,
+    "refresh_recent": handle_refresh_recent,
     "recompute_analytics": handle_recompute_analytics,
 }
 
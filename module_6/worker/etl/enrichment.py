@@ -0,0 +1,165 @@
+"""Detail-page enrichment for GradCafe results.
+
+Survey index rows only carry a few badges (term, citizenship, GPA/GRE),
+so the scraper's stats are partial. Each result also has a detail page,
+``/result/<id>``, listing its fields as a definition list. This module
+fetches those pages on a bounded thread pool with its own keep-alive
+session, retry policy and rate budget (separate from the index scrape)
+and parses them into structured column values.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from html.parser import HTMLParser
+
+from etl.fetcher import FetchStats, PageFetcher, TokenBucket
+from etl.http_session import FetchError, HTTPSession
+from etl.incremental_scraper import SCRAPE_RETRIES
+from etl.retry import CircuitBreaker, RetryPolicy
+
+log = logging.getLogger(__name__)
+
+RESULT_URL = os.getenv("GRADCAFE_RESULT_URL", "https://www.thegradcafe.com/result/{id}")
+ENRICH_CONCURRENCY = int(os.getenv("ENRICH_CONCURRENCY", "2"))
+ENRICH_RATE = float(os.getenv("ENRICH_RATE", "1.0"))
+
+SESSION = HTTPSession(maxsize=ENRICH_CONCURRENCY)
+
+# Detail-page label -> (applicants column, value type)
+FIELDS = {
+    "degree's country of origin": ("us_or_international", str),
+    "undergrad gpa": ("gpa", float),
+    "gre general": ("gre", float),
+    "gre verbal": ("gre_v", float),
+    "analytical writing": ("gre_aw", float),
+}
+COLUMNS = tuple(column for column, _ in FIELDS.values())
+
+
+class _DefinitionListParser(HTMLParser):
+    """Collect ``<dt>label</dt><dd>value</dd>`` pairs as text."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.pairs = []
+        self._tag = None
+        self._label = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("dt", "dd"):
+            self._tag = tag
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag != self._tag:
+            return
+        text = " ".join("".join(self._text).split())
+        if tag == "dt":
+            self._label = text
+        elif self._label is not None:
+            self.pairs.append((self._label, text))
+            self._label = None
+        self._tag = None
+
+    def handle_data(self, data):
+        if self._tag is not None:
+            self._text.append(data)
+
+
+def parse_result_page(html):
+    """Parse a ``/result/<id>`` page into applicants column values.
+
+    Args:
+        html: Raw page HTML (bytes or str).
+
+    Returns:
+        dict: Column name -> value for every recognised field with a
+        value. GradCafe shows 0 for scores that were not reported; those
+        are left out.
+    """
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    parser = _DefinitionListParser()
+    parser.feed(html)
+    parser.close()
+
+    values = {}
+    for label, text in parser.pairs:
+        field = FIELDS.get(label.rstrip(":").strip().lower())
+        if field is None or not text:
+            continue
+        column, kind = field
+        if kind is float:
+            try:
+                number = float(text.split()[0])
+            except ValueError:
+                continue
+            if number:
+                values[column] = number
+        else:
+            values[column] = text
+    return values
+
+
+def fetch_result(rid):
+    """Fetch one result detail page.
+
+    Returns:
+        bytes or None: Page HTML, or None if the result no longer exists.
+    """
+    try:
+        return SESSION.get(RESULT_URL.format(id=rid))
+    except FetchError as exc:
+        if exc.status in (404, 410):
+            return None
+        raise
+
+
+def enrich_results(result_ids, concurrency=None, rate=None, *, limiter=None, stats=None):
+    """Fetch and parse the detail pages of ``result_ids``.
+
+    IDs are deduplicated. Pages are fetched ahead on a bounded pool and
+    parsed on the fetch threads. A page that still fails after its retries
+    ends the run; the results gathered so far are returned, and the
+    remaining IDs are left for a later task.
+
+    Args:
+        result_ids: GradCafe result IDs.
+        concurrency: In-flight request limit. Defaults to ENRICH_CONCURRENCY.
+        rate: Maximum requests per second. Defaults to ENRICH_RATE.
+        limiter: Optional rate limiter shared with other workers; replaces
+            the per-process ``rate`` limit.
+        stats: Optional FetchStats to populate with throughput counters.
+
+    Returns:
+        dict: Result ID -> column values (``None`` for removed results), in
+        request order.
+    """
+    ids = list(dict.fromkeys(result_ids))
+    if limiter is None:
+        limiter = TokenBucket(ENRICH_RATE if rate is None else rate)
+    fetcher = PageFetcher(
+        fetch_result,
+        concurrency=concurrency or ENRICH_CONCURRENCY,
+        limiter=CircuitBreaker(limiter),
+        retry=RetryPolicy(attempts=SCRAPE_RETRIES),
+        stats=stats if stats is not None else FetchStats(),
+        process=lambda _rid, html: None if html is None else parse_result_page(html),
+    )
+
+    details = {}
+    pages = fetcher.iter_pages(ids)
+    try:
+        for rid, values in pages:
+            details[rid] = values
+            fetcher.stats.add_records(values is not None)
+    except OSError as exc:
+        log.warning("Enrichment stopped at result %d of %d: %s", len(details) + 1, len(ids), exc)
+    finally:
+        pages.close()
+        fetcher.stats.finish()
+        log.info("Enrichment finished: %s", fetcher.stats.summary())
+    return details
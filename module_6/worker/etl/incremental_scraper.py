@@ -6,36 +6,45 @@ records from The GradCafe website.
 
 from __future__ import annotations
 
+import logging
+import os
 import re
-import time
-import urllib.parse
-import urllib.request
+from contextlib import closing
 
-from bs4 import BeautifulSoup
+from etl.fetcher import FetchStats, PageFetcher, TokenBucket
+from etl.http_session import HTTPSession
+from etl.page_archive import PageArchive, new_run_id
+from etl.retry import CircuitBreaker, RetryPolicy
+from etl.row_parser import get_backend
+
+log = logging.getLogger(__name__)
+
+BASE_URL = os.getenv("GRADCAFE_BASE_URL", "https://www.thegradcafe.com/survey/index.php")
+# Stored result URLs always use the public site, whatever BASE_URL points at
+SITE_URL = "https://www.thegradcafe.com"
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+SCRAPE_RATE = float(os.getenv("SCRAPE_RATE", "2.0"))
+SCRAPE_RETRIES = int(os.getenv("SCRAPE_RETRIES", "4"))
+PAGE_ARCHIVE = os.getenv("PAGE_ARCHIVE", "")
+PARSE_TABLE = get_backend()
+
+SESSION = HTTPSession(maxsize=SCRAPE_CONCURRENCY)
 
 
 def fetch_page(page_num):
     """Fetch a single page of GradCafe survey results.
 
+    Uses the module-wide keep-alive session, so consecutive pages reuse
+    pooled connections and arrive gzip-compressed.
+
     Args:
         page_num: Page number to fetch.
 
     Returns:
         bytes: Raw HTML content.
     """
-    base_url = "https://www.thegradcafe.com/survey/index.php"
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/119.0.0.0 Safari/537.36"
-        ),
-    }
     params = {"q": "", "t": "a", "o": "", "page": page_num}
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
-    req = urllib.request.Request(url, headers=headers)
-    with urllib.request.urlopen(req) as resp:
-        return resp.read()
+    return SESSION.get(BASE_URL, fields=params)
 
 
 def parse_decision(text):
@@ -54,73 +63,186 @@ def determine_degree(prog):
     return "Other"
 
 
+def result_url(rid):
+    """Return the URL result ``rid`` is stored under in applicants.url."""
+    return f"{SITE_URL}/result/{rid}"
+
+
 def _extract_entry_url(row):
-    """Extract the full GradCafe URL from a table row, or None."""
-    link = row.find("a", href=re.compile(r"/result/\\d+"))
-    if link and "href" in link.attrs:
-        path = link["href"]
-        return f"https://www.thegradcafe.com{path}" if path.startswith("/") else path
+    """Extract the full GradCafe URL from a TableRow, or None."""
+    path = row.link
+    if path:
+        return f"{SITE_URL}{path}" if path.startswith("/") else path
     return None
 
 
-def _parse_row(row, rows, row_index):
-    """Parse a single table row into a record dict."""
-    tds = row.find_all("td")
-    decision, dec_date = parse_decision(tds[3].get_text(strip=True))
+def _parse_row(rows, row_index):
+    """Parse a single TableRow into a record dict."""
+    row = rows[row_index]
+    cells = row.cells
+    decision, dec_date = parse_decision(cells[3])
     comments = ""
-    if row_index + 2 < len(rows) and len(rows[row_index + 2].find_all("td")) == 1:
-        comments = rows[row_index + 2].get_text(strip=True)[:500]
+    if row_index + 2 < len(rows) and len(rows[row_index + 2].cells) == 1:
+        comments = rows[row_index + 2].text[:500]
 
+    program = cells[1]
     return {
-        "university": re.sub(r"Report$", "", tds[0].get_text(strip=True)).strip(),
-        "program": tds[1].get_text(strip=True),
-        "degree": determine_degree(tds[1].get_text(strip=True)),
+        "university": re.sub(r"Report$", "", cells[0]).strip(),
+        "program": program,
+        "degree": determine_degree(program),
         "status": decision,
         "decisionDate": dec_date,
-        "date_added": tds[2].get_text(strip=True),
+        "date_added": cells[2],
         "url": _extract_entry_url(row),
         "comments": comments,
     }
 
 
-def scrape_new_records(existing_urls, max_pages=50):
+def scrape_new_records(existing_urls, max_pages=50, concurrency=None, rate=None,  # pylint: disable=too-many-arguments
+                       stats=None, *, limiter=None):
     """Scrape GradCafe for records whose URL is not in existing_urls.
 
+    Pages are fetched ahead on a bounded thread pool under a token-bucket
+    rate limit, but parsed strictly in page order so the scrape still stops
+    at the first already-known URL. When PAGE_ARCHIVE is set, every parsed
+    page is also appended to that compressed raw-page archive.
+
+    The worker passes a KnownResults (numeric watermark plus ID filter), so
+    each stop check is O(1); any container supporting ``in`` works.
+
     Args:
-        existing_urls: Set of already-known URLs.
+        existing_urls: Already-known URLs (a set or a KnownResults).
         max_pages: Maximum pages to fetch.
+        concurrency: In-flight request limit. Defaults to SCRAPE_CONCURRENCY.
+        rate: Maximum requests per second. Defaults to SCRAPE_RATE.
+        stats: Optional FetchStats to populate with throughput counters.
+        limiter: Optional rate limiter shared with other workers (see
+            etl.rate_limit); replaces the per-process ``rate`` limit.
 
     Returns:
         list[dict]: Newly scraped records.
     """
+    fetcher = _make_fetcher(concurrency, rate, stats, limiter)
     records = []
-    for page in range(1, max_pages + 1):
-        try:
-            html = fetch_page(page)
-        except (OSError, ValueError):
-            break
-
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table")
-        if not table:
-            break
-
-        rows = table.find_all("tr")
-        stop = False
-        for i in range(1, len(rows)):
-            tds = rows[i].find_all("td")
-            if len(tds) < 4:
-                continue
-
-            entry_url = _extract_entry_url(rows[i])
-            if entry_url and entry_url in existing_urls:
-                stop = True
-                break
+    try:
+        for page_records in _crawl(fetcher, range(1, max_pages + 1), existing_urls):
+            records.extend(page_records)
+    except (OSError, ValueError):
+        pass
+    return records
+
 
-            records.append(_parse_row(rows[i], rows, i))
+def scrape_page_range(first_page, last_page, concurrency=None, rate=None,  # pylint: disable=too-many-arguments
+                      *, stats=None, limiter=None, on_page=None):
+    """Scrape every record on pages ``first_page..last_page`` (a backfill shard).
 
-        if stop:
-            break
-        time.sleep(1)
+    There is no stop-at-known rule, since inserts are idempotent; only the
+    end of the survey (a page without a results table) ends the range
+    early. Fetch errors are raised so the caller can fail and retry the
+    whole shard instead of recording a partial one as done.
+
+    Args:
+        first_page: First page to fetch.
+        last_page: Last page to fetch (inclusive).
+        concurrency: In-flight request limit. Defaults to SCRAPE_CONCURRENCY.
+        rate: Maximum requests per second. Defaults to SCRAPE_RATE.
+        stats: Optional FetchStats to populate with throughput counters.
+        limiter: Optional rate limiter shared with other workers.
+        on_page: Optional ``on_page(page_num)`` callback run after each
+            page is parsed (e.g. a progress heartbeat).
 
+    Returns:
+        list[dict]: Records on the pages, in page order.
+
+    Raises:
+        OSError: If a page could not be fetched.
+    """
+    fetcher = _make_fetcher(concurrency, rate, stats, limiter)
+    records = []
+    # closing(): if on_page raises, the fetch threads are still stopped
+    # and joined before the caller closes its limiter
+    with closing(_crawl(fetcher, range(first_page, last_page + 1), set())) as pages:
+        for page_num, page_records in enumerate(pages, first_page):
+            records.extend(page_records)
+            if on_page is not None:
+                on_page(page_num)
     return records
+
+
+def _make_fetcher(concurrency, rate, stats, limiter):
+    """Build a PageFetcher over fetch_page with the module defaults filled in.
+
+    Fetches go through a RetryPolicy (SCRAPE_RETRIES attempts per page) and
+    a CircuitBreaker around the rate limiter, so transient errors are
+    retried and a run of failures slows the whole crawl down.
+    """
+    if limiter is None:
+        limiter = TokenBucket(SCRAPE_RATE if rate is None else rate)
+    return PageFetcher(
+        fetch_page,
+        concurrency=concurrency or SCRAPE_CONCURRENCY,
+        limiter=CircuitBreaker(limiter),
+        retry=RetryPolicy(attempts=SCRAPE_RETRIES),
+        stats=stats if stats is not None else FetchStats(),
+    )
+
+
+def _crawl(fetcher, page_numbers, existing_urls):
+    """Yield each page's new records in page order until a stop condition.
+
+    Archives pages when PAGE_ARCHIVE is set and logs throughput when done.
+    Fetch errors propagate to the caller.
+    """
+    stats = fetcher.stats
+    archive = PageArchive(PAGE_ARCHIVE) if PAGE_ARCHIVE else None
+    run_id = new_run_id()
+
+    pages = fetcher.iter_pages(page_numbers)
+    try:
+        for page, html in pages:
+            if archive is not None:
+                archive.append(page, html, run=run_id)
+
+            page_records, stop = _parse_page(html, existing_urls)
+            stats.add_records(len(page_records))
+            yield page_records
+            if stop:
+                break
+    finally:
+        pages.close()
+        stats.finish()
+        log.info("Scrape finished: %s", stats.summary())
+        log.info("HTTP session: %s", SESSION.summary())
+        log.info("Retries: %d retried, %d gave up; circuit breaker tripped %d times "
+                 "(%.1fs paused)", fetcher.retry.retries, fetcher.retry.gave_up,
+                 fetcher.bucket.trips, fetcher.bucket.paused)
+
+
+def _parse_page(html, existing_urls, parse_table=None):
+    """Parse one survey page.
+
+    Args:
+        html: Raw page HTML.
+        existing_urls: Already-known URLs (a set or a KnownResults).
+        parse_table: Table parser backend; defaults to PARSE_TABLE (the
+            backend named by the HTML_PARSER environment variable).
+
+    Returns:
+        tuple: (list of new record dicts, bool indicating the scrape should stop)
+    """
+    rows = (parse_table or PARSE_TABLE)(html)
+    if rows is None:
+        return [], True
+
+    records = []
+    for i in range(1, len(rows)):
+        if len(rows[i].cells) < 4:
+            continue
+
+        entry_url = _extract_entry_url(rows[i])
+        if entry_url and entry_url in existing_urls:
+            return records, True
+
+        records.append(_parse_row(rows, i))
+
+    return records, False
@@ -0,0 +1,176 @@
+"""Compact set of already-ingested GradCafe result IDs.
+
+GradCafe result URLs end in a numeric ID (``/result/<id>``) that grows
+with every new entry. The worker keeps two things per source next to its
+ingestion watermark:
+
+* ``last_seen_id`` - the highest result ID ingested so far, and
+* a Bloom filter of every ingested ID.
+
+An ID above the watermark is new for certain. An ID at or below it is
+checked against the filter, which has no false negatives and a small,
+configurable false-positive rate. Together they make the "have we seen
+this row?" check O(1) and free of database round trips.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import struct
+
+RESULT_ID_RE = re.compile(r"/result/(\d+)")
+
+# magic, version, bits, hashes, capacity, count, error rate
+_HEADER = struct.Struct("<4sBQBQQd")
+_MAGIC = b"GCBF"
+_VERSION = 1
+
+
+def result_id(url):
+    """Return the numeric GradCafe result ID in a URL, or None."""
+    if not url:
+        return None
+    match = RESULT_ID_RE.search(url)
+    return int(match.group(1)) if match else None
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over integer IDs.
+
+    Args:
+        capacity: Number of IDs the filter is sized for.
+        error_rate: Target false-positive rate at capacity.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(1, int(capacity))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item):
+        """Yield the bit positions for an ID (Kirsch-Mitzenmacher double hashing)."""
+        digest = hashlib.blake2b(int(item).to_bytes(8, "little", signed=True),
+                                 digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        h2 |= 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item):
+        """Add an ID. Returns True if it was not (probably) present before."""
+        new = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self._bits[pos >> 3] & mask:
+                self._bits[pos >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item):
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def __len__(self):
+        """Distinct IDs added; IDs that already looked present are not counted."""
+        return self.count
+
+    def compatible(self, other):
+        """True if other has the same size and hash count, so it can be merged."""
+        return (self.num_bits, self.num_hashes) == (other.num_bits, other.num_hashes)
+
+    def update(self, other):
+        """Add every ID of a compatible filter (a bitwise OR).
+
+        IDs present in both filters cannot be told apart, so the count
+        becomes the usual estimate from the number of set bits.
+
+        Raises:
+            ValueError: If the filters differ in size or hash count.
+        """
+        if not self.compatible(other):
+            raise ValueError("Bloom filters differ in size or hash count")
+        merged = (int.from_bytes(self._bits, "little")
+                  | int.from_bytes(other._bits, "little"))  # pylint: disable=protected-access
+        self._bits = bytearray(merged.to_bytes(len(self._bits), "little"))
+        set_bits = merged.bit_count()
+        if set_bits >= self.num_bits:
+            estimate = self.capacity + 1
+        else:
+            estimate = round(-self.num_bits / self.num_hashes
+                             * math.log(1 - set_bits / self.num_bits))
+        self.count = max(self.count, other.count, estimate)
+
+    @property
+    def full(self):
+        """True once more IDs were added than the filter was sized for."""
+        return self.count > self.capacity
+
+    def to_bytes(self):
+        """Serialize the filter (header plus bit array)."""
+        header = _HEADER.pack(_MAGIC, _VERSION, self.num_bits, self.num_hashes,
+                              self.capacity, self.count, self.error_rate)
+        return header + bytes(self._bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Rebuild a filter from to_bytes() output.
+
+        Raises:
+            ValueError: If the data is not a serialized filter.
+        """
+        data = bytes(data)
+        if len(data) < _HEADER.size:
+            raise ValueError("Bloom filter data is truncated")
+        (magic, version, num_bits, num_hashes,
+         capacity, count, error_rate) = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Not a serialized Bloom filter")
+        bits = data[_HEADER.size:]
+        if len(bits) != (num_bits + 7) // 8:
+            raise ValueError("Bloom filter data is truncated")
+
+        bloom = cls.__new__(cls)
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.error_rate = error_rate
+        bloom.capacity = capacity
+        bloom.count = count
+        bloom._bits = bytearray(bits)  # pylint: disable=protected-access
+        return bloom
+
+
+class KnownResults:
+    """``url in known`` membership test built on the watermark and ID filter.
+
+    Drop-in replacement for a set of known URLs in scrape_new_records().
+
+    Args:
+        last_seen_id: Highest ingested result ID, or None if nothing is ingested.
+        id_filter: BloomFilter of every ingested result ID.
+    """
+
+    def __init__(self, last_seen_id, id_filter):
+        self.last_seen_id = last_seen_id
+        self.id_filter = id_filter
+
+    def __contains__(self, url):
+        rid = result_id(url)
+        if rid is None or self.last_seen_id is None or rid > self.last_seen_id:
+            return False
+        return rid in self.id_filter
+
+    def add(self, url):
+        """Record a newly ingested URL; returns its result ID or None."""
+        rid = result_id(url)
+        if rid is not None:
+            self.id_filter.add(rid)
+            if self.last_seen_id is None or rid > self.last_seen_id:
+                self.last_seen_id = rid
+        return rid
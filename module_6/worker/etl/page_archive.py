@@ -0,0 +1,187 @@
+"""Compressed, append-only archive of raw GradCafe survey pages.
+
+Every fetched page is stored as one frame: a JSON header line followed by
+the zlib-compressed HTML. Frames are only ever appended, so an interrupted
+write can at worst leave a truncated last frame, which is ignored on read
+and cut off before the next append.
+Several processes may append to the same file: each append holds an
+exclusive lock on it (``flock``; not available on Windows, where one
+process should write an archive at a time) and first picks up frames
+other writers added, so only a tail that is not a complete frame is
+ever cut off.
+Headers carry the page number, fetch time and the crawl run the page
+belongs to, which lets a crawl be re-parsed offline or replayed as a
+deterministic fixture.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+ArchiveEntry = namedtuple("ArchiveEntry", "page fetched_at run offset length raw_length")
+
+
+def new_run_id():
+    """Return a sortable identifier for a new crawl run."""
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S.%fZ")
+
+
+class PageArchive:
+    """Append-only page archive indexed by run, page number and fetch time.
+
+    Args:
+        path: Archive file path. Created on first append.
+        level: zlib compression level.
+    """
+
+    def __init__(self, path, level=6):
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        self._entries = None
+        self._end = 0
+
+    def append(self, page_num, body, run, fetched_at=None):
+        """Compress and append one page.
+
+        Args:
+            page_num (int): Survey page number.
+            body (bytes): Raw page HTML.
+            run (str): Crawl run identifier (see new_run_id()).
+            fetched_at (str, optional): ISO timestamp; defaults to now.
+        """
+        payload = zlib.compress(body, self.level)
+        header = {
+            "page": page_num,
+            "fetched_at": fetched_at or datetime.now(timezone.utc).isoformat(),
+            "run": run,
+            "length": len(payload),
+            "raw_length": len(body),
+        }
+        line = json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n"
+        with self._lock:
+            entries = self.entries()
+            with open(self.path, "a+b") as f:
+                if fcntl is not None:
+                    # Released when the file is closed
+                    fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                # Pick up frames other writers appended since the last look
+                self._end = self._read_frames(f, self._end, entries)
+                if os.fstat(f.fileno()).st_size > self._end:
+                    # Drop a torn frame, or later frames would land behind it
+                    f.truncate(self._end)
+                offset = self._end + len(line)
+                f.write(line)
+                f.write(payload)
+            self._end = offset + len(payload)
+            entries.append(ArchiveEntry(
+                page_num, header["fetched_at"], run, offset, len(payload), len(body),
+            ))
+
+    def entries(self):
+        """Return the list of complete frames, scanning the file once."""
+        if self._entries is None:
+            self._entries = self._scan()
+        return self._entries
+
+    def _scan(self):
+        """Read frame headers, skipping over payloads.
+
+        Also records where the last complete frame ends.
+        """
+        entries = []
+        self._end = 0
+        if not os.path.exists(self.path):
+            return entries
+        with open(self.path, "rb") as f:
+            self._end = self._read_frames(f, 0, entries)
+        return entries
+
+    @staticmethod
+    def _read_frames(f, start, entries):
+        """Append the complete frames from offset ``start`` on to ``entries``.
+
+        Returns:
+            int: Offset just past the last complete frame.
+        """
+        size = os.fstat(f.fileno()).st_size
+        end = start
+        f.seek(start)
+        while True:
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                break
+            try:
+                hdr = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            offset = f.tell()
+            if offset + hdr["length"] > size:
+                break
+            entries.append(ArchiveEntry(
+                hdr["page"], hdr["fetched_at"], hdr["run"],
+                offset, hdr["length"], hdr.get("raw_length"),
+            ))
+            f.seek(hdr["length"], os.SEEK_CUR)
+            end = offset + hdr["length"]
+        return end
+
+    def runs(self):
+        """Return the run identifiers in the archive, oldest first."""
+        return sorted({e.run for e in self.entries()})
+
+    def read(self, entry):
+        """Return the decompressed body of an entry."""
+        with open(self.path, "rb") as f:
+            f.seek(entry.offset)
+            return zlib.decompress(f.read(entry.length))
+
+    def iter_pages(self, run=None):
+        """Yield ``(page_num, body)`` for one run in page order.
+
+        Args:
+            run (str, optional): Run to read; defaults to the latest run.
+                If a page was fetched more than once in the run, the last
+                fetch wins.
+        """
+        runs = self.runs()
+        if not runs:
+            return
+        run = run or runs[-1]
+        latest = {}
+        for entry in self.entries():
+            if entry.run == run:
+                latest[entry.page] = entry
+        with open(self.path, "rb") as f:
+            for page in sorted(latest):
+                entry = latest[page]
+                f.seek(entry.offset)
+                yield page, zlib.decompress(f.read(entry.length))
+
+    def replay(self, run=None):
+        """Return a ``fetch(page_num)`` callable serving pages from the archive.
+
+        Missing pages return None, like a failed fetch. Pages are read and
+        decompressed on demand, and the callable is safe to use from several
+        threads. Useful as a deterministic, network-free fixture for scraper
+        benchmarks.
+        """
+        runs = self.runs()
+        run = run or (runs[-1] if runs else None)
+        latest = {e.page: e for e in self.entries() if e.run == run}
+
+        def fetch(page_num):
+            entry = latest.get(page_num)
+            return self.read(entry) if entry is not None else None
+
+        return fetch
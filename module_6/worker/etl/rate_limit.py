@@ -0,0 +1,78 @@
+"""Request rate limit shared by every worker replica.
+
+The limit is kept in Postgres as the next free request slot per name
+(generic cell rate algorithm). Each acquire() atomically books the next
+slot with a single upsert and sleeps until it arrives, so any number of
+replicas together stay under ``rate`` requests per second without polling
+and are served in arrival order.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+from psycopg import sql
+
+_BOOK_SLOT = sql.SQL(
+    "INSERT INTO fetch_rate_limits AS r (name, next_slot) "
+    "VALUES (%(name)s, clock_timestamp() + make_interval(secs => %(interval)s)) "
+    "ON CONFLICT (name) DO UPDATE SET next_slot = "
+    "GREATEST(r.next_slot, clock_timestamp()) + make_interval(secs => %(interval)s) "
+    "RETURNING EXTRACT(EPOCH FROM r.next_slot - clock_timestamp())"
+)
+
+
+class SharedRateLimiter:  # pylint: disable=too-few-public-methods
+    """Postgres-backed limiter with the same acquire() API as TokenBucket.
+
+    Args:
+        connect: Callable returning a new psycopg connection; the limiter
+            keeps one autocommit connection of its own, separate from any
+            task transaction.
+        rate: Requests per second across all replicas. ``None`` or ``<= 0``
+            disables limiting.
+        name: Limit to share; replicas using the same name share the rate.
+
+    Attributes:
+        waited (float): Total seconds this limiter has slept.
+    """
+
+    def __init__(self, connect, rate, name="gradcafe"):
+        self.connect = connect
+        self.rate = float(rate) if rate else 0.0
+        self.name = name
+        self.waited = 0.0
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def acquire(self, stop=None):
+        """Book the next global request slot and sleep until it is due.
+
+        Args:
+            stop: Optional threading.Event; once set, the sleep ends early.
+        """
+        if self.rate <= 0:
+            return
+        interval = 1.0 / self.rate
+        with self._lock:
+            if self._conn is None:
+                self._conn = self.connect()
+                self._conn.autocommit = True
+            row = self._conn.execute(
+                _BOOK_SLOT, {"name": self.name, "interval": interval},
+            ).fetchone()
+            wait = max(0.0, float(row[0]) - interval)
+            self.waited += wait
+        if wait:
+            if stop is None:
+                time.sleep(wait)
+            else:
+                stop.wait(wait)
+
+    def close(self):
+        """Close the limiter's database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,35 @@
+"""Per-row content hashes for GradCafe change detection.
+
+Rows are stored with ``ON CONFLICT (url) DO NOTHING``, so later edits on
+GradCafe (typically a decision status update) never reach the database.
+Each row keeps a short hash of the fields parsed from the survey index;
+a refresh re-parses the newest pages, hashes each row again and rewrites
+only the rows whose hash changed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+# Record key -> applicants column for the fields parsed from the survey index
+INDEX_FIELDS = {
+    "university": "university",
+    "program": "program",
+    "degree": "degree",
+    "status": "status",
+    "decisionDate": "decision_date",
+    "date_added": "date_added",
+    "comments": "comments",
+}
+
+
+def content_hash(record):
+    """Return a 16-byte digest of a record's index fields.
+
+    The URL is the row's key and is not part of the hash; missing fields
+    hash like None.
+    """
+    canonical = json.dumps([record.get(key) for key in INDEX_FIELDS],
+                           ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
@@ -0,0 +1,183 @@
+"""Plan, retry and inspect sharded historical GradCafe backfills.
+
+A backfill splits a survey page range into shards of ``--shard-size``
+pages, records each shard in the backfill_shards table and publishes one
+``backfill_pages`` task per shard to tasks_q. Any number of worker
+replicas then crawl shards in parallel under the shared request limit.
+
+``enrich`` publishes ``enrich_results`` sweep tasks that fetch the detail
+pages of rows not enriched yet (e.g. after a backfill); concurrent tasks
+claim disjoint rows. ``refresh`` publishes a ``refresh_recent`` task that
+re-crawls the newest pages and updates rows edited since they were stored
+(e.g. from cron).
+
+Usage (inside the worker container):
+    python plan_backfill.py plan --last-page 5000 [--first-page 1] [--shard-size 50]
+    python plan_backfill.py retry BACKFILL_ID [--stale-minutes 30]
+    python plan_backfill.py status BACKFILL_ID
+    python plan_backfill.py enrich [--tasks 10] [--batch-size 200]
+    python plan_backfill.py refresh [--pages 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from datetime import datetime, timezone
+
+from psycopg import sql
+
+from consumer import ENRICH_BATCH, REFRESH_PAGES, _get_db_conn, _publish_tasks
+
+log = logging.getLogger(__name__)
+
+
+def plan_shards(first_page, last_page, shard_size):
+    """Split ``first_page..last_page`` into inclusive ``(first, last)`` ranges.
+
+    Args:
+        first_page: First page of the backfill.
+        last_page: Last page of the backfill (inclusive).
+        shard_size: Pages per shard.
+
+    Returns:
+        list[tuple]: Page ranges covering the whole span, in page order.
+
+    Raises:
+        ValueError: If the range or shard size is invalid.
+    """
+    if first_page < 1 or last_page < first_page or shard_size < 1:
+        raise ValueError(
+            f"Invalid backfill range {first_page}-{last_page} / shard size {shard_size}"
+        )
+    return [
+        (start, min(start + shard_size - 1, last_page))
+        for start in range(first_page, last_page + 1, shard_size)
+    ]
+
+
+def _publish_shards(backfill_id, shards):
+    """Publish one persistent backfill_pages task per shard."""
+    _publish_tasks("backfill_pages", [
+        {"backfill_id": backfill_id, "first_page": first_page, "last_page": last_page}
+        for first_page, last_page in shards
+    ])
+
+
+def plan(first_page, last_page, shard_size, backfill_id=None):
+    """Record and publish the shards of a new backfill.
+
+    Shards are written before they are published, so a shard is never
+    worked on without a progress row.
+
+    Returns:
+        str: The backfill id.
+    """
+    backfill_id = backfill_id or datetime.now(timezone.utc).strftime("backfill-%Y%m%dT%H%M%SZ")
+    shards = plan_shards(first_page, last_page, shard_size)
+
+    with _get_db_conn() as conn:
+        cur = conn.cursor()
+        cur.executemany(sql.SQL(
+            "INSERT INTO backfill_shards (backfill_id, first_page, last_page) "
+            "VALUES (%s, %s, %s) ON CONFLICT (backfill_id, first_page) DO NOTHING"
+        ), [(backfill_id, first, last) for first, last in shards])
+
+    _publish_shards(backfill_id, shards)
+    log.info("Planned %s: pages %d-%d in %d shards of %d pages.",
+             backfill_id, first_page, last_page, len(shards), shard_size)
+    return backfill_id
+
+
+def retry(backfill_id, stale_minutes=30):
+    """Republish failed shards, and pending/running shards idle for too long.
+
+    Stale shards cover lost messages and workers that died mid-shard; a
+    running shard bumps updated_at after every page, so only a shard with
+    no progress for ``stale_minutes`` is stale. A shard finished in the
+    meantime is skipped by the worker.
+
+    Returns:
+        int: Number of shards republished.
+    """
+    with _get_db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql.SQL(
+            "SELECT first_page, last_page FROM backfill_shards "
+            "WHERE backfill_id = %s AND (status = 'failed' OR "
+            "(status IN ('pending', 'running') "
+            "AND updated_at < now() - make_interval(mins => %s))) "
+            "ORDER BY first_page"
+        ), (backfill_id, stale_minutes))
+        shards = cur.fetchall()
+
+    if shards:
+        _publish_shards(backfill_id, shards)
+    log.info("Requeued %d shards of %s.", len(shards), backfill_id)
+    return len(shards)
+
+
+def status(backfill_id):
+    """Return ``{status: (shards, records)}`` for a backfill."""
+    with _get_db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute(sql.SQL(
+            "SELECT status, COUNT(*), COALESCE(SUM(records), 0) FROM backfill_shards "
+            "WHERE backfill_id = %s GROUP BY status ORDER BY status"
+        ), (backfill_id,))
+        return {row[0]: (row[1], row[2]) for row in cur.fetchall()}
+
+
+def enrich(tasks, batch_size=ENRICH_BATCH):
+    """Publish ``tasks`` enrichment sweeps of up to ``batch_size`` rows each."""
+    _publish_tasks("enrich_results", [{"limit": batch_size}] * tasks)
+    log.info("Queued %d enrichment tasks of %d results.", tasks, batch_size)
+
+
+def refresh(pages=REFRESH_PAGES):
+    """Publish a refresh_recent task over the newest ``pages`` pages."""
+    _publish_tasks("refresh_recent", [{"pages": pages}])
+    log.info("Queued a refresh of the newest %d pages.", pages)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Sharded GradCafe backfill planner.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_cmd = commands.add_parser("plan", help="Publish a new backfill.")
+    plan_cmd.add_argument("--first-page", type=int, default=1)
+    plan_cmd.add_argument("--last-page", type=int, required=True)
+    plan_cmd.add_argument("--shard-size", type=int, default=50)
+    plan_cmd.add_argument("--id", default=None, help="Backfill id (default: timestamp).")
+
+    retry_cmd = commands.add_parser("retry", help="Requeue failed or stale shards.")
+    retry_cmd.add_argument("backfill_id")
+    retry_cmd.add_argument("--stale-minutes", type=int, default=30)
+
+    status_cmd = commands.add_parser("status", help="Show shard progress.")
+    status_cmd.add_argument("backfill_id")
+
+    enrich_cmd = commands.add_parser("enrich", help="Queue detail-page enrichment sweeps.")
+    enrich_cmd.add_argument("--tasks", type=int, default=10)
+    enrich_cmd.add_argument("--batch-size", type=int, default=ENRICH_BATCH)
+
+    refresh_cmd = commands.add_parser("refresh", help="Re-check the newest pages for edits.")
+    refresh_cmd.add_argument("--pages", type=int, default=REFRESH_PAGES)
+
+    args = parser.parse_args()
+    if args.command == "plan":
+        print(plan(args.first_page, args.last_page, args.shard_size, args.id))
+    elif args.command == "retry":
+        retry(args.backfill_id, args.stale_minutes)
+    elif args.command == "enrich":
+        enrich(args.tasks, args.batch_size)
+    elif args.command == "refresh":
+        refresh(args.pages)
+    else:
+        for state, (shards, records) in status(args.backfill_id).items():
+            print(f"{state:>8}: {shards} shards, {records} records")
+
+
+if __name__ == "__main__":
+    main()